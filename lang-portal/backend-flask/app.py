@@ -1,9 +1,16 @@
 from flask import Flask, g
 from flask_cors import CORS
 from dotenv import load_dotenv
+import logging
 import os
 
 from lib.db import Db
+from lib.cache import ResponseCache
+from lib.profiling import Profiler
+from lib.jobs import JobQueue
+from lib.group_index import GroupIndex
+from lib.migrations import migrate
+from lib.serialization import JSONProvider
 
 import routes.words
 import routes.groups
@@ -11,12 +18,22 @@ import routes.study_sessions
 import routes.dashboard
 import routes.study_activities
 import routes.word_groups
+import routes.jobs
+import routes.export
 
 # Load environment variables
 load_dotenv()
 
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
 def create_app(test_config=None):
     app = Flask(__name__)
+    # orjson-backed when installed; passes RawJSON columns through untouched
+    app.json = JSONProvider(app)
     
     # Configure CORS to allow requests from frontend
     CORS(app, resources={
@@ -36,15 +53,69 @@ def create_app(test_config=None):
     app.config.update(
         SECRET_KEY=os.environ['SECRET_KEY'],
         DEBUG=os.environ.get('DEBUG', 'True').lower() == 'true',
-        ENV='development'
+        ENV='development',
+        DATABASE=os.environ.get('DATABASE', os.path.join(os.path.dirname(__file__), 'data', 'lang_portal.db')),
+        DB_POOL_SIZE=int(os.environ.get('DB_POOL_SIZE', 5)),
+        DB_POOL_TIMEOUT=float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        RESPONSE_CACHE_SIZE=int(os.environ.get('RESPONSE_CACHE_SIZE', 512)),
+        PROFILING=os.environ.get('PROFILING', 'False').lower() == 'true',
+        PROFILING_SLOW_MS=float(os.environ.get('PROFILING_SLOW_MS', 50)),
+        SONG_VOCAB_URL=os.environ.get('SONG_VOCAB_URL', 'http://localhost:8000'),
+        SONG_VOCAB_CONNECT_TIMEOUT=float(os.environ.get('SONG_VOCAB_CONNECT_TIMEOUT', 3)),
+        SONG_VOCAB_READ_TIMEOUT=float(os.environ.get('SONG_VOCAB_READ_TIMEOUT', 120)),
+        SONG_VOCAB_RETRIES=int(os.environ.get('SONG_VOCAB_RETRIES', 2)),
+        SONG_VOCAB_MAX_CONCURRENCY=int(os.environ.get('SONG_VOCAB_MAX_CONCURRENCY', 4)),
+        SONG_VOCAB_BREAKER_THRESHOLD=int(os.environ.get('SONG_VOCAB_BREAKER_THRESHOLD', 5)),
+        SONG_VOCAB_BREAKER_RESET=float(os.environ.get('SONG_VOCAB_BREAKER_RESET', 30)),
+        MIGRATE_ON_STARTUP=os.environ.get('MIGRATE_ON_STARTUP', 'False').lower() == 'true',
+        JOB_WORKERS=int(os.environ.get('JOB_WORKERS', 2)),
+        JOB_POLL_INTERVAL=float(os.environ.get('JOB_POLL_INTERVAL', 1)),
+        JOB_STALE_AFTER=float(os.environ.get('JOB_STALE_AFTER', 600)),
+        REVIEW_BUFFER=os.environ.get('REVIEW_BUFFER', 'False').lower() == 'true',
+        REVIEW_BUFFER_INTERVAL_MS=int(os.environ.get('REVIEW_BUFFER_INTERVAL_MS', 200)),
+        REVIEW_BUFFER_MAX_EVENTS=int(os.environ.get('REVIEW_BUFFER_MAX_EVENTS', 500)),
+        EXPORT_CHUNK_ROWS=int(os.environ.get('EXPORT_CHUNK_ROWS', 1000)),
+        EXPORT_MAX_CONCURRENCY=int(os.environ.get('EXPORT_MAX_CONCURRENCY', 2))
+    )
+    if test_config:
+        app.config.update(test_config)
+
+    # Apply pending schema migrations; one read of schema_migrations when up to date
+    if app.config['MIGRATE_ON_STARTUP']:
+        migrate(app.config['DATABASE'])
+
+    # Opt-in query and route timing, reported at /api/debug/perf
+    app.profiler = Profiler(slow_ms=app.config['PROFILING_SLOW_MS']) if app.config['PROFILING'] else None
+    if app.profiler:
+        app.profiler.init_app(app)
+
+    # Initialize the pooled database with absolute path
+    app.db = Db(
+        f"sqlite:///{app.config['DATABASE']}",
+        pool_size=app.config['DB_POOL_SIZE'],
+        pool_timeout=app.config['DB_POOL_TIMEOUT'],
+        profiler=app.profiler
     )
 
-    # Initialize database with absolute path
-    db_path = os.path.join(os.path.dirname(__file__), 'data', 'lang_portal.db')
-    app.db = Db(f'sqlite:///{db_path}')
+    # Cache GET responses until a write bumps one of the tables they read
+    app.cache = ResponseCache(app.db, max_entries=app.config['RESPONSE_CACHE_SIZE'])
+
+    # Background jobs (song processing). Workers start with the first request
+    # or enqueue in each process, so a preforking server gets its own threads
+    app.jobs = JobQueue(
+        app,
+        workers=app.config['JOB_WORKERS'],
+        poll_interval=app.config['JOB_POLL_INTERVAL'],
+        stale_after=app.config['JOB_STALE_AFTER']
+    )
+    app.before_request(app.jobs.start)
+
+    # Word-group membership bitmaps for multi-group filters, built on first use
+    app.group_index = GroupIndex(app.db)
     
     @app.teardown_appcontext
     def close_db(exception):
+        # Return the request's connection to the pool
         app.db.close()
 
     # Test config route
@@ -63,12 +134,17 @@ def create_app(test_config=None):
     routes.study_sessions.load(app)
     routes.dashboard.load(app)
     routes.study_activities.load(app)
+    routes.jobs.load(app)
+    routes.export.load(app)
 
     return app
 
-app = create_app()
-
 if __name__ == '__main__':
+    # Importing this module never opens the database; only the dev server
+    # creates the app, and it brings the schema up to date first
+    os.environ.setdefault('MIGRATE_ON_STARTUP', 'True')
+    app = create_app()
+
     # Try different ports if the default one is in use
     for port in range(5100, 5110):  # Try ports 5100-5109
         try:
@@ -0,0 +1,155 @@
+"""Generate a synthetic lang-portal database for benchmarking.
+
+Builds the schema from sql/setup and bulk loads words, groups, study
+sessions and review items. Derived tables (dashboard rollups, the review
+schedule, the search index) are left for the migrations the app applies on
+first start, exactly as against a real database.
+"""
+import json
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETUP_DIR = os.path.join(BASE_DIR, 'sql', 'setup')
+
+SETUP_FILES = [
+  'create_table_words.sql',
+  'create_table_groups.sql',
+  'create_table_word_groups.sql',
+  'create_table_word_reviews.sql',
+  'create_table_study_sessions.sql',
+  'create_table_study_activities.sql',
+  'create_table_practice_words.sql',
+  'create_table_word_review_items.sql',
+  'insert_study_activities.sql',
+]
+
+GERMAN_SYLLABLES = ['ge', 'hen', 'sch', 'ön', 'stra', 'ße', 'ver', 'ste', 'ben', 'mä', 'dchen', 'frü', 'ling',
+                    'haus', 'bau', 'lauf', 'en', 'ung', 'keit', 'zeit', 'bü', 'cher', 'ar', 'beit', 'fahr', 'rad']
+ENGLISH_SYLLABLES = ['to', 'go', 'see', 'house', 'work', 'time', 'book', 'street', 'girl', 'spring', 'run',
+                     'build', 'ride', 'bike', 'ness', 'ing', 'ful', 'ly']
+WORD_TYPES = ['noun', 'verb', 'adjective']
+ARTICLES = ['der', 'die', 'das']
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def batched(iterable, size):
+  iterator = iter(iterable)
+  while True:
+    batch = list(islice(iterator, size))
+    if not batch:
+      return
+    yield batch
+
+def make_word(rng, index):
+  german = ''.join(rng.choice(GERMAN_SYLLABLES) for _ in range(rng.randint(2, 4)))
+  english = ' '.join(''.join(rng.choice(ENGLISH_SYLLABLES) for _ in range(2)) for _ in range(rng.randint(1, 2)))
+  word_type = WORD_TYPES[index % len(WORD_TYPES)]
+  if word_type == 'noun':
+    article = rng.choice(ARTICLES)
+    info = {'plural': german + 'en', 'gender': article}
+  elif word_type == 'verb':
+    article = None
+    info = {'present': {'ich': german + 'e', 'du': german + 'st', 'er/sie/es': german + 't'}}
+  else:
+    article = None
+    info = {'comparative': german + 'er', 'superlative': 'am ' + german + 'sten'}
+  return (f'{german}{index}', f'/{german}/', f'{english} {index}', article, word_type, json.dumps(info, ensure_ascii=False))
+
+def generate(path, words=20000, groups=50, sessions=100000, reviews_per_session=20, days=365, seed=42, batch_size=10000):
+  """Create a fresh database at `path` and return row counts and elapsed seconds."""
+  started = time.perf_counter()
+  rng = random.Random(seed)
+  if os.path.exists(path):
+    os.remove(path)
+  os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+  conn = sqlite3.connect(path)
+  conn.execute('PRAGMA journal_mode = MEMORY')
+  conn.execute('PRAGMA synchronous = OFF')
+  for sql_file in SETUP_FILES:
+    with open(os.path.join(SETUP_DIR, sql_file)) as f:
+      conn.executescript(f.read())
+
+  cursor = conn.cursor()
+  cursor.execute('BEGIN')
+  for batch in batched((make_word(rng, i) for i in range(words)), batch_size):
+    cursor.executemany('''
+      INSERT INTO words (german, pronunciation, english, article, word_type, additional_info)
+      VALUES (?, ?, ?, ?, ?, ?)
+    ''', batch)
+
+  # Group ids line up across the legacy `groups` table (used by /api/groups
+  # and study_sessions.group_id) and the named word_groups the links use
+  group_names = [(i, f'Group {i:03d}') for i in range(1, groups + 1)]
+  cursor.executemany('INSERT INTO groups (id, name) VALUES (?, ?)', group_names)
+  cursor.executemany('INSERT INTO word_groups (id, name) VALUES (?, ?)', group_names)
+  links = set()
+  for word_id in range(1, words + 1):
+    for _ in range(rng.choice((1, 1, 2))):
+      links.add((word_id, rng.randint(1, groups)))
+  for batch in batched(sorted(links), batch_size):
+    cursor.executemany('INSERT INTO word_group_assignments (word_id, group_id) VALUES (?, ?)', batch)
+  cursor.execute('''
+    UPDATE groups SET words_count = (
+      SELECT COUNT(*) FROM word_group_assignments WHERE group_id = groups.id
+    )
+  ''')
+
+  cursor.execute('SELECT COUNT(*) FROM study_activities')
+  activities = cursor.fetchone()[0]
+  start = datetime.utcnow() - timedelta(days=days)
+  step = days * 86400 / max(sessions, 1)
+  session_starts = [start + timedelta(seconds=i * step + rng.random() * step) for i in range(sessions)]
+
+  cursor.executemany('''
+    INSERT INTO study_sessions (id, group_id, study_activity_id, created_at) VALUES (?, ?, ?, ?)
+  ''', (
+    (i + 1, rng.randint(1, groups), rng.randint(1, activities), session_start.strftime(TIMESTAMP_FORMAT))
+    for i, session_start in enumerate(session_starts)
+  ))
+
+  def review_items():
+    for session_id, session_start in enumerate(session_starts, start=1):
+      for n in range(reviews_per_session):
+        yield (
+          rng.randint(1, words),
+          session_id,
+          rng.random() < 0.7,
+          (session_start + timedelta(seconds=20 * n)).strftime(TIMESTAMP_FORMAT)
+        )
+
+  for batch in batched(review_items(), batch_size):
+    cursor.executemany('''
+      INSERT INTO word_review_items (word_id, study_session_id, correct, created_at) VALUES (?, ?, ?, ?)
+    ''', batch)
+
+  cursor.execute('''
+    INSERT INTO word_reviews (word_id, correct_count, wrong_count, last_reviewed)
+    SELECT word_id, SUM(correct), SUM(NOT correct), MAX(created_at)
+    FROM word_review_items
+    GROUP BY word_id
+  ''')
+
+  cursor.executemany('''
+    INSERT INTO practice_words (session_id, german_word, english_translation, word_type)
+    VALUES (?, ?, ?, ?)
+  ''', (
+    (session_id, f'lied{session_id}', f'song word {session_id}', rng.choice(WORD_TYPES))
+    for session_id in range(1, sessions + 1, 10)
+  ))
+  conn.commit()
+  conn.execute('ANALYZE')
+  conn.close()
+
+  return {
+    'words': words,
+    'groups': groups,
+    'links': len(links),
+    'sessions': sessions,
+    'review_items': sessions * reviews_per_session,
+    'seconds': round(time.perf_counter() - started, 2)
+  }
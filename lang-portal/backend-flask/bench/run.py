@@ -0,0 +1,322 @@
+"""Benchmark every lang-portal route against a synthetic database.
+
+    python -m bench.run --generate --mode both
+    python -m bench.run --mode http --threads 16 --only words_list --only dashboard_stats
+    python -m bench.run --update-baseline
+
+Each endpoint is driven through the Flask test client (in-process, one
+request at a time) and/or over HTTP by a thread pool, and p50/p95/p99
+latency plus throughput are reported. Results are compared with the stored
+baseline and the run exits non-zero on a regression beyond --tolerance.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('SECRET_KEY', 'bench')
+
+from bench.datagen import generate
+
+DEFAULT_DB = os.path.join(BASE_DIR, 'bench', 'data', 'bench.db')
+DEFAULT_BASELINE = os.path.join(BASE_DIR, 'bench', 'baseline.json')
+
+# Latency differences below this are treated as noise when comparing p95
+MIN_REGRESSION_MS = 2.0
+
+class Endpoint:
+  def __init__(self, name, method, make, write=False):
+    self.name = name
+    self.method = method
+    self.make = make  # rng -> (path, json body or None)
+    self.write = write
+
+def endpoints(conn):
+  """Build the request mix from ids sampled out of the benchmark database."""
+  cursor = conn.cursor()
+  word_ids = [row[0] for row in cursor.execute('SELECT id FROM words ORDER BY random() LIMIT 1000')]
+  group_ids = [row[0] for row in cursor.execute('SELECT id FROM groups')]
+  session_ids = [row[0] for row in cursor.execute('SELECT id FROM study_sessions ORDER BY random() LIMIT 1000')]
+  activity_ids = [row[0] for row in cursor.execute('SELECT id FROM study_activities')]
+  prefixes = [row[0][:3] for row in cursor.execute('SELECT german FROM words ORDER BY random() LIMIT 200')]
+  word_pages = max(1, cursor.execute('SELECT COUNT(*) FROM words').fetchone()[0] // 10)
+
+  def get(path):
+    return lambda rng: (path(rng), None)
+
+  return [
+    Endpoint('words_list', 'GET', get(lambda rng: f'/api/words?page={rng.randint(1, min(word_pages, 50))}')),
+    Endpoint('words_list_deep', 'GET', get(lambda rng: f'/api/words?page={rng.randint(1, word_pages)}&sort_by=english')),
+    Endpoint('words_cursor', 'GET', get(lambda rng: '/api/words?cursor=&sort_by=german')),
+    Endpoint('words_multi_group', 'GET', get(lambda rng: '/api/words?groups={},{}&exclude_groups={}'.format(*rng.sample(group_ids, 3)))),
+    Endpoint('words_search', 'GET', get(lambda rng: f'/api/words/search?q={rng.choice(prefixes)}')),
+    Endpoint('word_detail', 'GET', get(lambda rng: f'/api/words/{rng.choice(word_ids)}')),
+    Endpoint('groups_list', 'GET', get(lambda rng: f'/api/groups?page={rng.randint(1, 5)}')),
+    Endpoint('group_detail', 'GET', get(lambda rng: f'/api/groups/{rng.choice(group_ids)}')),
+    Endpoint('group_words', 'GET', get(lambda rng: f'/api/groups/{rng.choice(group_ids)}/words?page={rng.randint(1, 5)}')),
+    Endpoint('group_sessions', 'GET', get(lambda rng: f'/api/groups/{rng.choice(group_ids)}/study_sessions')),
+    Endpoint('study_sessions_list', 'GET', get(lambda rng: f'/api/study-sessions?page={rng.randint(1, 20)}')),
+    Endpoint('study_session_detail', 'GET', get(lambda rng: f'/api/study-sessions/{rng.choice(session_ids)}')),
+    Endpoint('study_activities', 'GET', get(lambda rng: '/api/study-activities')),
+    Endpoint('study_activity_detail', 'GET', get(lambda rng: f'/api/study-activities/{rng.choice(activity_ids)}')),
+    Endpoint('study_activity_sessions', 'GET', get(lambda rng: f'/api/study-activities/{rng.choice(activity_ids)}/sessions')),
+    Endpoint('study_activity_launch', 'GET', get(lambda rng: f'/api/study-activities/{rng.choice(activity_ids)}/launch')),
+    Endpoint('study_activity_words', 'GET', get(lambda rng: f'/api/study-activities/words?group_id={rng.choice(group_ids)}&limit=20&due=true')),
+    Endpoint('practice_words', 'GET', get(lambda rng: f'/api/practice-words/{rng.choice(session_ids)}')),
+    Endpoint('dashboard_recent_session', 'GET', get(lambda rng: '/api/dashboard/recent-session')),
+    Endpoint('dashboard_stats', 'GET', get(lambda rng: '/api/dashboard/stats')),
+    Endpoint('log_review', 'POST', lambda rng: (
+      f'/api/study-sessions/{rng.choice(session_ids)}/review',
+      {'word_id': rng.choice(word_ids), 'correct': rng.random() < 0.7}
+    ), write=True),
+    Endpoint('log_reviews_batch', 'POST', lambda rng: (
+      f'/api/study-sessions/{rng.choice(session_ids)}/reviews',
+      [{'word_id': rng.choice(word_ids), 'correct': rng.random() < 0.7} for _ in range(20)]
+    ), write=True),
+    Endpoint('create_study_session', 'POST', lambda rng: (
+      '/api/study-sessions',
+      {'group_id': rng.choice(group_ids), 'study_activity_id': rng.choice(activity_ids)}
+    ), write=True),
+  ]
+
+def percentile(sorted_values, q):
+  if not sorted_values:
+    return None
+  index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+  return round(sorted_values[index], 3)
+
+def summarize(latencies_ms, errors, wall_seconds):
+  latencies_ms = sorted(latencies_ms)
+  return {
+    'requests': len(latencies_ms) + errors,
+    'errors': errors,
+    'p50_ms': percentile(latencies_ms, 0.50),
+    'p95_ms': percentile(latencies_ms, 0.95),
+    'p99_ms': percentile(latencies_ms, 0.99),
+    'rps': round((len(latencies_ms) + errors) / wall_seconds, 1) if wall_seconds > 0 else None
+  }
+
+def run_client(app, endpoint, requests, rng, warmup=3):
+  """Drive one endpoint sequentially through the Flask test client."""
+  client = app.test_client()
+  for _ in range(warmup):
+    path, body = endpoint.make(rng)
+    client.open(path, method=endpoint.method, json=body)
+
+  latencies, errors = [], 0
+  started = time.perf_counter()
+  for _ in range(requests):
+    path, body = endpoint.make(rng)
+    t0 = time.perf_counter()
+    response = client.open(path, method=endpoint.method, json=body)
+    elapsed = (time.perf_counter() - t0) * 1000
+    if response.status_code < 400:
+      latencies.append(elapsed)
+    else:
+      errors += 1
+  return summarize(latencies, errors, time.perf_counter() - started)
+
+def run_http(base_url, endpoint, requests, threads, seed, warmup=3):
+  """Drive one endpoint with `threads` concurrent keep-alive HTTP clients."""
+  import requests as http
+
+  lock = threading.Lock()
+  latencies, errors = [], [0]
+  per_thread = [requests // threads + (1 if i < requests % threads else 0) for i in range(threads)]
+
+  def worker(index, count):
+    rng = random.Random(seed + index)
+    session = http.Session()
+    local_latencies, local_errors = [], 0
+    try:
+      for _ in range(warmup if index == 0 else 0):
+        path, body = endpoint.make(rng)
+        session.request(endpoint.method, base_url + path, json=body)
+      barrier.wait()
+      for _ in range(count):
+        path, body = endpoint.make(rng)
+        t0 = time.perf_counter()
+        try:
+          ok = session.request(endpoint.method, base_url + path, json=body, timeout=30).status_code < 400
+        except http.RequestException:
+          ok = False
+        elapsed = (time.perf_counter() - t0) * 1000
+        if ok:
+          local_latencies.append(elapsed)
+        else:
+          local_errors += 1
+    finally:
+      session.close()
+    with lock:
+      latencies.extend(local_latencies)
+      errors[0] += local_errors
+
+  barrier = threading.Barrier(threads + 1)
+  with ThreadPoolExecutor(max_workers=threads) as pool:
+    futures = [pool.submit(worker, i, count) for i, count in enumerate(per_thread)]
+    barrier.wait()
+    started = time.perf_counter()
+    for future in futures:
+      future.result()
+    wall = time.perf_counter() - started
+  return summarize(latencies, errors[0], wall)
+
+def serve(app):
+  """Serve the app from the threaded development server on an ephemeral port."""
+  from werkzeug.serving import make_server
+  server = make_server('127.0.0.1', 0, app, threaded=True)
+  server.daemon_threads = True
+  thread = threading.Thread(target=server.serve_forever, daemon=True)
+  thread.start()
+  return server, f'http://127.0.0.1:{server.server_port}'
+
+def compare(results, baseline, tolerance):
+  """Return a list of human readable regressions of `results` against `baseline`."""
+  regressions = []
+  for mode, mode_results in results.items():
+    for name, current in mode_results.items():
+      previous = baseline.get(mode, {}).get(name)
+      if not previous:
+        continue
+      if current['errors'] > previous.get('errors', 0):
+        regressions.append(f"{mode}/{name}: {current['errors']} errors (baseline {previous.get('errors', 0)})")
+      if current['p95_ms'] is not None and previous.get('p95_ms') is not None:
+        limit = previous['p95_ms'] * (1 + tolerance)
+        if current['p95_ms'] > limit and current['p95_ms'] - previous['p95_ms'] > MIN_REGRESSION_MS:
+          regressions.append(f"{mode}/{name}: p95 {current['p95_ms']}ms > {round(limit, 3)}ms (baseline {previous['p95_ms']}ms)")
+      if current['rps'] is not None and previous.get('rps'):
+        floor = previous['rps'] * (1 - tolerance)
+        if current['rps'] < floor:
+          regressions.append(f"{mode}/{name}: {current['rps']} req/s < {round(floor, 1)} req/s (baseline {previous['rps']} req/s)")
+  return regressions
+
+def print_table(mode, results):
+  print(f'\n{mode}')
+  print(f"{'endpoint':<28}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+  for name, r in results.items():
+    cells = [r['p50_ms'], r['p95_ms'], r['p99_ms'], r['rps']]
+    cells = ['-' if value is None else value for value in cells]
+    print(f"{name:<28}{r['requests']:>9}{r['errors']:>8}{cells[0]:>10}{cells[1]:>10}{cells[2]:>10}{cells[3]:>10}")
+
+def run(args):
+  if args.generate or not os.path.exists(args.db):
+    print(f'Generating {args.db} ...')
+    stats = generate(
+      args.db,
+      words=args.words,
+      groups=args.groups,
+      sessions=args.sessions,
+      reviews_per_session=args.reviews_per_session,
+      seed=args.seed
+    )
+    print(f"Generated {stats['words']} words, {stats['sessions']} sessions and "
+          f"{stats['review_items']} review items in {stats['seconds']}s")
+
+  from app import create_app
+  started = time.perf_counter()
+  app = create_app({
+    'DATABASE': args.db, 'DEBUG': False, 'MIGRATE_ON_STARTUP': True, 'DB_POOL_SIZE': max(5, args.threads + 2)
+  })
+  print(f'App started in {round(time.perf_counter() - started, 2)}s')
+
+  conn = sqlite3.connect(args.db)
+  selected = [e for e in endpoints(conn) if not args.only or e.name in args.only]
+  conn.close()
+  if not args.writes:
+    selected = [e for e in selected if not e.write]
+  # Reads first so writes don't change the data under them mid-run
+  selected.sort(key=lambda e: e.write)
+
+  modes = ['client', 'http'] if args.mode == 'both' else [args.mode]
+  results = {}
+  server = None
+  try:
+    for mode in modes:
+      results[mode] = {}
+      if mode == 'http':
+        base_url = args.url
+        if not base_url:
+          server, base_url = serve(app)
+      for endpoint in selected:
+        if mode == 'client':
+          results[mode][endpoint.name] = run_client(app, endpoint, args.requests, random.Random(args.seed))
+        else:
+          results[mode][endpoint.name] = run_http(base_url, endpoint, args.requests, args.threads, args.seed)
+      print_table(f'{mode} ({args.threads} threads)' if mode == 'http' else mode, results[mode])
+  finally:
+    if server:
+      server.shutdown()
+    app.db.dispose()
+
+  if args.json:
+    with open(args.json, 'w') as f:
+      json.dump(results, f, indent=2)
+
+  dataset = {
+    'words': args.words,
+    'groups': args.groups,
+    'sessions': args.sessions,
+    'reviews_per_session': args.reviews_per_session,
+    'requests': args.requests,
+    'threads': args.threads
+  }
+  if args.update_baseline:
+    baseline = {}
+    if os.path.exists(args.baseline):
+      with open(args.baseline) as f:
+        baseline = json.load(f)
+    baseline['dataset'] = dataset
+    for mode, mode_results in results.items():
+      baseline.setdefault(mode, {}).update(mode_results)
+    with open(args.baseline, 'w') as f:
+      json.dump(baseline, f, indent=2, sort_keys=True)
+      f.write('\n')
+    print(f'\nBaseline written to {args.baseline}')
+    return 0
+
+  if not os.path.exists(args.baseline):
+    print('\nNo baseline to compare against; run with --update-baseline to record one.')
+    return 0
+  with open(args.baseline) as f:
+    baseline = json.load(f)
+  if baseline.get('dataset', dataset) != dataset:
+    print(f"\nWarning: baseline was recorded with {baseline['dataset']}, this run used {dataset}")
+  regressions = compare(results, baseline, args.tolerance)
+  if regressions:
+    print(f'\n{len(regressions)} regression(s) beyond {int(args.tolerance * 100)}%:')
+    for regression in regressions:
+      print(f'  {regression}')
+    return 1
+  print(f'\nNo regressions beyond {int(args.tolerance * 100)}% of baseline.')
+  return 0
+
+def parse_args(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--db', default=DEFAULT_DB, help='Benchmark database (generated if missing)')
+  parser.add_argument('--generate', action='store_true', help='Regenerate the database even if it exists')
+  parser.add_argument('--words', type=int, default=20000)
+  parser.add_argument('--groups', type=int, default=50)
+  parser.add_argument('--sessions', type=int, default=100000)
+  parser.add_argument('--reviews-per-session', type=int, default=20)
+  parser.add_argument('--seed', type=int, default=42)
+  parser.add_argument('--mode', choices=['client', 'http', 'both'], default='both')
+  parser.add_argument('--requests', type=int, default=200, help='Timed requests per endpoint and mode')
+  parser.add_argument('--threads', type=int, default=8, help='Concurrent HTTP clients')
+  parser.add_argument('--url', help='Benchmark an already running server instead of starting one')
+  parser.add_argument('--only', action='append', help='Only run the named endpoint (repeatable)')
+  parser.add_argument('--no-writes', dest='writes', action='store_false', help='Skip POST endpoints')
+  parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+  parser.add_argument('--update-baseline', action='store_true', help='Record these results as the baseline')
+  parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed fractional slowdown before failing')
+  parser.add_argument('--json', help='Also write the results to this file')
+  return parser.parse_args(argv)
+
+if __name__ == '__main__':
+  sys.exit(run(parse_args()))
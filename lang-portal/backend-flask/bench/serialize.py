@@ -0,0 +1,125 @@
+"""Measure the per-row cost of turning word rows into a JSON response.
+
+    python -m bench.serialize
+    python -m bench.serialize --rows 50 --rows 5000 --repeat 50
+
+Compares the hand-built path the routes used before (sqlite3.Row, a dict
+built by index, json.loads of additional_info, Flask's stdlib encoder) with
+the shared one (lib.serialization.row_factory, RawJSON pass-through and
+JSONProvider) on an in-memory table of generated words. Each path fetches
+and encodes the same SELECT; the best of --repeat runs is reported.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from bench.datagen import make_word
+from lib.serialization import JSONProvider, orjson, row_factory
+
+QUERY = '''
+  SELECT id, german, pronunciation, english, article, word_type, additional_info,
+         correct_count, wrong_count
+  FROM words ORDER BY id LIMIT ?
+'''
+
+def make_database(rows, seed=42):
+  conn = sqlite3.connect(':memory:')
+  conn.execute('''
+    CREATE TABLE words (
+      id INTEGER PRIMARY KEY, german TEXT, pronunciation TEXT, english TEXT, article TEXT,
+      word_type TEXT, additional_info TEXT, correct_count INTEGER DEFAULT 0, wrong_count INTEGER DEFAULT 0
+    )
+  ''')
+  rng = random.Random(seed)
+  conn.executemany('''
+    INSERT INTO words (german, pronunciation, english, article, word_type, additional_info, correct_count, wrong_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+  ''', [make_word(rng, i) + (rng.randint(0, 20), rng.randint(0, 20)) for i in range(rows)])
+  return conn
+
+def legacy_body(conn, provider, rows):
+  cursor = conn.cursor()
+  cursor.row_factory = sqlite3.Row
+  words = []
+  for word in cursor.execute(QUERY, (rows,)).fetchall():
+    words.append({
+      'id': word[0],
+      'german': word[1],
+      'pronunciation': word[2],
+      'english': word[3],
+      'article': word[4],
+      'word_type': word[5],
+      'additional_info': json.loads(word[6]) if word[6] else {},
+      'correct_count': word[7],
+      'wrong_count': word[8]
+    })
+  return provider.response({'status': 'success', 'data': {'words': words}}).get_data()
+
+def shared_body(conn, provider, rows):
+  cursor = conn.cursor()
+  cursor.row_factory = row_factory(raw=('additional_info',))
+  words = cursor.execute(QUERY, (rows,)).fetchall()
+  return provider.response({'status': 'success', 'data': {'words': words}}).get_data()
+
+PATHS = {'legacy': (legacy_body, DefaultJSONProvider), 'shared': (shared_body, JSONProvider)}
+
+def measure(rows, repeat=20):
+  """Return {path: {'ms': best total, 'us_per_row': ..., 'bytes': ...}} for `rows` rows."""
+  conn = make_database(rows)
+  app = Flask(__name__)
+  results = {}
+  try:
+    for name, (body, provider_class) in PATHS.items():
+      provider = provider_class(app)
+      with app.app_context():
+        size = len(body(conn, provider, rows))  # warm up
+        best = None
+        for _ in range(repeat):
+          started = time.perf_counter()
+          body(conn, provider, rows)
+          elapsed = time.perf_counter() - started
+          best = elapsed if best is None else min(best, elapsed)
+      results[name] = {
+        'ms': round(best * 1000, 3),
+        'us_per_row': round(best * 1e6 / rows, 2),
+        'bytes': size
+      }
+  finally:
+    conn.close()
+  return results
+
+def run(args):
+  encoder = f'orjson {orjson.__version__}' if orjson is not None else 'stdlib json (orjson not installed)'
+  print(f'encoder: {encoder}')
+  print(f"{'rows':>6} {'path':<8} {'total ms':>9} {'us/row':>8} {'bytes':>9}")
+  report = {}
+  for rows in args.rows or [50, 5000]:
+    report[rows] = measure(rows, repeat=args.repeat)
+    for name, result in report[rows].items():
+      print(f"{rows:>6} {name:<8} {result['ms']:>9.3f} {result['us_per_row']:>8.2f} {result['bytes']:>9}")
+    speedup = report[rows]['legacy']['ms'] / max(report[rows]['shared']['ms'], 1e-9)
+    print(f'{rows:>6} speedup  {speedup:.2f}x')
+  if args.json:
+    with open(args.json, 'w') as f:
+      json.dump({'encoder': encoder, 'results': report}, f, indent=2)
+  return 0
+
+def parse_args(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--rows', type=int, action='append', help='Response size in rows (repeatable; default 50 and 5000)')
+  parser.add_argument('--repeat', type=int, default=20, help='Timed runs per size and path; the best is kept')
+  parser.add_argument('--json', help='Also write the results to this file')
+  return parser.parse_args(argv)
+
+if __name__ == '__main__':
+  sys.exit(run(parse_args()))
@@ -0,0 +1,39 @@
+"""gunicorn settings for lang-portal: gunicorn -c gunicorn.conf.py wsgi:app
+
+Preforked gthread workers share the state warmed in the master (response
+cache, group index) copy-on-write. Each worker starts its own job and
+review-buffer threads and SQLite connections after the fork, and drains
+them on shutdown.
+"""
+import multiprocessing
+import os
+
+from lib.server import after_fork, before_fork, drain
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+# SQLite has a single writer, so more processes than cores only add lock waits
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+# Seconds a worker may go silent before it is restarted, and seconds given to
+# in-flight requests (and running jobs) on SIGTERM or a reload
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+# Recycle workers after this many requests (0: never)
+max_requests = int(os.environ.get('MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+accesslog = os.environ.get('ACCESS_LOG') or None
+
+def pre_fork(server, worker):
+    from wsgi import app
+    before_fork(app)
+
+def post_fork(server, worker):
+    from wsgi import app
+    after_fork(app)
+
+def worker_exit(server, worker):
+    from wsgi import app
+    drain(app, timeout=graceful_timeout)
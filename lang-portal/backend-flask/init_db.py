@@ -3,6 +3,8 @@ import os
 import json
 from pathlib import Path
 
+from lib.migrations import migrate
+
 def init_db():
     # Get the absolute path to the database file
     base_dir = Path(__file__).resolve().parent
@@ -91,6 +93,10 @@ def init_db():
 
     conn.commit()
     conn.close()
+
+    # Bring the fresh schema up to the latest migration
+    print("Applying migrations...")
+    migrate(str(db_path))
     print("Database initialized successfully!")
 
 if __name__ == '__main__':
@@ -0,0 +1,286 @@
+import csv
+import json
+import logging
+import os
+import time
+from itertools import islice
+
+from lib.cache import bump_versions
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ('german', 'english', 'word_type')
+
+class JsonStream:
+  """Incrementally yield the records of a large JSON document.
+
+  Supports a top-level array of records, or a top-level object whose values
+  are arrays of records (the seed file layout, e.g. {"verbs": [...]}). Only
+  one record is held in memory at a time.
+  """
+
+  def __init__(self, file, chunk_size=64 * 1024):
+    self.file = file
+    self.chunk_size = chunk_size
+    self.decoder = json.JSONDecoder()
+    self.buffer = ''
+    self.pos = 0
+    self.eof = False
+
+  def _fill(self):
+    chunk = self.file.read(self.chunk_size)
+    if not chunk:
+      self.eof = True
+      return False
+    # Drop the consumed prefix so memory stays bounded
+    self.buffer = self.buffer[self.pos:] + chunk
+    self.pos = 0
+    return True
+
+  def _peek(self):
+    """Return the next non-whitespace character without consuming it."""
+    while True:
+      while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+        self.pos += 1
+      if self.pos < len(self.buffer):
+        return self.buffer[self.pos]
+      if not self._fill():
+        return ''
+
+  def _expect(self, char):
+    if self._peek() != char:
+      raise ValueError(f'Expected {char!r} in JSON stream')
+    self.pos += 1
+
+  def _value(self):
+    """Decode the next complete JSON value, reading more input as needed."""
+    self._peek()
+    while True:
+      try:
+        value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        # A value ending exactly at the buffer edge may be a truncated number
+        if end < len(self.buffer) or self.eof:
+          self.pos = end
+          return value
+      except json.JSONDecodeError:
+        if self.eof:
+          raise
+      self._fill()
+
+  def _array(self):
+    self._expect('[')
+    if self._peek() == ']':
+      self.pos += 1
+      return
+    while True:
+      yield self._value()
+      char = self._peek()
+      self.pos += 1
+      if char == ']':
+        return
+      if char != ',':
+        raise ValueError('Expected , or ] in JSON array')
+
+  def __iter__(self):
+    return self.records()
+
+  def records(self, key=None):
+    """Yield records, optionally only from the array stored under `key`."""
+    char = self._peek()
+    if char == '[':
+      yield from self._array()
+      return
+    self._expect('{')
+    if self._peek() == '}':
+      return
+    while True:
+      name = self._value()
+      self._expect(':')
+      if self._peek() == '[' and (key is None or name == key):
+        yield from self._array()
+      else:
+        self._value()
+      char = self._peek()
+      self.pos += 1
+      if char == '}':
+        return
+      if char != ',':
+        raise ValueError('Expected , or } in JSON object')
+
+def detect_format(path):
+  extension = os.path.splitext(path)[1].lower()
+  if extension in ('.jsonl', '.ndjson'):
+    return 'jsonl'
+  if extension == '.csv':
+    return 'csv'
+  return 'json'
+
+def read_records(path, file_format=None, key=None):
+  """Stream raw word records from a JSON, JSONL or CSV file."""
+  file_format = file_format or detect_format(path)
+  with open(path, 'r', encoding='utf-8', newline='' if file_format == 'csv' else None) as file:
+    if file_format == 'jsonl':
+      for line in file:
+        if line.strip():
+          yield json.loads(line)
+    elif file_format == 'csv':
+      yield from csv.DictReader(file)
+    elif file_format == 'json':
+      yield from JsonStream(file).records(key)
+    else:
+      raise ValueError(f'Unsupported import format: {file_format}')
+
+def normalize_record(record):
+  """Map a raw record to a words row tuple, or None if it is unusable."""
+  if not isinstance(record, dict) or any(not record.get(field) for field in REQUIRED_FIELDS):
+    return None
+  additional_info = record.get('additional_info') or {}
+  if isinstance(additional_info, str):
+    try:
+      additional_info = json.loads(additional_info)
+    except ValueError:
+      additional_info = {}
+  return (
+    record['german'].strip(),
+    record.get('pronunciation') or None,
+    record['english'].strip(),
+    record.get('article') or None,
+    record['word_type'].strip(),
+    json.dumps(additional_info)
+  )
+
+def group_tables(cursor):
+  """Return (group_table, link_table) for this database's grouping schema.
+
+  Older databases keep groups in `groups` linked through
+  word_groups(word_id, group_id); newer ones keep named groups in
+  `word_groups` linked through word_group_assignments.
+  """
+  cursor.execute('PRAGMA table_info(word_groups)')
+  columns = {row[1] for row in cursor.fetchall()}
+  if 'word_id' in columns:
+    return 'groups', 'word_groups'
+  return 'word_groups', 'word_group_assignments'
+
+def bulk_import_words(conn, records, group_name=None, batch_size=1000):
+  """Import word records in a single transaction.
+
+  Records are staged with executemany in batches, then copied into `words`
+  skipping any (german, word_type) pair that already exists or repeats in the
+  input. When `group_name` is given every imported or matching word is linked
+  to that group and its words_count is recomputed once at the end.
+
+  Returns a dict of counts plus elapsed seconds and rows per second.
+  """
+  started = time.perf_counter()
+  cursor = conn.cursor()
+  read = skipped = 0
+
+  def normalized():
+    nonlocal read, skipped
+    for record in records:
+      read += 1
+      row = normalize_record(record)
+      if row is None:
+        skipped += 1
+        continue
+      yield row
+
+  try:
+    if conn.in_transaction:
+      conn.commit()
+    cursor.execute('BEGIN')
+    cursor.execute('''
+      CREATE TEMP TABLE IF NOT EXISTS import_words (
+        german TEXT NOT NULL,
+        pronunciation TEXT,
+        english TEXT NOT NULL,
+        article TEXT,
+        word_type TEXT NOT NULL,
+        additional_info TEXT
+      )
+    ''')
+    cursor.execute('DELETE FROM import_words')
+
+    rows = normalized()
+    while True:
+      batch = list(islice(rows, batch_size))
+      if not batch:
+        break
+      cursor.executemany('''
+        INSERT INTO import_words (german, pronunciation, english, article, word_type, additional_info)
+        VALUES (?, ?, ?, ?, ?, ?)
+      ''', batch)
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS temp.idx_import_words_key ON import_words(german, word_type)')
+
+    # First occurrence wins for duplicates inside the file
+    cursor.execute('''
+      INSERT INTO words (german, pronunciation, english, article, word_type, additional_info)
+      SELECT german, pronunciation, english, article, word_type, additional_info
+      FROM import_words s
+      WHERE s.rowid IN (SELECT MIN(rowid) FROM import_words GROUP BY german, word_type)
+        AND NOT EXISTS (
+          SELECT 1 FROM words w WHERE w.german = s.german AND w.word_type = s.word_type
+        )
+      ORDER BY s.rowid
+    ''')
+    inserted = cursor.rowcount
+    cursor.execute('SELECT COUNT(*) FROM import_words')
+    staged = cursor.fetchone()[0]
+
+    linked = 0
+    if group_name:
+      group_table, link_table = group_tables(cursor)
+      cursor.execute(f'INSERT OR IGNORE INTO {group_table} (name) VALUES (?)', (group_name,))
+      cursor.execute(f'SELECT id FROM {group_table} WHERE name = ?', (group_name,))
+      group_id = cursor.fetchone()[0]
+      cursor.execute(f'''
+        INSERT INTO {link_table} (word_id, group_id)
+        SELECT DISTINCT w.id, ?
+        FROM import_words s
+        JOIN words w ON w.german = s.german AND w.word_type = s.word_type
+        WHERE NOT EXISTS (
+          SELECT 1 FROM {link_table} l WHERE l.word_id = w.id AND l.group_id = ?
+        )
+      ''', (group_id, group_id))
+      linked = cursor.rowcount
+
+      # Refresh the counter cache once rather than per inserted link
+      if group_table == 'groups':
+        cursor.execute(f'''
+          UPDATE groups
+          SET words_count = (SELECT COUNT(*) FROM {link_table} WHERE group_id = ?)
+          WHERE id = ?
+        ''', (group_id, group_id))
+
+    cursor.execute('DELETE FROM import_words')
+    bump_versions(cursor, 'words', *group_tables(cursor))
+    conn.commit()
+  except Exception:
+    conn.rollback()
+    raise
+  finally:
+    cursor.close()
+
+  seconds = time.perf_counter() - started
+  stats = {
+    'read': read,
+    'skipped': skipped,
+    'inserted': inserted,
+    'duplicates': staged - inserted,
+    'linked': linked,
+    'seconds': round(seconds, 3),
+    'rows_per_sec': round(read / seconds) if seconds > 0 else read
+  }
+  logger.info(f"Imported {inserted} of {read} words in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec)")
+  return stats
+
+def import_file(conn, path, group_name=None, file_format=None, key=None, batch_size=1000):
+  """Stream a vocabulary file into the database. See bulk_import_words."""
+  return bulk_import_words(
+    conn,
+    read_records(path, file_format=file_format, key=key),
+    group_name=group_name,
+    batch_size=batch_size
+  )
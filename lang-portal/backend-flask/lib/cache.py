@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, make_response, request
+
+def bump_versions(cursor, *tables):
+  """Invalidate cached responses that read from `tables`.
+
+  Call inside the writing transaction, before commit, so readers never see
+  new data under an old version. Versions live in the database, so every
+  worker process sees the bump.
+  """
+  cursor.executemany('''
+    INSERT INTO cache_versions (name, version) VALUES (?, 1)
+    ON CONFLICT (name) DO UPDATE SET version = version + 1
+  ''', [(table,) for table in tables])
+
+def table_versions(cursor, tables):
+  cursor.execute(
+    'SELECT name, version FROM cache_versions WHERE name IN (SELECT value FROM json_each(?))',
+    (json.dumps(list(tables)),)
+  )
+  versions = dict(cursor.fetchall())
+  return tuple(versions.get(table, 0) for table in tables)
+
+class ResponseCache:
+  """In-process LRU of serialized GET responses keyed on path plus query args.
+
+  Each entry remembers the write versions of the tables it was built from; a
+  version bump makes it stale. Responses carry an ETag derived from the key
+  and versions, so a matching If-None-Match is answered with 304 before the
+  view, SQLite or the JSON encoder run.
+  """
+
+  def __init__(self, db, max_entries=512):
+    self.db = db
+    self.max_entries = max_entries
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def _get(self, key, versions):
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None or entry[0] != versions:
+        self.misses += 1
+        return None
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return entry
+
+  def _put(self, key, versions, body, mimetype):
+    with self._lock:
+      self._entries[key] = (versions, body, mimetype)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+  def cached(self, *tables):
+    """Decorate a GET view whose output depends only on `tables` and the request URL."""
+    def decorator(view):
+      @wraps(view)
+      def wrapper(*args, **kwargs):
+        if request.method != 'GET':
+          return view(*args, **kwargs)
+
+        key = request.path + '?' + urlencode(sorted(request.args.items(multi=True)))
+        versions = table_versions(self.db.cursor(), tables)
+        etag = hashlib.sha1(f'{key}|{versions}'.encode('utf-8')).hexdigest()[:20]
+
+        if etag in request.if_none_match:
+          response = Response(status=304)
+          response.set_etag(etag)
+          return response
+
+        entry = self._get(key, versions)
+        if entry is not None:
+          _, body, mimetype = entry
+          response = Response(body, status=200, mimetype=mimetype)
+        else:
+          response = make_response(view(*args, **kwargs))
+          if response.status_code != 200:
+            return response
+          self._put(key, versions, response.get_data(), response.mimetype)
+        response.set_etag(etag)
+        return response
+      return wrapper
+    return decorator
@@ -0,0 +1,71 @@
+def rebuild_dashboard_stats(cursor):
+  """Recompute every dashboard rollup from the base tables.
+
+  The triggers keep the rollups current on inserts; call this after bulk
+  deletes such as resetting the study history. Does not commit.
+  """
+  cursor.execute('DELETE FROM dashboard_word_stats')
+  cursor.execute('''
+    INSERT INTO dashboard_word_stats (word_id, attempts, correct)
+    SELECT wri.word_id, COUNT(*), SUM(wri.correct = 1)
+    FROM word_review_items wri
+    JOIN study_sessions ss ON wri.study_session_id = ss.id
+    GROUP BY wri.word_id
+  ''')
+
+  cursor.execute('DELETE FROM daily_group_activity')
+  cursor.execute('''
+    INSERT INTO daily_group_activity (study_date, group_id)
+    SELECT DISTINCT date(created_at), group_id
+    FROM study_sessions
+    WHERE group_id IS NOT NULL
+  ''')
+
+  cursor.execute('DELETE FROM daily_activity')
+  cursor.execute('''
+    INSERT INTO daily_activity (study_date, sessions_count)
+    SELECT date(created_at), COUNT(*)
+    FROM study_sessions
+    GROUP BY date(created_at)
+  ''')
+  cursor.execute('''
+    INSERT INTO daily_activity (study_date, reviews_count, correct_count)
+    SELECT date(wri.created_at), COUNT(*), SUM(wri.correct = 1)
+    FROM word_review_items wri
+    JOIN study_sessions ss ON wri.study_session_id = ss.id
+    GROUP BY date(wri.created_at)
+    ON CONFLICT (study_date) DO UPDATE SET
+      reviews_count = excluded.reviews_count,
+      correct_count = excluded.correct_count
+  ''')
+
+  # Streaks chain day to day, so walk the study days in order once
+  cursor.execute('''
+    SELECT study_date, julianday(study_date) AS day
+    FROM daily_activity
+    WHERE sessions_count > 0
+    ORDER BY study_date
+  ''')
+  streaks = []
+  previous_day, streak = None, 0
+  for study_date, day in cursor.fetchall():
+    streak = streak + 1 if previous_day is not None and day - previous_day == 1 else 1
+    previous_day = day
+    streaks.append((streak, study_date))
+  cursor.executemany('UPDATE daily_activity SET streak = ? WHERE study_date = ?', streaks)
+
+  cursor.execute('''
+    INSERT OR REPLACE INTO dashboard_stats (
+      id, total_vocabulary, total_sessions, total_reviews, correct_reviews,
+      total_words_studied, mastered_words
+    )
+    SELECT
+      1,
+      (SELECT COUNT(*) FROM words),
+      (SELECT COUNT(*) FROM study_sessions),
+      COALESCE(SUM(attempts), 0),
+      COALESCE(SUM(correct), 0),
+      COUNT(*),
+      COALESCE(SUM(attempts >= 5 AND correct * 1.0 / attempts >= 0.8), 0)
+    FROM dashboard_word_stats
+  ''')
@@ -3,18 +3,284 @@ import json
 from flask import g
 import os
 import logging
+import queue
+import threading
+from contextlib import contextmanager
+from itertools import groupby
 from threading import local
 
-  # Setup logging
-logging.basicConfig(
-      level=logging.DEBUG,
-      format='%(asctime)s - %(levelname)s - %(message)s',
-      datefmt='%Y-%m-%d %H:%M:%S'
-  )
+from lib.bulk_import import import_file
+from lib.cache import bump_versions
+from lib.dashboard import rebuild_dashboard_stats
+from lib.migrations import migrate
+from lib.serialization import row_factory
+
 logger = logging.getLogger(__name__)
 
+class PoolTimeoutError(sqlite3.OperationalError):
+  """Raised when no pooled connection becomes available within the checkout timeout."""
+
+
+class ConnectionPool:
+  """A bounded pool of SQLite connections opened in WAL mode.
+
+  Connections are created lazily up to `size`, handed out to one thread at a
+  time and health checked with a cheap `SELECT 1` before every checkout.
+  """
+
+  PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA foreign_keys = ON',
+    'PRAGMA temp_store = MEMORY',
+  )
+
+  def __init__(self, database, size=5, timeout=10.0, cache_size_kb=20000, mmap_size=256 * 1024 * 1024, busy_timeout_ms=5000, profiler=None):
+    self.database = database
+    self.profiler = profiler
+    self.size = size
+    self.timeout = timeout
+    self.cache_size_kb = cache_size_kb
+    self.mmap_size = mmap_size
+    self.busy_timeout_ms = busy_timeout_ms
+    self._idle = queue.LifoQueue()
+    self._slots = threading.BoundedSemaphore(size)
+    self._lock = threading.Lock()
+    self._all = {}  # Every open connection, with the dispose generation it was opened in
+    self._generation = 0
+
+  def _open(self):
+    """Open a new connection and apply the tuning pragmas."""
+    connect = self.profiler.connect if self.profiler else sqlite3.connect
+    conn = connect(
+      self.database,
+      timeout=self.busy_timeout_ms / 1000,
+      check_same_thread=False  # Connections move between request threads
+    )
+    conn.row_factory = sqlite3.Row  # Enable dictionary-like access to rows
+    # Close each cursor: pragmas that report their new value would otherwise
+    # leave a statement open (profiled cursors outlive the call) and block commit
+    for pragma in (
+      *self.PRAGMAS,
+      f'PRAGMA cache_size = -{int(self.cache_size_kb)}',
+      f'PRAGMA mmap_size = {int(self.mmap_size)}',
+      f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}'
+    ):
+      conn.execute(pragma).close()
+    with self._lock:
+      self._all[conn] = self._generation
+    return conn
+
+  def _discard(self, conn):
+    with self._lock:
+      self._all.pop(conn, None)
+    try:
+      conn.close()
+    except sqlite3.Error:
+      pass
+
+  def _healthy(self, conn):
+    try:
+      conn.execute('SELECT 1').fetchone()
+      return True
+    except sqlite3.Error:
+      return False
+
+  def checkout(self):
+    """Borrow a connection, waiting up to `timeout` seconds for a free slot."""
+    if not self._slots.acquire(timeout=self.timeout):
+      raise PoolTimeoutError(
+        f'No database connection available after {self.timeout}s (pool size {self.size})'
+      )
+    try:
+      while True:
+        try:
+          conn = self._idle.get_nowait()
+        except queue.Empty:
+          return self._open()
+        if self._healthy(conn):
+          return conn
+        logger.warning('Discarding unhealthy pooled connection')
+        self._discard(conn)
+    except Exception:
+      self._slots.release()
+      raise
+
+  def checkin(self, conn):
+    """Return a connection to the pool, rolling back any open transaction.
+
+    A connection checked out before the last dispose() is closed instead.
+    """
+    if self.profiler:
+      self.profiler.flush()
+    try:
+      with self._lock:
+        disposed = self._all.get(conn, -1) < self._generation
+      if disposed:
+        self._discard(conn)
+        return
+      if conn.in_transaction:
+        conn.rollback()
+      self._idle.put(conn)
+    except sqlite3.Error:
+      self._discard(conn)
+    finally:
+      self._slots.release()
+
+  def dispose(self):
+    """Close every idle connection. Checked-out connections are closed on checkin.
+
+    The pool stays usable: later checkouts open fresh connections.
+    """
+    with self._lock:
+      self._generation += 1
+    while True:
+      try:
+        conn = self._idle.get_nowait()
+      except queue.Empty:
+        break
+      self._discard(conn)
+
+  def stats(self):
+    with self._lock:
+      opened = len(self._all)
+    return {
+      'size': self.size,
+      'opened': opened,
+      'idle': self._idle.qsize(),
+    }
+
+
+class ReviewBuffer:
+  """Write-behind staging for review events with periodic group commits.
+
+  stage() only inserts into review_buffer (no triggers, aggregates or
+  schedule updates) and the caller commits as usual. A flusher thread folds
+  staged rows into word_review_items, word_reviews and the schedules with
+  `apply(cursor, session_id, reviews)` every `interval_ms`, or as soon as
+  `max_events` are pending, deleting them in the same transaction. Staged
+  rows are durable like any other commit, so a crash loses nothing: the
+  next flush in any process applies them.
+  """
+
+  def __init__(self, db, apply, interval_ms=200, max_events=500):
+    self.db = db
+    self.apply = apply
+    self.interval_ms = interval_ms
+    self.max_events = max_events
+    self.flushes = 0
+    self.flushed_events = 0
+    self._pending = 0
+    self._lock = threading.Lock()
+    self._wake = threading.Event()
+    self._stopping = threading.Event()
+    self._thread = None
+    self._pid = None
+
+  def stage(self, cursor, session_id, reviews):
+    """Stage (word_id, correct, reviewed_at) tuples for the next flush. Does not commit."""
+    cursor.executemany('''
+      INSERT INTO review_buffer (study_session_id, word_id, correct, created_at)
+      VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+    ''', [(session_id, word_id, bool(correct), reviewed_at) for word_id, correct, reviewed_at in reviews])
+    bump_versions(cursor, 'word_reviews', 'word_review_items')
+    self.start()
+    with self._lock:
+      self._pending += len(reviews)
+      if self._pending >= self.max_events:
+        self._wake.set()
+
+  def flush(self, wait=False):
+    """Apply every staged review in one transaction and return how many were applied.
+
+    Uses its own pooled connection, so the calling thread must not hold an
+    open write transaction. An idle buffer is normally detected without taking
+    the write lock; `wait` skips that check so the flush queues behind a
+    staging transaction that has not committed yet.
+    """
+    conn = self.db.pool.checkout()
+    try:
+      if not wait and not conn.execute('SELECT EXISTS (SELECT 1 FROM review_buffer)').fetchone()[0]:
+        return 0
+      conn.execute('BEGIN IMMEDIATE')
+      rows = conn.execute('''
+        SELECT rb.id, rb.study_session_id, rb.word_id, rb.correct, rb.created_at,
+               ss.id IS NOT NULL AND w.id IS NOT NULL AS valid
+        FROM review_buffer rb
+        LEFT JOIN study_sessions ss ON ss.id = rb.study_session_id
+        LEFT JOIN words w ON w.id = rb.word_id
+        ORDER BY rb.id
+      ''').fetchall()
+      if not rows:
+        conn.rollback()
+        return 0
+
+      # Reviews whose session or word was deleted meanwhile are dropped
+      valid = [row for row in rows if row['valid']]
+      if len(valid) < len(rows):
+        logger.warning(f'Dropping {len(rows) - len(valid)} staged review(s) for deleted sessions or words')
+
+      # Apply consecutive runs per session so schedules see answers in order
+      cursor = conn.cursor()
+      for session_id, run in groupby(valid, key=lambda row: row['study_session_id']):
+        self.apply(cursor, session_id, [(row['word_id'], row['correct'], row['created_at']) for row in run])
+      cursor.execute('DELETE FROM review_buffer WHERE id <= ?', (rows[-1]['id'],))
+      conn.commit()
+    except Exception:
+      conn.rollback()
+      raise
+    finally:
+      self.db.pool.checkin(conn)
+
+    with self._lock:
+      self.flushes += 1
+      self.flushed_events += len(valid)
+    return len(valid)
+
+  def _run(self):
+    while not self._stopping.is_set():
+      # stage() wakes the flusher before its caller commits, so a woken
+      # flush waits for the write lock instead of finding nothing yet
+      woken = self._wake.wait(self.interval_ms / 1000)
+      self._wake.clear()
+      with self._lock:
+        self._pending = 0
+      try:
+        self.flush(wait=woken and not self._stopping.is_set())
+      except Exception as e:
+        logger.error(f'Review buffer flush failed: {str(e)}')
+
+  def start(self):
+    """Start the flusher thread once per process (again after a fork)."""
+    with self._lock:
+      if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+        return
+      self._pid = os.getpid()
+      self._stopping.clear()
+      self._thread = threading.Thread(target=self._run, name='review-buffer', daemon=True)
+      self._thread.start()
+
+  def stop(self):
+    """Stop the flusher and apply whatever is still staged."""
+    self._stopping.set()
+    self._wake.set()
+    if self._thread:
+      self._thread.join()
+      self._thread = None
+    self.flush()
+
+  def stats(self):
+    with self._lock:
+      return {
+        'interval_ms': self.interval_ms,
+        'max_events': self.max_events,
+        'flushes': self.flushes,
+        'flushed_events': self.flushed_events,
+      }
+
+
 class Db:
-  def __init__(self, database_url='sqlite:///data/lang_portal.db'):
+  def __init__(self, database_url='sqlite:///data/lang_portal.db', pool_size=5, pool_timeout=10.0, profiler=None):
     # Extract the database path from the URL
     if database_url.startswith('sqlite:///'):
       self.database = database_url[10:]  # Remove 'sqlite:///'
@@ -27,6 +293,9 @@ class Db:
     if data_dir and not os.path.exists(data_dir):
       os.makedirs(data_dir)
 
+    self.pool = ConnectionPool(self.database, size=pool_size, timeout=pool_timeout, profiler=profiler)
+    self.review_buffer = None  # Set by enable_review_buffer()
+
   @property
   def connection(self):
     """Get thread-local connection."""
@@ -38,14 +307,21 @@ class Db:
     self._local.connection = value
 
   def connect(self):
-    """Create a database connection."""
+    """Check a connection out of the pool for the current thread."""
     if self.connection is None:
-      self.connection = sqlite3.connect(self.database)
-      self.connection.row_factory = sqlite3.Row  # Enable dictionary-like access to rows
-      # Enable foreign key support
-      self.connection.execute('PRAGMA foreign_keys = ON')
+      self.connection = self.pool.checkout()
     return self.connection
 
+  @contextmanager
+  def get(self):
+    """Yield the current thread's pooled connection, rolling back on error."""
+    conn = self.connect()
+    try:
+      yield conn
+    except Exception:
+      conn.rollback()
+      raise
+
   def cursor(self):
     """Get a cursor from the database connection."""
     return self.connect().cursor()
@@ -61,11 +337,18 @@ class Db:
       self.connection.rollback()
 
   def close(self):
-    """Close the database connection."""
+    """Return the thread's connection to the pool."""
     if self.connection:
-      self.connection.close()
+      self.pool.checkin(self.connection)
       self.connection = None
 
+  def dispose(self):
+    """Close the thread's connection and every idle pooled connection."""
+    self.close()
+    if self.review_buffer:
+      self.review_buffer.stop()
+    self.pool.dispose()
+
   def __enter__(self):
     """Context manager entry.
     Returns self so that we can use both self.execute() and self.cursor()
@@ -84,6 +367,25 @@ class Db:
     """Execute SQL directly on the connection."""
     return self.connect().execute(sql, parameters)
 
+  def fetch_rows(self, sql, parameters=(), raw=()):
+    """Run a query and return its rows as dicts ready to encode.
+
+    Columns are keyed by name; those in `raw` hold JSON text and are passed
+    through undecoded (see lib.serialization.row_factory).
+    """
+    cursor = self.cursor()
+    cursor.row_factory = row_factory(raw)
+    return cursor.execute(sql, parameters).fetchall()
+
+  def enable_review_buffer(self, apply, interval_ms=200, max_events=500):
+    """Stage reviews and group-commit them; see ReviewBuffer."""
+    self.review_buffer = ReviewBuffer(self, apply, interval_ms=interval_ms, max_events=max_events)
+    return self.review_buffer
+
+  def bump_versions(self, *tables):
+    """Invalidate cached responses built from `tables`. Call before commit."""
+    bump_versions(self.cursor(), *tables)
+
   def add_practice_word(self, session_id: int, german_word: str, english_translation: str, word_type: str, word_groups: list[str] = None):
     """Add a word to the practice_words table and optionally assign it to word groups."""
     try:
@@ -124,6 +426,7 @@ class Db:
                     VALUES (?, ?)
                 """, (word_id, group_id))
         
+        bump_versions(cursor, 'practice_words', 'word_groups', 'word_group_assignments')
         self.commit()
         logger.info(f"Successfully added practice word with ID: {word_id}")
         return word_id
@@ -179,7 +482,8 @@ class Db:
 
   # Function to load SQL from a file
   def sql(self, filepath):
-    with open('sql/' + filepath, 'r') as file:
+    sql_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql')
+    with open(os.path.join(sql_dir, filepath), 'r') as file:
       return file.read()
 
   # Function to load the words from a JSON file
@@ -216,6 +520,11 @@ class Db:
     cursor.execute(self.sql('setup/create_index_practice_words.sql'))
     self.commit()
 
+  def rebuild_dashboard_stats(self, cursor):
+    """Recompute every dashboard rollup from the base tables and commit."""
+    rebuild_dashboard_stats(cursor)
+    self.commit()
+
   def import_study_activities_json(self,cursor,data_json_path):
     study_activities = self.load_json(data_json_path)
     # Clear existing activities
@@ -224,67 +533,35 @@ class Db:
       cursor.execute('''
       INSERT INTO study_activities (name,url,preview_url) VALUES (?,?,?)
       ''', (activity['name'],activity['url'],activity['preview_url']))
+    bump_versions(cursor, 'study_activities')
     self.commit()
     print(f"Successfully imported {len(study_activities)} study activities")
 
   def import_word_json(self,cursor,group_name,data_json_path):
-      # Insert a new group
-      cursor.execute('''
-        INSERT INTO groups (name) VALUES (?)
-      ''', (group_name,))
-      self.commit()
-
-      # Get the ID of the group
-      cursor.execute('SELECT id FROM groups WHERE name = ?', (group_name,))
-      group_id = cursor.fetchone()[0]
-
-      # Load and parse JSON data
-      data = self.load_json(data_json_path)
       # Get the word list based on group name
       word_type = group_name.lower().split()[-1]  # 'Core Verbs' -> 'verbs'
-      words = data.get(word_type, [])
-
-      for word in words:
-        # Insert the word into the words table
-        cursor.execute('''
-          INSERT INTO words (german, pronunciation, english, article, word_type, additional_info) 
-          VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-          word['german'], 
-          word.get('pronunciation'), 
-          word['english'], 
-          word.get('article'), 
-          word['word_type'],
-          json.dumps(word.get('additional_info', {}))
-        ))
-        
-        # Get the last inserted word's ID
-        word_id = cursor.lastrowid
-
-        # Insert the word-group relationship into word_groups table
-        cursor.execute('''
-          INSERT INTO word_groups (word_id, group_id) VALUES (?, ?)
-        ''', (word_id, group_id))
-      self.commit()
 
-      # Update the words_count in the groups table
-      cursor.execute('''
-        UPDATE groups
-        SET words_count = (
-          SELECT COUNT(*) FROM word_groups WHERE group_id = ?
-        )
-        WHERE id = ?
-      ''', (group_id, group_id))
-
-      self.commit()
+      # Stream the words into the group in a single transaction
+      stats = import_file(
+        self.connect(),
+        data_json_path,
+        group_name=group_name,
+        key=word_type
+      )
 
-      print(f"Successfully added {len(words)} words to the '{group_name}' group.")
+      print(f"Successfully added {stats['inserted']} words to the '{group_name}' group "
+            f"({stats['duplicates']} duplicates skipped, {stats['rows_per_sec']} rows/sec).")
 
   # Initialize the database with sample data
   def init(self, app):
     with app.app_context():
       cursor = self.cursor()
       self.setup_tables(cursor)
+
+      # Bring the new schema up to the latest migration before importing, so
+      # the rollup, search and schedule triggers see the seed data
+      migrate(self.database)
+
       self.import_word_json(
         cursor=cursor,
         group_name='Core Verbs',
@@ -300,6 +577,7 @@ class Db:
         cursor=cursor,
         data_json_path='seed/study_activities.json'
       )
+      self.close()
 
 # Create an instance of the Db class
 db = Db()
@@ -0,0 +1,131 @@
+import logging
+import threading
+from collections import defaultdict
+
+from lib.bulk_import import group_tables
+
+logger = logging.getLogger(__name__)
+
+def to_bitmap(ids):
+  """Build a bitmap (a Python int with bit n set for id n) from word ids."""
+  if not ids:
+    return 0
+  buf = bytearray((max(ids) >> 3) + 1)
+  for i in ids:
+    buf[i >> 3] |= 1 << (i & 7)
+  return int.from_bytes(buf, 'little')
+
+def from_bitmap(bitmap):
+  """Return the ids set in `bitmap` in ascending order."""
+  bits = bin(bitmap)[:1:-1]  # lowest bit first, without the '0b' prefix
+  ids = []
+  i = bits.find('1')
+  while i != -1:
+    ids.append(i)
+    i = bits.find('1', i + 1)
+  return ids
+
+def parse_id_list(value, name):
+  try:
+    return [int(part) for part in value.split(',') if part.strip()] if value else []
+  except ValueError:
+    raise ValueError(f'{name} must be a comma-separated list of group ids')
+
+def group_filter_args(args):
+  """Read ?groups=&all_groups=&exclude_groups= into GroupIndex.select() keyword arguments.
+
+  Returns None when no group filter was requested; raises ValueError for
+  malformed lists or an exclusion without groups to exclude from.
+  """
+  selection = {
+    'any_of': parse_id_list(args.get('groups'), 'groups'),
+    'all_of': parse_id_list(args.get('all_groups'), 'all_groups'),
+    'none_of': parse_id_list(args.get('exclude_groups'), 'exclude_groups')
+  }
+  if not any(selection.values()):
+    return None
+  if not selection['any_of'] and not selection['all_of']:
+    raise ValueError('exclude_groups needs groups or all_groups')
+  return selection
+
+class GroupIndex:
+  """In-process word-group membership bitmaps.
+
+  One bitmap per group answers union, intersection and difference queries
+  with integer bit operations instead of joins on the link table. Word ids
+  are dense autoincrement keys, so a group costs at most one bit per word.
+
+  The index is built on first use and then kept current from
+  group_membership_log, which triggers on the link table append to: every
+  select() applies the log rows after the last one seen, so link changes
+  made by any process are picked up without a rebuild. If more than
+  `rebuild_after` changes are pending, or the log was pruned past the last
+  applied row, the index is rebuilt from the link table instead.
+  """
+
+  def __init__(self, db, rebuild_after=10000):
+    self.db = db
+    self.rebuild_after = rebuild_after
+    self._bitmaps = {}
+    self._seq = None  # Last applied group_membership_log.seq; None until built
+    self._lock = threading.Lock()
+    self.rebuilds = 0
+    self.applied = 0
+
+  def _rebuild(self, cursor):
+    # Read the log position first: changes committed in between are applied
+    # again on the next refresh, which is harmless as they replay in order
+    seq = cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM group_membership_log').fetchone()[0]
+    _, link_table = group_tables(cursor)
+    members = defaultdict(list)
+    for group_id, word_id in cursor.execute(f'SELECT group_id, word_id FROM {link_table}'):
+      members[group_id].append(word_id)
+    self._bitmaps = {group_id: to_bitmap(ids) for group_id, ids in members.items()}
+    self._seq = seq
+    self.rebuilds += 1
+    logger.debug(f'Rebuilt group index: {len(self._bitmaps)} groups up to log row {seq}')
+
+  def refresh(self):
+    """Bring the bitmaps up to date with the link table."""
+    with self._lock:
+      cursor = self.db.cursor()
+      if self._seq is None:
+        self._rebuild(cursor)
+        return
+      rows = cursor.execute('''
+        SELECT seq, group_id, word_id, added FROM group_membership_log
+        WHERE seq > ? ORDER BY seq LIMIT ?
+      ''', (self._seq, self.rebuild_after + 1)).fetchall()
+      if not rows:
+        return
+      if rows[0][0] != self._seq + 1 or len(rows) > self.rebuild_after:
+        self._rebuild(cursor)
+        return
+      bitmaps = self._bitmaps
+      for seq, group_id, word_id, added in rows:
+        bit = 1 << word_id
+        if added:
+          bitmaps[group_id] = bitmaps.get(group_id, 0) | bit
+        else:
+          bitmaps[group_id] = bitmaps.get(group_id, 0) & ~bit
+      self._seq = rows[-1][0]
+      self.applied += len(rows)
+
+  def select(self, any_of=(), all_of=(), none_of=()):
+    """Return the sorted ids of words in any group of `any_of`, every group
+    of `all_of` and no group of `none_of`. Unknown groups are empty."""
+    if not any_of and not all_of:
+      raise ValueError('select() needs any_of or all_of')
+    self.refresh()
+    bitmaps = self._bitmaps
+    result = None
+    if any_of:
+      result = 0
+      for group_id in any_of:
+        result |= bitmaps.get(group_id, 0)
+    for group_id in all_of:
+      bitmap = bitmaps.get(group_id, 0)
+      result = bitmap if result is None else result & bitmap
+    for group_id in none_of:
+      result &= ~bitmaps.get(group_id, 0)
+    return from_bitmap(result)
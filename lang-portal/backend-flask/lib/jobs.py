@@ -0,0 +1,223 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('succeeded', 'failed')
+
+class Job:
+  """The job a handler is running, with a way to report progress."""
+
+  def __init__(self, queue, id, kind, payload):
+    self.queue = queue
+    self.id = id
+    self.kind = kind
+    self.payload = payload
+
+  def progress(self, stage):
+    self.queue.update(self.id, stage=stage)
+
+class JobQueue:
+  """SQLite-backed job queue consumed by a pool of worker threads.
+
+  Jobs survive restarts: queued jobs are picked up by the next worker to
+  start, in any process sharing the database. A job left 'running' for
+  longer than `stale_after` seconds (its worker died) is marked failed
+  rather than re-run, since handlers such as the song-vocab agent call are
+  not idempotent.
+
+  Handlers run inside an app context and must not hold a pooled connection
+  across slow work. Queue bookkeeping checks out its own pooled connection
+  for every statement, so enqueueing from a request never commits, rolls
+  back or releases the request's connection.
+  """
+
+  def __init__(self, app, workers=2, poll_interval=1.0, stale_after=600):
+    self.app = app
+    self.db = app.db
+    self.workers = workers
+    self.poll_interval = poll_interval
+    self.stale_after = stale_after
+    self.handlers = {}
+    self.changed = threading.Condition()
+    self._stopping = threading.Event()
+    self._threads = []
+    self._pid = None
+    self._start_lock = threading.Lock()
+
+  def register(self, kind, handler):
+    """Register `handler(job)` for jobs of `kind`; its return value is stored as the result."""
+    self.handlers[kind] = handler
+
+  def _notify(self):
+    with self.changed:
+      self.changed.notify_all()
+
+  def _write(self, sql, parameters=()):
+    """Run one statement in its own short transaction on a dedicated pooled connection."""
+    conn = self.db.pool.checkout()
+    try:
+      cursor = conn.execute(sql, parameters)
+      conn.commit()
+      return cursor.rowcount
+    except Exception:
+      conn.rollback()
+      raise
+    finally:
+      self.db.pool.checkin(conn)
+
+  def enqueue(self, kind, payload):
+    """Queue a job and return its id.
+
+    The insert commits on its own connection, so the caller must not hold an
+    open write transaction.
+    """
+    if kind not in self.handlers:
+      raise ValueError(f'No handler registered for job kind {kind!r}')
+    job_id = uuid.uuid4().hex
+    self._write(
+      'INSERT INTO jobs (id, kind, payload) VALUES (?, ?, ?)',
+      (job_id, kind, json.dumps(payload))
+    )
+    self.start()
+    self._notify()
+    return job_id
+
+  def get(self, job_id):
+    conn = self.db.pool.checkout()
+    try:
+      row = conn.execute('''
+        SELECT id, kind, status, stage, result, error, created_at, started_at, finished_at, updated_at
+        FROM jobs WHERE id = ?
+      ''', (job_id,)).fetchone()
+    finally:
+      self.db.pool.checkin(conn)
+    if row is None:
+      return None
+    job = dict(row)
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+  def update(self, job_id, stage=None):
+    self._write('UPDATE jobs SET stage = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (stage, job_id))
+    self._notify()
+
+  def wait(self, job_id, timeout=None):
+    """Block until the job reaches a terminal status or `timeout` seconds pass; return it."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+      job = self.get(job_id)
+      if job is None or job['status'] in TERMINAL_STATUSES:
+        return job
+      remaining = None if deadline is None else deadline - time.monotonic()
+      if remaining is not None and remaining <= 0:
+        return job
+      # Notifications only reach waiters in this process; polling covers the rest
+      with self.changed:
+        self.changed.wait(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+
+  def _claim(self):
+    """Atomically move the oldest queued job to running and return it."""
+    conn = self.db.pool.checkout()
+    try:
+      conn.execute('BEGIN IMMEDIATE')
+      row = conn.execute('''
+        SELECT id, kind, payload FROM jobs WHERE status = 'queued' ORDER BY rowid LIMIT 1
+      ''').fetchone()
+      if row is None:
+        conn.rollback()
+        return None
+      conn.execute('''
+        UPDATE jobs
+        SET status = 'running', stage = 'started', started_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+      ''', (row['id'],))
+      conn.commit()
+      return Job(self, row['id'], row['kind'], json.loads(row['payload']))
+    except Exception:
+      conn.rollback()
+      raise
+    finally:
+      self.db.pool.checkin(conn)
+
+  def _finish(self, job_id, status, result=None, error=None):
+    self._write('''
+      UPDATE jobs
+      SET status = ?, result = ?, error = ?, finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+      WHERE id = ?
+    ''', (status, None if result is None else json.dumps(result), error, job_id))
+    self._notify()
+
+  def fail_stale(self):
+    failed = self._write('''
+      UPDATE jobs
+      SET status = 'failed', error = 'Interrupted: worker stopped while running the job',
+          finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+      WHERE status = 'running' AND updated_at < datetime('now', ?)
+    ''', (f'-{int(self.stale_after)} seconds',))
+    if failed:
+      logger.warning(f'Marked {failed} stale running job(s) as failed')
+      self._notify()
+
+  def run_one(self):
+    """Claim and run a single job. Returns False when the queue is empty."""
+    job = self._claim()
+    if job is None:
+      return False
+    handler = self.handlers.get(job.kind)
+    try:
+      if handler is None:
+        raise LookupError(f'No handler registered for job kind {job.kind!r}')
+      with self.app.app_context():
+        result = handler(job)
+      self._finish(job.id, 'succeeded', result=result)
+    except Exception as e:
+      logger.error(f'Job {job.id} ({job.kind}) failed: {str(e)}')
+      self._finish(job.id, 'failed', error=str(e))
+    return True
+
+  def _work(self):
+    idle_polls = 0
+    while not self._stopping.is_set():
+      try:
+        if self.run_one():
+          idle_polls = 0
+          continue
+        idle_polls += 1
+        if idle_polls % 60 == 1:
+          self.fail_stale()
+      except Exception as e:
+        logger.error(f'Job worker error: {str(e)}')
+      with self.changed:
+        self.changed.wait(self.poll_interval)
+
+  def start(self):
+    """Start the worker threads once per process (again after a fork)."""
+    if self.workers <= 0:
+      return
+    # Called from every request; the lock keeps concurrent first requests
+    # from each starting a pool of workers
+    with self._start_lock:
+      if self._pid == os.getpid() and any(t.is_alive() for t in self._threads):
+        return
+      self._pid = os.getpid()
+      self._stopping.clear()
+      self._threads = [
+        threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+        for i in range(self.workers)
+      ]
+      for thread in self._threads:
+        thread.start()
+
+  def stop(self, timeout=5.0):
+    """Stop taking new jobs and wait up to `timeout` seconds for running ones."""
+    with self._start_lock:
+      self._stopping.set()
+      self._notify()
+      for thread in self._threads:
+        thread.join(timeout)
+      self._threads = []
@@ -0,0 +1,155 @@
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql', 'migrations')
+
+_MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.(sql|py)$')
+
+class MigrationError(Exception):
+  """A migration failed; it was rolled back and later ones were not attempted."""
+
+class Migration:
+  """One file in sql/migrations: NNN_name.sql, or NNN_name.py defining upgrade(cursor)."""
+
+  def __init__(self, version, name, path):
+    self.version = version
+    self.name = name
+    self.path = path
+
+  @property
+  def checksum(self):
+    with open(self.path, 'rb') as f:
+      return hashlib.sha256(f.read()).hexdigest()
+
+  def apply(self, cursor):
+    if self.path.endswith('.py'):
+      spec = importlib.util.spec_from_file_location(f'migration_{self.version}', self.path)
+      module = importlib.util.module_from_spec(spec)
+      spec.loader.exec_module(module)
+      module.upgrade(cursor)
+    else:
+      with open(self.path) as f:
+        for statement in split_statements(f.read()):
+          cursor.execute(statement)
+
+def split_statements(script):
+  """Split an SQL script into statements for execute().
+
+  executescript() would commit the migration's transaction first, so the
+  script is cut at semicolons that end a complete statement (not those
+  inside strings or trigger bodies).
+  """
+  statement = ''
+  for piece in script.split(';'):
+    statement += piece + ';'
+    if sqlite3.complete_statement(statement):
+      if statement.strip(' \t\r\n;'):
+        yield statement
+      statement = ''
+  if statement.strip(' \t\r\n;'):
+    yield statement
+
+def discover(directory=MIGRATIONS_DIR):
+  """Return the migrations in `directory` ordered by version."""
+  migrations = {}
+  for entry in os.scandir(directory):
+    match = _MIGRATION_FILE.match(entry.name)
+    if not match:
+      continue
+    version = int(match.group(1))
+    if version in migrations:
+      raise MigrationError(f'Duplicate migration version {version}: {migrations[version].path}, {entry.path}')
+    migrations[version] = Migration(version, match.group(2), entry.path)
+  return [migrations[version] for version in sorted(migrations)]
+
+def setup_schema_migrations(conn):
+  # Look before creating so the up-to-date startup path never takes the write lock
+  if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'").fetchone():
+    return
+  conn.execute('''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+      version INTEGER PRIMARY KEY,
+      name TEXT NOT NULL,
+      checksum TEXT NOT NULL,
+      duration_ms REAL,
+      applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+  ''')
+
+def applied_versions(conn):
+  return {row[0]: row[1] for row in conn.execute('SELECT version, checksum FROM schema_migrations')}
+
+def pending(database, directory=MIGRATIONS_DIR):
+  """Migrations in `directory` not yet recorded in the database."""
+  conn = sqlite3.connect(database)
+  try:
+    setup_schema_migrations(conn)
+    applied = applied_versions(conn)
+  finally:
+    conn.close()
+  return [migration for migration in discover(directory) if migration.version not in applied]
+
+def migrate(database, directory=MIGRATIONS_DIR, busy_timeout=30.0):
+  """Apply pending migrations in version order and return the versions applied.
+
+  Each migration runs in its own BEGIN IMMEDIATE transaction together with
+  its schema_migrations row, so it is applied completely or not at all, and
+  concurrent processes starting up apply it once. Migration files must not
+  contain BEGIN/COMMIT. Foreign keys are off while migrating so tables can be
+  rebuilt, and checked before each commit.
+
+  With nothing pending this is one indexed read and a directory listing.
+  """
+  migrations = discover(directory)
+  conn = sqlite3.connect(database, timeout=busy_timeout, isolation_level=None)
+  try:
+    setup_schema_migrations(conn)
+    applied = applied_versions(conn)
+    for migration in migrations:
+      if migration.version in applied:
+        if applied[migration.version] != migration.checksum:
+          logger.warning(f'Migration {migration.version}_{migration.name} changed after it was applied')
+    todo = [migration for migration in migrations if migration.version not in applied]
+    if not todo:
+      return []
+
+    conn.execute('PRAGMA foreign_keys = OFF')
+    cursor = conn.cursor()
+    done = []
+    for migration in todo:
+      started = time.perf_counter()
+      cursor.execute('BEGIN IMMEDIATE')
+      try:
+        # Another process may have applied it while we waited for the lock
+        cursor.execute('SELECT 1 FROM schema_migrations WHERE version = ?', (migration.version,))
+        if cursor.fetchone():
+          cursor.execute('ROLLBACK')
+          continue
+        migration.apply(cursor)
+        if not conn.in_transaction:
+          raise MigrationError('Migrations must not commit their own transaction')
+        violations = cursor.execute('PRAGMA foreign_key_check').fetchall()
+        if violations:
+          raise MigrationError(f'Foreign key violations: {violations[:5]}')
+        duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        cursor.execute(
+          'INSERT INTO schema_migrations (version, name, checksum, duration_ms) VALUES (?, ?, ?, ?)',
+          (migration.version, migration.name, migration.checksum, duration_ms)
+        )
+        cursor.execute('COMMIT')
+      except Exception as e:
+        if conn.in_transaction:
+          cursor.execute('ROLLBACK')
+        raise MigrationError(f'Migration {migration.version}_{migration.name} failed: {e}') from e
+      logger.info(f'Applied migration {migration.version}_{migration.name} in {duration_ms}ms')
+      done.append(migration.version)
+    return done
+  finally:
+    conn.close()
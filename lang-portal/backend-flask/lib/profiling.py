@@ -0,0 +1,307 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, jsonify, request
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_sql(sql):
+  return _WHITESPACE.sub(' ', sql).strip()
+
+class Histogram:
+  """Fixed-bucket latency histogram, cumulative in the Prometheus sense on export."""
+
+  def __init__(self):
+    self.buckets = [0] * (len(BUCKETS_MS) + 1)
+    self.count = 0
+    self.sum_ms = 0.0
+    self.max_ms = 0.0
+
+  def observe(self, ms):
+    self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+    self.count += 1
+    self.sum_ms += ms
+    self.max_ms = max(self.max_ms, ms)
+
+  def quantile(self, q):
+    """Upper bound of the bucket holding the q-th observation (max for the overflow bucket)."""
+    if not self.count:
+      return None
+    target = q * self.count
+    seen = 0
+    for index, bucket in enumerate(self.buckets):
+      seen += bucket
+      if seen >= target:
+        return BUCKETS_MS[index] if index < len(BUCKETS_MS) else round(self.max_ms, 3)
+    return round(self.max_ms, 3)
+
+  def summary(self):
+    return {
+      'count': self.count,
+      'total_ms': round(self.sum_ms, 3),
+      'mean_ms': round(self.sum_ms / self.count, 3) if self.count else None,
+      'max_ms': round(self.max_ms, 3),
+      'p50_ms': self.quantile(0.5),
+      'p95_ms': self.quantile(0.95),
+      'p99_ms': self.quantile(0.99),
+    }
+
+class StatementStats:
+  def __init__(self, sql):
+    self.sql = sql
+    self.id = hashlib.sha1(sql.encode('utf-8')).hexdigest()[:12]
+    self.histogram = Histogram()
+    self.rows = 0
+    self.routes = set()
+    self.plan = None
+
+class ProfilingCursor(sqlite3.Cursor):
+  """Cursor that times each statement from execute() through its last fetch."""
+
+  _started = None
+
+  def _finish(self):
+    if self._started is not None:
+      elapsed_ms = (time.perf_counter() - self._started) * 1000
+      self._started = None
+      rows = self._rows if self._rows else max(self.rowcount, 0)
+      self.connection.profiler.record_statement(self, self._sql, self._parameters, elapsed_ms, rows)
+
+  def _start(self, sql, parameters):
+    self._finish()
+    self._sql = sql
+    self._parameters = parameters
+    self._rows = 0
+    self.connection.profiler.track(self)
+    self._started = time.perf_counter()
+
+  def execute(self, sql, parameters=()):
+    self._start(sql, parameters)
+    return super().execute(sql, parameters)
+
+  def executemany(self, sql, seq_of_parameters):
+    self._start(sql, None)
+    return super().executemany(sql, seq_of_parameters)
+
+  def executescript(self, sql_script):
+    self._finish()
+    return super().executescript(sql_script)
+
+  def fetchone(self):
+    row = super().fetchone()
+    if row is not None and self._started is not None:
+      self._rows += 1
+    return row
+
+  def fetchmany(self, size=None):
+    rows = super().fetchmany(self.arraysize if size is None else size)
+    if self._started is not None:
+      self._rows += len(rows)
+    return rows
+
+  def fetchall(self):
+    rows = super().fetchall()
+    if self._started is not None:
+      self._rows += len(rows)
+    return rows
+
+  def __next__(self):
+    row = super().__next__()
+    if self._started is not None:
+      self._rows += 1
+    return row
+
+  def close(self):
+    self._finish()
+    super().close()
+
+class ProfilingConnection(sqlite3.Connection):
+  """Connection whose cursors, including the implicit ones behind execute(), are profiled."""
+
+  profiler = None
+
+  def cursor(self, factory=ProfilingCursor):
+    return super().cursor(factory)
+
+  def execute(self, sql, parameters=()):
+    return self.cursor().execute(sql, parameters)
+
+  def executemany(self, sql, seq_of_parameters):
+    return self.cursor().executemany(sql, seq_of_parameters)
+
+class Profiler:
+  """Opt-in per-route and per-statement timing for the Flask app.
+
+  Statement time runs from execute() to the next execute/close on the same
+  cursor, or the end of the request, so it includes fetching. Slow SELECTs
+  get their EXPLAIN QUERY PLAN captured once. Results are served as JSON at
+  /api/debug/perf and as Prometheus text at /api/debug/perf/metrics.
+  """
+
+  def __init__(self, slow_ms=50.0, max_statements=500):
+    self.slow_ms = slow_ms
+    self.max_statements = max_statements
+    self._lock = threading.Lock()
+    self._local = threading.local()
+    self.reset()
+
+  def reset(self):
+    with self._lock:
+      self.routes = {}
+      self.statements = {}
+      self.started_at = time.time()
+
+  def connect(self, database, **kwargs):
+    conn = sqlite3.connect(database, factory=ProfilingConnection, **kwargs)
+    conn.profiler = self
+    return conn
+
+  def track(self, cursor):
+    pending = getattr(self._local, 'pending', None)
+    if pending is None:
+      pending = self._local.pending = set()
+    pending.add(cursor)
+
+  def flush(self):
+    """Close out statements still open on this thread's cursors."""
+    pending = getattr(self._local, 'pending', None)
+    while pending:
+      pending.pop()._finish()
+
+  def current_route(self):
+    return getattr(self._local, 'route', None)
+
+  def record_statement(self, cursor, sql, parameters, elapsed_ms, rows):
+    pending = getattr(self._local, 'pending', None)
+    if pending:
+      pending.discard(cursor)
+    sql = normalize_sql(sql)
+    route = self.current_route()
+    with self._lock:
+      stats = self.statements.get(sql)
+      if stats is None:
+        if len(self.statements) >= self.max_statements:
+          return
+        stats = self.statements[sql] = StatementStats(sql)
+      stats.histogram.observe(elapsed_ms)
+      stats.rows += rows
+      if route:
+        stats.routes.add(route)
+      is_query = sql[:6].upper() == 'SELECT' or sql[:4].upper() == 'WITH'
+      needs_plan = is_query and stats.plan is None and parameters is not None and elapsed_ms >= self.slow_ms
+      if needs_plan:
+        stats.plan = []  # Claim it so concurrent slow runs don't explain twice
+    if needs_plan:
+      stats.plan = self.explain(cursor.connection, sql, parameters)
+
+  def explain(self, conn, sql, parameters):
+    try:
+      plain = sqlite3.Cursor(conn)
+      plain.execute(f'EXPLAIN QUERY PLAN {sql}', parameters)
+      return [row[3] for row in plain.fetchall()]
+    except sqlite3.Error as e:
+      return [f'EXPLAIN failed: {e}']
+
+  def record_route(self, route, elapsed_ms, status):
+    with self._lock:
+      stats = self.routes.get(route)
+      if stats is None:
+        stats = self.routes[route] = {'histogram': Histogram(), 'statuses': {}}
+      stats['histogram'].observe(elapsed_ms)
+      stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+
+  def before_request(self):
+    rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+    self._local.route = f'{request.method} {rule}'
+    g.profile_started = time.perf_counter()
+
+  def after_request(self, response):
+    self.flush()
+    started = g.pop('profile_started', None)
+    if started is not None:
+      self.record_route(self.current_route(), (time.perf_counter() - started) * 1000, response.status_code)
+    self._local.route = None
+    return response
+
+  def report(self, limit=50):
+    with self._lock:
+      routes = sorted(self.routes.items(), key=lambda item: -item[1]['histogram'].sum_ms)
+      statements = sorted(self.statements.values(), key=lambda s: -s.histogram.sum_ms)[:limit]
+      return {
+        'since': self.started_at,
+        'slow_ms': self.slow_ms,
+        'routes': [{
+          'route': route,
+          **stats['histogram'].summary(),
+          'statuses': {str(code): count for code, count in stats['statuses'].items()}
+        } for route, stats in routes],
+        'statements': [{
+          'id': stats.id,
+          'sql': stats.sql,
+          **stats.histogram.summary(),
+          'rows': stats.rows,
+          'routes': sorted(stats.routes),
+          'plan': stats.plan
+        } for stats in statements]
+      }
+
+  def prometheus(self):
+    def label(value):
+      return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+    def histogram_lines(name, labels, histogram):
+      lines = []
+      cumulative = 0
+      for bound, count in zip(BUCKETS_MS + (None,), histogram.buckets):
+        cumulative += count
+        le = '+Inf' if bound is None else repr(bound / 1000)
+        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+      lines.append(f'{name}_sum{{{labels}}} {histogram.sum_ms / 1000}')
+      lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+      return lines
+
+    with self._lock:
+      lines = [
+        '# HELP lang_portal_route_duration_seconds Request latency by route.',
+        '# TYPE lang_portal_route_duration_seconds histogram',
+      ]
+      for route, stats in sorted(self.routes.items()):
+        lines += histogram_lines('lang_portal_route_duration_seconds', f'route="{label(route)}"', stats['histogram'])
+      lines += [
+        '# HELP lang_portal_sql_duration_seconds Statement latency including fetches.',
+        '# TYPE lang_portal_sql_duration_seconds histogram',
+      ]
+      for stats in self.statements.values():
+        labels = f'statement="{stats.id}",sql="{label(stats.sql[:120])}"'
+        lines += histogram_lines('lang_portal_sql_duration_seconds', labels, stats.histogram)
+      lines += [
+        '# HELP lang_portal_sql_rows_total Rows fetched or changed by statement.',
+        '# TYPE lang_portal_sql_rows_total counter',
+      ]
+      for stats in self.statements.values():
+        lines.append(f'lang_portal_sql_rows_total{{statement="{stats.id}"}} {stats.rows}')
+    return '\n'.join(lines) + '\n'
+
+  def init_app(self, app):
+    app.before_request(self.before_request)
+    app.after_request(self.after_request)
+
+    @app.route('/api/debug/perf', methods=['GET'])
+    def perf_report():
+      return jsonify(self.report(limit=request.args.get('limit', 50, type=int)))
+
+    @app.route('/api/debug/perf', methods=['DELETE'])
+    def perf_reset():
+      self.reset()
+      return jsonify({'message': 'Profile reset'})
+
+    @app.route('/api/debug/perf/metrics', methods=['GET'])
+    def perf_metrics():
+      return Response(self.prometheus(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timedelta
+
+# SM-2 parameters. Reviews are binary, so a correct answer is graded 4
+# ("correct after hesitation") and a wrong one 1 ("incorrect, but remembered").
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+CORRECT_GRADE = 4
+WRONG_GRADE = 1
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def next_schedule(ease, interval_days, repetitions, correct):
+  """Apply one SM-2 step and return (ease, interval_days, repetitions)."""
+  grade = CORRECT_GRADE if correct else WRONG_GRADE
+  ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+  if grade < 3:
+    return ease, 1, 0
+  repetitions += 1
+  if repetitions == 1:
+    interval_days = 1
+  elif repetitions == 2:
+    interval_days = 6
+  else:
+    interval_days = round(interval_days * ease, 2)
+  return ease, interval_days, repetitions
+
+def apply_reviews(cursor, reviews):
+  """Advance the SM-2 schedule for a batch of (word_id, correct, reviewed_at).
+
+  Events are applied in order, so several answers for the same word in one
+  batch compound as if they had been logged one at a time. Expects the
+  word_reviews rows to exist already. Does not commit.
+  """
+  word_ids = sorted({word_id for word_id, _, _ in reviews})
+  cursor.execute('''
+    SELECT word_id, ease, interval_days, repetitions
+    FROM word_reviews
+    WHERE word_id IN (SELECT value FROM json_each(?))
+  ''', (json.dumps(word_ids),))
+  states = {row[0]: (row[1], row[2], row[3], None) for row in cursor.fetchall()}
+
+  now = datetime.utcnow()
+  for word_id, correct, reviewed_at in reviews:
+    ease, interval_days, repetitions, _ = states.get(word_id, (DEFAULT_EASE, 0, 0, None))
+    ease, interval_days, repetitions = next_schedule(ease, interval_days, repetitions, correct)
+    reviewed = datetime.strptime(reviewed_at, TIMESTAMP_FORMAT) if reviewed_at else now
+    due_at = (reviewed + timedelta(days=interval_days)).strftime(TIMESTAMP_FORMAT)
+    states[word_id] = (ease, interval_days, repetitions, due_at)
+
+  cursor.executemany('''
+    UPDATE word_reviews
+    SET ease = ?, interval_days = ?, repetitions = ?, due_at = ?
+    WHERE word_id = ?
+  ''', [(*states[word_id], word_id) for word_id in word_ids])
+  cursor.executemany(
+    'UPDATE review_schedule SET due_at = ? WHERE word_id = ?',
+    [(states[word_id][3], word_id) for word_id in word_ids]
+  )
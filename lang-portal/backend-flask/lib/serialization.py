@@ -0,0 +1,159 @@
+import json
+import secrets
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+  import orjson
+except ImportError:  # Optional; the stdlib encoder is used without it
+  orjson = None
+
+# orjson 3.9+ splices pre-encoded JSON natively; older versions get placeholders
+_FRAGMENT = getattr(orjson, 'Fragment', None)
+
+# Placeholders carry a per-process token so no stored string can imitate one.
+# Both encoders escape NUL as \u0000, so the encoded form is known up front.
+_TOKEN = secrets.token_hex(8)
+_PLACEHOLDER = f'\x00{_TOKEN}\x00'
+_ENCODED_PLACEHOLDER = f'"\\u0000{_TOKEN}\\u0000"'.encode('ascii')
+
+class RawJSON:
+  """Text that is already valid JSON and is written into a response as-is.
+
+  Columns such as words.additional_info are stored as JSON written by
+  json.dumps, so wrapping the text skips a decode on read and an encode on
+  the way out.
+  """
+  __slots__ = ('text',)
+
+  def __init__(self, text):
+    self.text = text
+
+  def __repr__(self):
+    return f'RawJSON({self.text!r})'
+
+  def __eq__(self, other):
+    return isinstance(other, RawJSON) and other.text == self.text
+
+  __hash__ = None
+
+def row_factory(raw=(), default='{}'):
+  """Build a sqlite3 row factory producing dicts ready to encode.
+
+  Keys are the column names, so the SELECT list should use the response's
+  field names. Columns named in `raw` hold JSON text and are wrapped in
+  RawJSON, with NULL or empty values replaced by `default`.
+
+  Assign the result to a cursor's row_factory; column names are worked out
+  once per statement, not per row.
+  """
+  raw = frozenset(raw)
+  fields = None
+  raw_fields = ()
+  seen = None
+
+  def factory(cursor, row):
+    nonlocal fields, raw_fields, seen
+    if cursor.description is not seen:
+      seen = cursor.description
+      fields = tuple(column[0] for column in seen)
+      raw_fields = tuple(field for field in fields if field in raw)
+    values = dict(zip(fields, row))
+    for field in raw_fields:
+      values[field] = RawJSON(values[field] or default)
+    return values
+
+  return factory
+
+def _splice(encoded, raws):
+  # Encoders call default() in output order, so the n-th placeholder is raws[n]
+  parts = encoded.split(_ENCODED_PLACEHOLDER)
+  if len(parts) != len(raws) + 1:
+    raise ValueError('RawJSON placeholders out of step with the encoded output')
+  spliced = [parts[0]]
+  for raw, part in zip(raws, parts[1:]):
+    spliced.append(raw.encode('utf-8'))
+    spliced.append(part)
+  return b''.join(spliced)
+
+def dumps_bytes(obj, default=None, sort_keys=False, indent=None, **kwargs):
+  """Encode `obj` as UTF-8 JSON bytes, with orjson when it is installed.
+
+  RawJSON values are inserted verbatim. Objects neither encoder knows are
+  passed to `default`, as with json.dumps; datetimes go to `default` too so
+  the output matches Flask's encoder. Extra keyword arguments (or an indent
+  other than 2) select the stdlib encoder.
+  """
+  raws = []
+
+  def fallback(o):
+    if isinstance(o, RawJSON):
+      if _FRAGMENT is not None and orjson_used:
+        return _FRAGMENT(o.text)
+      raws.append(o.text)
+      return _PLACEHOLDER
+    if default is None:
+      raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+    return default(o)
+
+  orjson_used = orjson is not None and not kwargs and indent in (None, 2)
+  if orjson_used:
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if sort_keys:
+      option |= orjson.OPT_SORT_KEYS
+    if indent:
+      option |= orjson.OPT_INDENT_2
+    try:
+      encoded = orjson.dumps(obj, default=fallback, option=option)
+    except orjson.JSONEncodeError:
+      # Integers beyond 64 bits and the like; let the stdlib have a go
+      raws.clear()
+      orjson_used = False
+    else:
+      if raws:
+        encoded = _splice(encoded, raws)
+      return encoded
+
+  kwargs.setdefault('ensure_ascii', False)
+  kwargs.setdefault('separators', (',', ':') if indent is None else (',', ': '))
+  encoded = json.dumps(obj, default=fallback, sort_keys=sort_keys, indent=indent, **kwargs).encode('utf-8')
+  if raws:
+    encoded = _splice(encoded, raws)
+  return encoded
+
+def dumps(obj, **kwargs):
+  """dumps_bytes() as a str."""
+  return dumps_bytes(obj, **kwargs).decode('utf-8')
+
+class JSONProvider(DefaultJSONProvider):
+  """Flask JSON provider backed by dumps_bytes().
+
+  Keeps Flask's defaults (sorted keys, indented output in debug mode, its
+  handling of dates, UUIDs and dataclasses) and understands RawJSON.
+  Responses are built from bytes without an intermediate str.
+  """
+
+  def dumps(self, obj, **kwargs):
+    return self._dumps_bytes(obj, **kwargs).decode('utf-8')
+
+  def _dumps_bytes(self, obj, **kwargs):
+    kwargs.setdefault('default', self.default)
+    kwargs.setdefault('sort_keys', self.sort_keys)
+    # Compact separators are what both encoders produce by default
+    if kwargs.get('separators') == (',', ':'):
+      del kwargs['separators']
+    if kwargs.get('ensure_ascii') is False:
+      del kwargs['ensure_ascii']
+    return dumps_bytes(obj, **kwargs)
+
+  def loads(self, s, **kwargs):
+    if orjson is not None and not kwargs:
+      return orjson.loads(s)
+    return super().loads(s, **kwargs)
+
+  def response(self, *args, **kwargs):
+    obj = self._prepare_response_obj(args, kwargs)
+    dump_args = {}
+    if (self.compact is None and self._app.debug) or self.compact is False:
+      dump_args['indent'] = 2
+    return self._app.response_class(self._dumps_bytes(obj, **dump_args) + b'\n', mimetype=self.mimetype)
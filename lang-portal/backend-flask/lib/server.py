@@ -0,0 +1,74 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Read-only routes requested at startup: fills the response cache and the
+# group index, pulls the hot pages into SQLite's cache and prepares the
+# listing statements on a pooled connection
+WARMUP_PATHS = (
+  '/api/words',
+  '/api/words?cursor=',
+  '/api/groups',
+  '/api/study-activities',
+  '/api/study-sessions',
+  '/api/dashboard/stats',
+  '/api/dashboard/recent-session',
+)
+
+# After the fork only statements need preparing on the worker's connections;
+# cached responses are inherited, so the slow aggregate routes are skipped
+WORKER_WARMUP_PATHS = (
+  '/api/words',
+  '/api/words?cursor=',
+  '/api/words/1',
+  '/api/groups',
+  '/api/study-sessions',
+)
+
+def warm(app, paths=WARMUP_PATHS):
+  """Request `paths` through the test client and return {path: status code}."""
+  started = time.perf_counter()
+  statuses = {}
+  client = app.test_client()
+  for path in paths:
+    try:
+      statuses[path] = client.get(path).status_code
+    except Exception as e:
+      logger.warning(f'Warm-up request {path} failed: {str(e)}')
+      statuses[path] = None
+  with app.app_context():
+    app.group_index.refresh()
+  logger.info(f'Warmed {len(paths)} routes in {round((time.perf_counter() - started) * 1000, 1)}ms')
+  return statuses
+
+def before_fork(app):
+  """Leave the master process without threads or connections to hand to workers.
+
+  Warm-up starts the job workers (and the review flusher) like any request
+  does; they are stopped here so only workers run them, and pooled SQLite
+  connections are closed since they must not be used across a fork. State
+  held in memory (response cache, group index) is inherited copy-on-write.
+  """
+  app.jobs.stop()
+  if app.db.review_buffer:
+    app.db.review_buffer.stop()
+  app.db.pool.dispose()
+
+def after_fork(app):
+  """Start this worker's background threads and warm its own connections."""
+  app.jobs.start()
+  if app.db.review_buffer:
+    app.db.review_buffer.start()
+  warm(app, WORKER_WARMUP_PATHS)
+
+def drain(app, timeout=30.0):
+  """Finish background work before a worker exits.
+
+  In-flight requests have already been drained by the server; running jobs
+  get up to `timeout` seconds, staged reviews are flushed and the pool closed.
+  """
+  app.jobs.stop(timeout)
+  if app.db.review_buffer:
+    app.db.review_buffer.stop()
+  app.db.pool.dispose()
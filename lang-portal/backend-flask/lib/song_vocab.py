@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+class SongVocabUnavailable(Exception):
+  """The song-vocab service cannot take the request right now (circuit open, saturated or unreachable)."""
+
+  def __init__(self, message, retry_after=None):
+    super().__init__(message)
+    self.retry_after = retry_after
+
+class CircuitBreaker:
+  """Consecutive-failure circuit breaker.
+
+  After `threshold` failures in a row the circuit opens and calls fail fast
+  for `reset_timeout` seconds. Then a single trial call is let through
+  (half-open); its success closes the circuit, its failure re-opens it.
+  """
+
+  def __init__(self, threshold=5, reset_timeout=30.0):
+    self.threshold = threshold
+    self.reset_timeout = reset_timeout
+    self.failures = 0
+    self.opened_at = None
+    self._trial = False
+    self._lock = threading.Lock()
+
+  @property
+  def state(self):
+    with self._lock:
+      if self.opened_at is None:
+        return 'closed'
+      if time.monotonic() - self.opened_at >= self.reset_timeout:
+        return 'half-open'
+      return 'open'
+
+  def before_call(self):
+    """Raise SongVocabUnavailable unless a call may go through now."""
+    with self._lock:
+      if self.opened_at is None:
+        return
+      remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+      if remaining > 0 or self._trial:
+        raise SongVocabUnavailable('song-vocab circuit is open', retry_after=max(1, int(remaining + 0.5)))
+      self._trial = True
+
+  def record_success(self):
+    with self._lock:
+      self.failures = 0
+      self.opened_at = None
+      self._trial = False
+
+  def record_failure(self):
+    with self._lock:
+      self.failures += 1
+      if self._trial or self.failures >= self.threshold:
+        if self.opened_at is None:
+          logger.warning(f'song-vocab circuit opened after {self.failures} consecutive failures')
+        self.opened_at = time.monotonic()
+      self._trial = False
+
+class SongVocabClient:
+  """Pooled keep-alive HTTP client for the song-vocab service.
+
+  Every call has connect/read timeouts and runs under a concurrency limit
+  and a circuit breaker. Idempotent requests are retried on connection
+  errors and 502/503/504 with backoff; POSTs are only retried when the
+  connection could not be established, so the agent never runs twice.
+  """
+
+  def __init__(self, base_url, connect_timeout=3.0, read_timeout=120.0, retries=2, max_concurrency=4,
+               queue_timeout=0.5, breaker_threshold=5, breaker_reset=30.0):
+    self.base_url = base_url.rstrip('/')
+    self.timeout = (connect_timeout, read_timeout)
+    self.queue_timeout = queue_timeout
+    self.max_concurrency = max_concurrency
+    self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+    self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    retry = Retry(
+      total=retries,
+      connect=retries,
+      read=retries,
+      status=retries,
+      backoff_factor=0.3,
+      status_forcelist=(502, 503, 504),
+      allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+      raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=retry)
+    self.session = requests.Session()
+    self.session.mount('http://', adapter)
+    self.session.mount('https://', adapter)
+
+  def request(self, method, endpoint, json=None, params=None):
+    """Send a request and return the decoded JSON body.
+
+    Raises SongVocabUnavailable when the call is refused or the service is
+    unreachable, and requests.HTTPError for error responses.
+    """
+    if not self._slots.acquire(timeout=self.queue_timeout):
+      raise SongVocabUnavailable(f'song-vocab is busy ({self.max_concurrency} requests in flight)', retry_after=1)
+    try:
+      self.breaker.before_call()
+      try:
+        response = self.session.request(method, f'{self.base_url}{endpoint}', json=json, params=params, timeout=self.timeout)
+      except (requests.ConnectionError, requests.Timeout) as e:
+        self.breaker.record_failure()
+        raise SongVocabUnavailable(f'Could not reach song-vocab: {e}') from e
+      except Exception:
+        self.breaker.record_failure()
+        raise
+    finally:
+      self._slots.release()
+
+    # 4xx means the request was bad, not that the service is unhealthy
+    if response.status_code >= 500:
+      self.breaker.record_failure()
+    else:
+      self.breaker.record_success()
+    response.raise_for_status()
+    return response.json()
+
+  def close(self):
+    self.session.close()
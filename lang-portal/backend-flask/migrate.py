@@ -1,31 +1,37 @@
-import sqlite3
+import argparse
+import logging
 import os
+import sys
 
-def run_migrations():
-    # Connect to the database
-    db_path = os.path.join(os.path.dirname(__file__), 'word_bank.db')
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    
+from lib.migrations import MigrationError, migrate, pending
+
+DEFAULT_DATABASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'lang_portal.db')
+
+def run_migrations(database=DEFAULT_DATABASE):
+    """Apply every pending migration in sql/migrations to `database`."""
     try:
-        # Get list of migration files
-        migrations_dir = os.path.join(os.path.dirname(__file__), 'sql', 'migrations')
-        migration_files = sorted([f for f in os.listdir(migrations_dir) if f.endswith('.sql')])
-        
-        # Run each migration
-        for migration_file in migration_files:
-            print(f"Running migration: {migration_file}")
-            with open(os.path.join(migrations_dir, migration_file)) as f:
-                migration_sql = f.read()
-                conn.executescript(migration_sql)
-                conn.commit()
-        
-        print("Migrations completed successfully")
-    except Exception as e:
+        applied = migrate(database)
+    except MigrationError as e:
         print(f"Error running migrations: {str(e)}")
-        conn.rollback()
-    finally:
-        conn.close()
+        return False
+    if applied:
+        print(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+    else:
+        print("Database is up to date")
+    return True
 
 if __name__ == '__main__':
-    run_migrations()
+    parser = argparse.ArgumentParser(description='Apply pending schema migrations')
+    parser.add_argument('--db', default=DEFAULT_DATABASE, help='SQLite database file')
+    parser.add_argument('--status', action='store_true', help='List pending migrations without applying them')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if args.status:
+        migrations = pending(args.db)
+        for migration in migrations:
+            print(f"pending: {migration.version}_{migration.name}")
+        if not migrations:
+            print("Database is up to date")
+    else:
+        sys.exit(0 if run_migrations(args.db) else 1)
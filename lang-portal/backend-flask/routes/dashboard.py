@@ -30,14 +30,23 @@ def load(app):
             
             if not session:
                 return jsonify(None)
+
+            # Add answers still staged by the write-behind review buffer
+            cursor.execute('''
+                SELECT COALESCE(SUM(correct = 1), 0) as correct_count,
+                       COALESCE(SUM(correct = 0), 0) as wrong_count
+                FROM review_buffer
+                WHERE study_session_id = ?
+            ''', (session["id"],))
+            pending = cursor.fetchone()
             
             return jsonify({
                 "id": session["id"],
                 "group_id": session["group_id"],
                 "activity_name": session["activity_name"],
                 "created_at": session["created_at"],
-                "correct_count": session["correct_count"],
-                "wrong_count": session["wrong_count"]
+                "correct_count": session["correct_count"] + pending["correct_count"],
+                "wrong_count": session["wrong_count"] + pending["wrong_count"]
             })
             
         except Exception as e:
@@ -49,81 +58,68 @@ def load(app):
         try:
             cursor = app.db.cursor()
             
-            # Get total vocabulary count
-            cursor.execute('SELECT COUNT(*) as total_vocabulary FROM words')
-            total_vocabulary = cursor.fetchone()["total_vocabulary"]
-
-            # Get total unique words studied
+            # Totals are kept current by triggers on words, sessions and reviews
             cursor.execute('''
-                SELECT COUNT(DISTINCT word_id) as total_words
-                FROM word_review_items wri
-                JOIN study_sessions ss ON wri.study_session_id = ss.id
+                SELECT total_vocabulary, total_sessions, total_reviews, correct_reviews,
+                       total_words_studied, mastered_words
+                FROM dashboard_stats
+                WHERE id = 1
             ''')
-            total_words = cursor.fetchone()["total_words"]
-            
-            # Get mastered words (words with >80% success rate and at least 5 attempts)
+            stats = cursor.fetchone()
+
+            # Fold in answers still staged by the write-behind review buffer,
+            # applying the same first-study and mastery rules as the triggers
             cursor.execute('''
-                WITH word_stats AS (
-                    SELECT 
-                        word_id,
-                        COUNT(*) as total_attempts,
-                        SUM(CASE WHEN correct = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*) as success_rate
-                    FROM word_review_items wri
-                    JOIN study_sessions ss ON wri.study_session_id = ss.id
+                WITH pending AS (
+                    SELECT word_id, COUNT(*) AS attempts, SUM(correct = 1) AS correct
+                    FROM review_buffer
                     GROUP BY word_id
-                    HAVING total_attempts >= 5
+                ), merged AS (
+                    SELECT p.attempts AS pending_attempts,
+                           p.correct AS pending_correct,
+                           s.attempts AS old_attempts,
+                           s.attempts >= 5 AND s.correct * 1.0 / s.attempts >= 0.8 AS was_mastered,
+                           p.attempts + COALESCE(s.attempts, 0) AS attempts,
+                           p.correct + COALESCE(s.correct, 0) AS correct
+                    FROM pending p
+                    LEFT JOIN dashboard_word_stats s ON s.word_id = p.word_id
                 )
-                SELECT COUNT(*) as mastered_words
-                FROM word_stats
-                WHERE success_rate >= 0.8
-            ''')
-            mastered_words = cursor.fetchone()["mastered_words"]
-            
-            # Get overall success rate
-            cursor.execute('''
-                SELECT 
-                    SUM(CASE WHEN correct = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*) as success_rate
-                FROM word_review_items wri
-                JOIN study_sessions ss ON wri.study_session_id = ss.id
+                SELECT COALESCE(SUM(pending_attempts), 0) AS reviews,
+                       COALESCE(SUM(pending_correct), 0) AS correct_reviews,
+                       COALESCE(SUM(old_attempts IS NULL), 0) AS new_words,
+                       COALESCE(SUM(
+                           (attempts >= 5 AND correct * 1.0 / attempts >= 0.8) - COALESCE(was_mastered, 0)
+                       ), 0) AS mastered_delta
+                FROM merged
             ''')
-            success_rate = cursor.fetchone()["success_rate"] or 0
-            
-            # Get total number of study sessions
-            cursor.execute('SELECT COUNT(*) as total_sessions FROM study_sessions')
-            total_sessions = cursor.fetchone()["total_sessions"]
+            pending = cursor.fetchone()
+            total_reviews = stats["total_reviews"] + pending["reviews"]
+            correct_reviews = stats["correct_reviews"] + pending["correct_reviews"]
+
+            total_vocabulary = stats["total_vocabulary"]
+            total_words = stats["total_words_studied"] + pending["new_words"]
+            mastered_words = stats["mastered_words"] + pending["mastered_delta"]
+            total_sessions = stats["total_sessions"]
+            success_rate = correct_reviews * 1.0 / total_reviews if total_reviews else 0
             
             # Get number of groups with activity in the last 30 days
             cursor.execute('''
                 SELECT COUNT(DISTINCT group_id) as active_groups
-                FROM study_sessions
-                WHERE created_at >= date('now', '-30 days')
+                FROM daily_group_activity
+                WHERE study_date >= date('now', '-30 days')
             ''')
             active_groups = cursor.fetchone()["active_groups"]
             
-            # Calculate current streak (consecutive days with at least one study session)
+            # Current streak is stored on the most recent study day
             cursor.execute('''
-                WITH daily_sessions AS (
-                    SELECT 
-                        date(created_at) as study_date,
-                        COUNT(*) as session_count
-                    FROM study_sessions
-                    GROUP BY date(created_at)
-                ),
-                streak_calc AS (
-                    SELECT 
-                        study_date,
-                        julianday(study_date) - julianday(lag(study_date, 1) over (order by study_date)) as days_diff
-                    FROM daily_sessions
-                )
-                SELECT COUNT(*) as streak
-                FROM (
-                    SELECT study_date
-                    FROM streak_calc
-                    WHERE days_diff = 1 OR days_diff IS NULL
-                    ORDER BY study_date DESC
-                )
+                SELECT streak
+                FROM daily_activity
+                WHERE sessions_count > 0
+                ORDER BY study_date DESC
+                LIMIT 1
             ''')
-            current_streak = cursor.fetchone()["streak"]
+            latest_day = cursor.fetchone()
+            current_streak = latest_day["streak"] if latest_day else 0
             
             return jsonify({
                 "total_vocabulary": total_vocabulary,
@@ -0,0 +1,168 @@
+from flask import Response, jsonify, request
+from flask_cors import cross_origin
+import csv
+import datetime
+import io
+import os
+import sqlite3
+import threading
+from urllib.request import pathname2url
+
+from lib.bulk_import import group_tables
+from lib.serialization import RawJSON, dumps_bytes
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+WORD_COLUMNS = (
+    'id', 'german', 'pronunciation', 'english', 'article', 'word_type', 'additional_info',
+    'correct_count', 'wrong_count', 'last_reviewed', 'mastery'
+)
+
+REVIEW_COLUMNS = (
+    'id', 'word_id', 'german', 'english', 'study_session_id', 'group_id', 'study_activity_id',
+    'correct', 'created_at'
+)
+
+def parse_timestamp(value, name):
+    """Parse an ISO date or datetime query parameter into SQLite's timestamp format."""
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO date or datetime')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+def encode_ndjson(columns, rows, raw=()):
+    lines = []
+    for row in rows:
+        record = dict(zip(columns, row))
+        for column in raw:
+            record[column] = RawJSON(record[column] or '{}')
+        lines.append(dumps_bytes(record))
+    lines.append(b'')
+    return b'\n'.join(lines)
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+def stream_rows(conn, sql, params, columns, fmt, chunk_rows, raw=(), convert=None):
+    """Yield the encoded result of `sql` in chunks of `chunk_rows` rows.
+
+    Rows are stepped out of SQLite as the client reads, so memory stays at
+    one chunk however large the export is. The SELECT is a single statement
+    and therefore reads one consistent snapshot.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(sql, params)
+    if fmt == 'csv':
+        yield encode_csv([columns])
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            return
+        if convert:
+            rows = [convert(row) for row in rows]
+        yield encode_ndjson(columns, rows, raw) if fmt == 'ndjson' else encode_csv(rows)
+
+def review_row(row):
+    # correct is stored as 0/1
+    row = list(row)
+    row[7] = bool(row[7])
+    return row
+
+def load(app):
+    # Exports read on their own connection rather than a pooled one, so a
+    # slow client cannot hold a pool slot; the number of them is capped instead
+    slots = threading.BoundedSemaphore(app.config['EXPORT_MAX_CONCURRENCY'])
+    chunk_rows = app.config['EXPORT_CHUNK_ROWS']
+    database_uri = f'file:{pathname2url(os.path.abspath(app.db.database))}?mode=ro'
+
+    def export_response(name, sql, params, columns, raw=(), convert=None):
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in FORMATS:
+            return jsonify({"error": f"format must be one of: {', '.join(FORMATS)}"}), 400
+        if not slots.acquire(blocking=False):
+            response = jsonify({"error": "Too many exports in progress"})
+            response.status_code = 503
+            response.headers['Retry-After'] = '5'
+            return response
+        try:
+            conn = sqlite3.connect(database_uri, uri=True, timeout=5, check_same_thread=False)
+        except Exception:
+            slots.release()
+            raise
+
+        response = Response(
+            stream_rows(conn, sql, params, columns, fmt, chunk_rows, raw=raw, convert=convert),
+            mimetype=FORMATS[fmt],
+            headers={
+                'Content-Disposition': f'attachment; filename={name}.{fmt}',
+                'Cache-Control': 'no-store',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+        def release():
+            conn.close()
+            slots.release()
+
+        # Runs when the response is closed, even if streaming never started
+        response.call_on_close(release)
+        return response
+
+    def group_filter(column):
+        """SQL and params restricting `column` (a word id) to ?group_id=, if given."""
+        group_id = request.args.get('group_id', type=int)
+        if group_id is None:
+            return '', []
+        _, link_table = group_tables(app.db.cursor())
+        return f' AND {column} IN (SELECT word_id FROM {link_table} WHERE group_id = ?)', [group_id]
+
+    @app.route('/api/export/words', methods=['GET'])
+    @cross_origin()
+    def export_words():
+        try:
+            where, params = group_filter('w.id')
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        sql = f'''
+            SELECT {', '.join('w.' + column for column in WORD_COLUMNS)}
+            FROM words w
+            WHERE 1=1{where}
+            ORDER BY w.id
+        '''
+        return export_response('words', sql, params, WORD_COLUMNS, raw=('additional_info',))
+
+    @app.route('/api/export/reviews', methods=['GET'])
+    @cross_origin()
+    def export_reviews():
+        try:
+            where, params = group_filter('wri.word_id')
+            for name, op in (('since', '>='), ('until', '<')):
+                if request.args.get(name):
+                    where += f' AND wri.created_at {op} ?'
+                    params.append(parse_timestamp(request.args[name], name))
+            # The export reads word_review_items only, so apply staged reviews first
+            if app.db.review_buffer:
+                app.db.review_buffer.flush()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        sql = f'''
+            SELECT wri.id, wri.word_id, w.german, w.english, wri.study_session_id,
+                   ss.group_id, ss.study_activity_id, wri.correct, wri.created_at
+            FROM word_review_items wri
+            JOIN words w ON w.id = wri.word_id
+            LEFT JOIN study_sessions ss ON ss.id = wri.study_session_id
+            WHERE 1=1{where}
+            ORDER BY wri.id
+        '''
+        return export_response('reviews', sql, params, REVIEW_COLUMNS, convert=review_row)
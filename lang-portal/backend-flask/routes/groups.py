@@ -4,11 +4,16 @@ import json
 import sqlite3
 import logging
 
+from lib.bulk_import import group_tables
+from routes.study_sessions import session_end_time
+from routes.words import review_count_sql
+
 logger = logging.getLogger(__name__)
 
 def load(app):
   @app.route('/api/groups', methods=['GET'])
   @cross_origin()
+  @app.cache.cached('groups')
   def get_groups():
     try:
       cursor = app.db.cursor()
@@ -97,6 +102,7 @@ def load(app):
       ''', (group_name,))
       
       group_id = cursor.lastrowid
+      app.db.bump_versions('groups')
       app.db.commit()
 
       # Return the created group
@@ -137,6 +143,7 @@ def load(app):
 
   @app.route('/api/groups/<int:id>/words', methods=['GET'])
   @cross_origin()
+  @app.cache.cached('groups', 'words', 'word_groups', 'word_group_assignments', 'word_reviews')
   def get_group_words(id):
     try:
       cursor = app.db.cursor()
@@ -157,51 +164,37 @@ def load(app):
       if order not in ['asc', 'desc']:
         order = 'asc'
 
-      # First, check if the group exists
-      cursor.execute('SELECT name FROM groups WHERE id = ?', (id,))
+      # First, check if the group exists in whichever grouping schema this database uses
+      group_table, link_table = group_tables(cursor)
+      cursor.execute(f'SELECT name FROM {group_table} WHERE id = ?', (id,))
       group = cursor.fetchone()
       if not group:
         return jsonify({"error": "Group not found"}), 404
 
-      # Query to fetch words with pagination and sorting
-      cursor.execute(f'''
-        SELECT w.*, 
-               COALESCE(wr.correct_count, 0) as correct_count,
-               COALESCE(wr.wrong_count, 0) as wrong_count
-        FROM words w
-        JOIN word_groups wg ON w.id = wg.word_id
-        LEFT JOIN word_reviews wr ON w.id = wr.word_id
+      # Query to fetch words with pagination and sorting; counts live on words
+      words = app.db.fetch_rows('''
+        SELECT w.id, w.german, w.english, w.word_type, w.article,
+               {review_counts}
+        FROM {link_table} wg
+        JOIN words w ON w.id = wg.word_id
+        {pending_join}
         WHERE wg.group_id = ?
-        ORDER BY {sort_by} {order}
+        ORDER BY {sort_by} {order}, w.id {order}
         LIMIT ? OFFSET ?
-      ''', (id, words_per_page, offset))
-      
-      words = cursor.fetchall()
+      '''.format(link_table=link_table, sort_by=sort_by, order=order, **review_count_sql(app.db)),
+        (id, words_per_page, offset))
 
       # Get total words count for pagination
-      cursor.execute('''
+      cursor.execute(f'''
         SELECT COUNT(*) 
-        FROM word_groups 
+        FROM {link_table} 
         WHERE group_id = ?
       ''', (id,))
       total_words = cursor.fetchone()[0]
       total_pages = (total_words + words_per_page - 1) // words_per_page
 
-      # Format the response
-      words_data = []
-      for word in words:
-        words_data.append({
-          "id": word["id"],
-          "german": word["german"],
-          "english": word["english"],
-          "word_type": word["word_type"],
-          "article": word["article"],
-          "correct_count": word["correct_count"],
-          "wrong_count": word["wrong_count"]
-        })
-
       return jsonify({
-        'words': words_data,
+        'words': words,
         'total_pages': total_pages,
         'current_page': page
       })
@@ -224,18 +217,20 @@ def load(app):
       # Get sorting parameters
       sort_by = request.args.get('sort_by', 'created_at')
       order = request.args.get('order', 'desc')  # Default to newest first
+      if order not in ['asc', 'desc']:
+        order = 'desc'
 
       # Map frontend sort keys to database columns
       sort_mapping = {
-        'startTime': 'created_at',
+        'startTime': 's.created_at',
         'endTime': 'last_activity_time',
         'activityName': 'a.name',
         'groupName': 'g.name',
         'reviewItemsCount': 'review_count'
       }
 
-      # Use mapped sort column or default to created_at
-      sort_column = sort_mapping.get(sort_by, 'created_at')
+      # Use mapped sort column or default to the session start
+      sort_column = sort_mapping.get(sort_by, 's.created_at')
 
       # Get total count for pagination
       cursor.execute('''
@@ -246,41 +241,48 @@ def load(app):
       total_sessions = cursor.fetchone()[0]
       total_pages = (total_sessions + sessions_per_page - 1) // sessions_per_page
 
-      # Get study sessions for this group with dynamic calculations
+      # Get study sessions for this group, joined to one grouped pass over
+      # their review items instead of two correlated subqueries per row
       cursor.execute(f'''
         SELECT 
           s.id,
           s.group_id,
           s.study_activity_id,
           s.created_at as start_time,
-          (
-            SELECT MAX(created_at)
-            FROM word_review_items
-            WHERE study_session_id = s.id
-          ) as last_activity_time,
+          NULLIF(MAX(COALESCE(r.last_activity_time, ''), COALESCE(pending.last_activity_time, '')), '') as last_activity_time,
           a.name as activity_name,
           g.name as group_name,
-          (
-            SELECT COUNT(*)
-            FROM word_review_items
-            WHERE study_session_id = s.id
-          ) as review_count
+          COALESCE(r.review_count, 0) + COALESCE(pending.count, 0) as review_count
         FROM study_sessions s
         JOIN study_activities a ON s.study_activity_id = a.id
         JOIN groups g ON s.group_id = g.id
+        LEFT JOIN (
+          SELECT
+            study_session_id,
+            COUNT(*) as review_count,
+            MAX(created_at) as last_activity_time
+          FROM word_review_items
+          WHERE study_session_id IN (SELECT id FROM study_sessions WHERE group_id = ?)
+          GROUP BY study_session_id
+        ) r ON r.study_session_id = s.id
+        LEFT JOIN (
+          -- Reviews still staged by the write-behind buffer
+          SELECT study_session_id, COUNT(*) AS count, MAX(created_at) AS last_activity_time
+          FROM review_buffer
+          WHERE study_session_id IN (SELECT id FROM study_sessions WHERE group_id = ?)
+          GROUP BY study_session_id
+        ) pending ON pending.study_session_id = s.id
         WHERE s.group_id = ?
         ORDER BY {sort_column} {order}
         LIMIT ? OFFSET ?
-      ''', (id, sessions_per_page, offset))
+      ''', (id, id, id, sessions_per_page, offset))
       
       sessions = cursor.fetchall()
       sessions_data = []
       
       for session in sessions:
         # If there's no last_activity_time, use start_time + 30 minutes
-        end_time = session["last_activity_time"]
-        if not end_time:
-            end_time = cursor.execute('SELECT datetime(?, "+30 minutes")', (session["start_time"],)).fetchone()[0]
+        end_time = session_end_time(session["start_time"], session["last_activity_time"])
         
         sessions_data.append({
           "id": session["id"],
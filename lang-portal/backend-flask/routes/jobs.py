@@ -0,0 +1,70 @@
+from flask import Response, jsonify
+from flask_cors import cross_origin
+import json
+import time
+
+from lib.jobs import TERMINAL_STATUSES
+
+# Comment line sent on an idle event stream so proxies keep it open
+SSE_KEEPALIVE_SECONDS = 15
+
+def serialize_job(job):
+    return {
+        'id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'stage': job['stage'],
+        'result': job['result'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    }
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def load(app):
+    @app.route('/api/jobs/<string:job_id>', methods=['GET'])
+    @cross_origin()
+    def get_job(job_id):
+        job = app.jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(serialize_job(job))
+
+    @app.route('/api/jobs/<string:job_id>/events', methods=['GET'])
+    @cross_origin()
+    def stream_job_events(job_id):
+        job = app.jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+
+        def events():
+            # Each poll checks a connection out and back in, so an open
+            # stream never pins a pool slot
+            last = None
+            last_sent = time.monotonic()
+            current = job
+            while True:
+                state = (current['status'], current['stage'])
+                if current['status'] in TERMINAL_STATUSES:
+                    yield sse_event('done', serialize_job(current))
+                    return
+                if state != last:
+                    yield sse_event('progress', serialize_job(current))
+                    last = state
+                    last_sent = time.monotonic()
+                elif time.monotonic() - last_sent >= SSE_KEEPALIVE_SECONDS:
+                    yield ': keep-alive\n\n'
+                    last_sent = time.monotonic()
+                with app.jobs.changed:
+                    app.jobs.changed.wait(app.jobs.poll_interval)
+                current = app.jobs.get(job_id)
+                if current is None:
+                    return
+
+        return Response(events(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
@@ -1,11 +1,16 @@
-from flask import jsonify, request
+from flask import current_app, jsonify, request
 from flask_cors import cross_origin
+import json
 import math
 import requests
 import sqlite3
 import logging
 import os
 
+from lib.bulk_import import group_tables
+from lib.group_index import group_filter_args
+from lib.song_vocab import SongVocabClient, SongVocabUnavailable
+
 logger = logging.getLogger(__name__)
 
 # Constants
@@ -24,22 +29,35 @@ def proxy_to_song_vocab(method, endpoint, json=None, params=None):
         Response from song-vocab service
         
     Raises:
-        Exception: If the request fails
+        SongVocabUnavailable: If the circuit is open, the client is saturated
+            or the service cannot be reached
+        requests.HTTPError: If song-vocab answers with an error status
     """
     try:
-        url = f"{SONG_VOCAB_URL}{endpoint}"
-        response = requests.request(
-            method=method,
-            url=url,
-            json=json,
-            params=params
-        )
-        response.raise_for_status()
-        return response.json()
+        return current_app.song_vocab.request(method, endpoint, json=json, params=params)
     except Exception as e:
         logger.error(f"Error proxying to song-vocab: {str(e)}")
         raise
 
+def unavailable_response(e):
+    """503 for a song-vocab call that was refused or could not connect."""
+    response = jsonify({'error': 'Could not connect to song processing service'})
+    response.status_code = 503
+    if getattr(e, 'retry_after', None):
+        response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+def serialize_study_word(word):
+    return {
+        'id': word['id'],
+        'german': word['german'],
+        'english': word['english'],
+        'word_type': word['word_type'],
+        'article': word['article'],
+        'pronunciation': word['pronunciation'],
+        'due_at': word['due_at']
+    }
+
 def get_activity_type(url: str) -> str:
     """Determine activity type based on URL pattern."""
     if 'localhost:8080/writing' in url:
@@ -60,6 +78,7 @@ def update_activity_url(app, activity_name: str, new_url: str):
                 "UPDATE study_activities SET url = ? WHERE name = ?",
                 (new_url, activity_name)
             )
+            conn.bump_versions('study_activities')
             conn.commit()
             logger.info(f"Updated URL for {activity_name} to {new_url}")
         except Exception as e:
@@ -70,6 +89,18 @@ def update_activity_url(app, activity_name: str, new_url: str):
             cursor.close()
 
 def load(app):
+    # One pooled client per app so keep-alive connections, the concurrency
+    # limit and the circuit breaker are shared by every request thread
+    app.song_vocab = SongVocabClient(
+        app.config.get('SONG_VOCAB_URL', SONG_VOCAB_URL),
+        connect_timeout=app.config.get('SONG_VOCAB_CONNECT_TIMEOUT', 3.0),
+        read_timeout=app.config.get('SONG_VOCAB_READ_TIMEOUT', 120.0),
+        retries=app.config.get('SONG_VOCAB_RETRIES', 2),
+        max_concurrency=app.config.get('SONG_VOCAB_MAX_CONCURRENCY', 4),
+        breaker_threshold=app.config.get('SONG_VOCAB_BREAKER_THRESHOLD', 5),
+        breaker_reset=app.config.get('SONG_VOCAB_BREAKER_RESET', 30.0)
+    )
+
     with app.app_context():
         # Add Word Memorization activity if it doesn't exist
         with app.db as conn:
@@ -90,6 +121,7 @@ def load(app):
                         "/static/img/word-memorization-preview.png"
                     )
                 )
+                conn.bump_versions('study_activities')
                 conn.commit()
                 logger.info("Added Word Memorization study activity")
             else:
@@ -102,6 +134,7 @@ def load(app):
                     """,
                     ("http://localhost:7860", "Word Memorization")
                 )
+                conn.bump_versions('study_activities')
                 conn.commit()
                 logger.info("Updated Word Memorization URL to port 7860")
 
@@ -136,6 +169,7 @@ def load(app):
             
     @app.route('/api/study-activities', methods=['GET'])
     @cross_origin()
+    @app.cache.cached('study_activities')
     def get_study_activities():
         cursor = app.db.cursor()
         cursor.execute('SELECT id, name, url, preview_url FROM study_activities')
@@ -276,8 +310,30 @@ def load(app):
             group_id = request.args.get('group_id', '1')
             try:
                 group_id = int(group_id)
+                limit = request.args.get('limit')
+                limit = max(1, int(limit)) if limit is not None else -1  # -1: no limit
             except (TypeError, ValueError):
-                return jsonify({'error': 'group_id must be a number'}), 400
+                return jsonify({'error': 'group_id and limit must be numbers'}), 400
+            due_only = request.args.get('due', 'false').lower() == 'true'
+            try:
+                # groups=, all_groups=, exclude_groups= select across several groups instead
+                group_filter = group_filter_args(request.args)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            if group_filter:
+                # Ids come from the in-process membership index; the words and
+                # their due dates are then fetched in one batch
+                word_ids = app.group_index.select(**group_filter)
+                words = app.db.execute(f'''
+                    SELECT w.*, COALESCE(wr.due_at, CURRENT_TIMESTAMP) AS due_at FROM words w
+                    LEFT JOIN word_reviews wr ON wr.word_id = w.id
+                    WHERE w.id IN (SELECT value FROM json_each(?))
+                    {"AND COALESCE(wr.due_at, CURRENT_TIMESTAMP) <= CURRENT_TIMESTAMP" if due_only else ""}
+                    ORDER BY due_at, w.id
+                    LIMIT ?
+                ''', (json.dumps(word_ids), limit)).fetchall()
+                return jsonify({'words': [serialize_study_word(word) for word in words]})
 
             # Get words for the group using proper transaction handling
             with app.db.get() as connection:
@@ -287,20 +343,25 @@ def load(app):
                     connection.execute('BEGIN TRANSACTION')
 
                     # First check if the group exists
+                    group_table, _ = group_tables(cursor)
                     cursor.execute(
-                        'SELECT id FROM groups WHERE id = ?',
+                        f'SELECT id FROM {group_table} WHERE id = ?',
                         (group_id,)
                     )
                     if not cursor.fetchone():
                         connection.rollback()
                         return jsonify({'error': 'Group not found'}), 404
 
-                    # Get words for the group
-                    cursor.execute('''
-                        SELECT w.* FROM words w
-                        JOIN word_groups gw ON w.id = gw.word_id
-                        WHERE gw.group_id = ?
-                    ''', (group_id,))
+                    # Get the group's words, most overdue first, as a range
+                    # scan on idx_review_schedule_due
+                    cursor.execute(f'''
+                        SELECT w.*, rs.due_at FROM review_schedule rs
+                        JOIN words w ON w.id = rs.word_id
+                        WHERE rs.group_id = ?
+                        {"AND rs.due_at <= CURRENT_TIMESTAMP" if due_only else ""}
+                        ORDER BY rs.due_at
+                        LIMIT ?
+                    ''', (group_id, limit))
                     words = cursor.fetchall()
 
                     # Commit transaction
@@ -311,19 +372,10 @@ def load(app):
                 finally:
                     cursor.close()
 
-            if not words:
+            if not words and not due_only:
                 return jsonify({'error': 'No words found for this group'}), 404
 
-            return jsonify({
-                'words': [{
-                    'id': word['id'],
-                    'german': word['german'],
-                    'english': word['english'],
-                    'word_type': word['word_type'],
-                    'article': word['article'],
-                    'pronunciation': word['pronunciation']
-                } for word in words]
-            })
+            return jsonify({'words': [serialize_study_word(word) for word in words]})
         except Exception as e:
             app.logger.error(f"Error fetching words: {str(e)}")
             return jsonify({'error': str(e)}), 500
@@ -371,6 +423,8 @@ def load(app):
                     }
                 )
                 return jsonify(response)
+            except SongVocabUnavailable as e:
+                return unavailable_response(e)
             except Exception as e:
                 logger.error(f"Error fetching songs from song-vocab: {str(e)}")
                 return jsonify({'error': 'Failed to fetch songs'}), 500
@@ -408,6 +462,8 @@ def load(app):
                     params={'session_ids': ','.join(map(str, session_ids))}
                 )
                 return jsonify(response)
+            except SongVocabUnavailable as e:
+                return unavailable_response(e)
             except Exception as e:
                 logger.error(f"Error fetching vocabulary from song-vocab: {str(e)}")
                 return jsonify({'error': 'Failed to fetch vocabulary'}), 500
@@ -442,12 +498,10 @@ def load(app):
                 logger.error(f"Database not found at {db_path}")
                 return jsonify({'error': 'Database connection error'}), 500
             
-            # Begin transaction
             cursor = app.db.cursor()
             
             try:
                 # Verify activity exists
-                logger.info(f"Verifying activity {id} exists")
                 cursor.execute('SELECT * FROM study_activities WHERE id = ?', (id,))
                 activity = cursor.fetchone()
                 
@@ -456,7 +510,6 @@ def load(app):
                     return jsonify({'error': 'Activity not found'}), 404
                     
                 # Verify group exists
-                logger.info(f"Verifying group {data['group_id']} exists")
                 cursor.execute('SELECT * FROM groups WHERE id = ?', (data['group_id'],))
                 group = cursor.fetchone()
                 
@@ -464,78 +517,105 @@ def load(app):
                     logger.warning(f"Group {data['group_id']} not found")
                     return jsonify({'error': 'Group not found'}), 404
 
-                # Create study session
-                logger.info("Creating study session")
+                # Create and commit the study session up front so no write
+                # transaction is open while the song-vocab agent runs
                 cursor.execute('''
                     INSERT INTO study_sessions 
                     (group_id, study_activity_id) 
                     VALUES (?, ?)
                 ''', (data['group_id'], id))
                 session_id = cursor.lastrowid
-                logger.info(f"Created study session with id {session_id}")
-                
-                # Process song in song-vocab service
-                try:
-                    logger.info("Sending request to song-vocab service")
-                    payload = {
-                        'song_title': data['song_title'],
-                        'artist': data['artist'],
-                        'study_activity_id': id,
-                        'external_session_id': session_id
-                    }
-                    logger.info(f"song-vocab payload: {payload}")
-                    
-                    response = proxy_to_song_vocab(
-                        'POST',
-                        '/api/agent',
-                        json=payload
-                    )
-                    
-                    # Validate song-vocab response
-                    if response.get('error'):
-                        logger.error(f"song-vocab error: {response['error']}")
-                        app.db.get().rollback()
-                        return jsonify({'error': 'Song processing failed'}), 500
-                        
-                    # Only commit if song-vocab request succeeds
-                    logger.info("song-vocab request successful, committing transaction")
-                    app.db.commit()
-                    
-                    # Log vocabulary results
-                    vocab_count = len(response.get('vocabulary', []))
-                    logger.info(f"Processed song with {vocab_count} vocabulary items")
-                    
-                    return jsonify(response)
-                    
-                except requests.exceptions.RequestException as e:
-                    # Handle network/connection errors
-                    app.db.get().rollback()
-                    logger.error(f"Network error with song-vocab service: {str(e)}")
-                    return jsonify({'error': 'Could not connect to song processing service'}), 503
-                    
-                except Exception as e:
-                    # Handle unexpected errors
-                    app.db.get().rollback()
-                    logger.error(f"Unexpected error processing song: {str(e)}")
-                    return jsonify({'error': 'Internal server error'}), 500
-                    
+                app.db.commit()
+                logger.info(f"Created study session {session_id} for song processing")
+
             except sqlite3.IntegrityError as e:
                 # Handle database constraint violations
+                app.db.rollback()
                 logger.error(f"Database integrity error: {str(e)}")
                 return jsonify({'error': 'Database constraint violation'}), 409
                 
             except Exception as e:
                 # Handle unexpected database errors
+                app.db.rollback()
                 logger.error(f"Unexpected database error: {str(e)}")
                 return jsonify({'error': 'Database error'}), 500
                 
             finally:
                 cursor.close()
+
+            # Hand the song-vocab call to a background job; the client polls
+            # /api/jobs/<id> or follows /api/jobs/<id>/events for the result
+            job_id = app.jobs.enqueue('song.process', {
+                'song_title': data['song_title'],
+                'artist': data['artist'],
+                'group_id': data['group_id'],
+                'study_activity_id': id,
+                'session_id': session_id
+            })
+            logger.info(f"Queued song processing job {job_id} for session {session_id}")
+            response = jsonify({
+                'job_id': job_id,
+                'session_id': session_id,
+                'status': 'queued',
+                'status_url': f'/api/jobs/{job_id}',
+                'events_url': f'/api/jobs/{job_id}/events'
+            })
+            response.status_code = 202
+            response.headers['Location'] = f'/api/jobs/{job_id}'
+            return response
                     
         except Exception as e:
             logger.error(f"Error in process_song: {str(e)}")
             return jsonify({'error': str(e)}), 500
 
+    def process_song_job(job):
+        """Run a queued song through the song-vocab agent.
+
+        The study session was committed when the job was queued; it is
+        removed again if the song cannot be processed.
+        """
+        session_id = job.payload['session_id']
+        payload = {
+            'song_title': job.payload['song_title'],
+            'artist': job.payload['artist'],
+            'study_activity_id': job.payload['study_activity_id'],
+            'external_session_id': session_id
+        }
+        job.progress('processing')
+        try:
+            response = proxy_to_song_vocab('POST', '/api/agent', json=payload)
+        except SongVocabUnavailable as e:
+            discard_session(session_id)
+            raise RuntimeError('Could not connect to song processing service') from e
+        except requests.exceptions.RequestException as e:
+            discard_session(session_id)
+            raise RuntimeError('Could not connect to song processing service') from e
+        except Exception as e:
+            discard_session(session_id)
+            raise RuntimeError('Internal server error') from e
+
+        # Validate song-vocab response
+        if response.get('error'):
+            logger.error(f"song-vocab error: {response['error']}")
+            discard_session(session_id)
+            raise RuntimeError('Song processing failed')
+
+        vocab_count = len(response.get('vocabulary', []))
+        logger.info(f"Processed song with {vocab_count} vocabulary items")
+        return response
+
+    app.jobs.register('song.process', process_song_job)
+
+    def discard_session(session_id):
+        """Remove the session created for a song that failed to process."""
+        try:
+            app.db.execute('DELETE FROM study_sessions WHERE id = ?', (session_id,))
+            app.db.commit()
+        except sqlite3.Error as e:
+            # Something already references the session; keep it
+            app.db.rollback()
+            logger.warning(f"Could not remove study session {session_id}: {str(e)}")
+
     @app.route('/api/practice-words/<int:session_id>')
     def get_practice_words(session_id):
         """Get practice words for a session."""
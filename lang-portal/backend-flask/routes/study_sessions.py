@@ -1,10 +1,94 @@
 from flask import request, jsonify, g
 from flask_cors import cross_origin
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import json
 import math
 import sqlite3
 
+from lib.cache import bump_versions
+from lib.scheduler import TIMESTAMP_FORMAT, apply_reviews
+
+MAX_BATCH_REVIEWS = 1000
+SESSION_FALLBACK_DURATION = timedelta(minutes=30)
+
+def parse_reviewed_at(value):
+  """Normalise an ISO 8601 timestamp to the naive UTC format SQLite stores."""
+  if value is None:
+    return None
+  reviewed_at = datetime.fromisoformat(value)
+  if reviewed_at.tzinfo is not None:
+    reviewed_at = reviewed_at.astimezone(timezone.utc).replace(tzinfo=None)
+  return reviewed_at.strftime(TIMESTAMP_FORMAT)
+
+def is_correct_flag(value):
+  """Accept only a JSON boolean or 0/1 as a review's `correct` field."""
+  return isinstance(value, bool) or (type(value) is int and value in (0, 1))
+
+def session_end_time(start_time, last_activity_time):
+  """End a session at its last review, or 30 minutes after it started if it has none."""
+  if last_activity_time:
+    return last_activity_time
+  try:
+    started = datetime.fromisoformat(start_time)
+  except (TypeError, ValueError):
+    return None
+  return (started.replace(tzinfo=None) + SESSION_FALLBACK_DURATION).strftime(TIMESTAMP_FORMAT)
+
+def record_reviews(cursor, session_id, reviews):
+  """Insert review attempts and fold them into the per-word aggregates and schedules.
+
+  `reviews` is a list of (word_id, correct, reviewed_at) tuples; reviewed_at
+  may be None to use the current time. Does not commit.
+  """
+  # Untimed reviews share one UTC reading in the format CURRENT_TIMESTAMP uses,
+  # so review items, aggregates and schedules all agree on when they happened
+  now = datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+  reviews = [(word_id, correct, reviewed_at or now) for word_id, correct, reviewed_at in reviews]
+
+  cursor.executemany('''
+    INSERT INTO word_review_items (word_id, correct, study_session_id, created_at)
+    VALUES (?, ?, ?, ?)
+  ''', [(word_id, correct, session_id, reviewed_at) for word_id, correct, reviewed_at in reviews])
+
+  # Collapse the batch to one aggregate row per word before upserting
+  totals = {}
+  for word_id, correct, reviewed_at in reviews:
+    correct_count, wrong_count, last_reviewed = totals.get(word_id, (0, 0, None))
+    totals[word_id] = (
+      correct_count + (1 if correct else 0),
+      wrong_count + (0 if correct else 1),
+      max(last_reviewed, reviewed_at) if last_reviewed else reviewed_at
+    )
+  cursor.executemany('''
+    INSERT INTO word_reviews (word_id, correct_count, wrong_count, last_reviewed)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (word_id) DO UPDATE SET
+      correct_count = correct_count + excluded.correct_count,
+      wrong_count = wrong_count + excluded.wrong_count,
+      last_reviewed = MAX(COALESCE(last_reviewed, ''), excluded.last_reviewed)
+  ''', [(word_id, *counts) for word_id, counts in totals.items()])
+
+  # Advance each word's spaced-repetition schedule and due queue
+  apply_reviews(cursor, reviews)
+  bump_versions(cursor, 'word_reviews', 'word_review_items')
+
+def save_reviews(db, cursor, session_id, reviews):
+  """Record reviews now, or stage them when the write-behind buffer is enabled. Does not commit."""
+  if db.review_buffer:
+    db.review_buffer.stage(cursor, session_id, reviews)
+  else:
+    record_reviews(cursor, session_id, reviews)
+
 def load(app):
+  # Optional write-behind mode: answers are staged and group-committed
+  if app.config.get('REVIEW_BUFFER'):
+    buffer = app.db.enable_review_buffer(
+      record_reviews,
+      interval_ms=app.config.get('REVIEW_BUFFER_INTERVAL_MS', 200),
+      max_events=app.config.get('REVIEW_BUFFER_MAX_EVENTS', 500)
+    )
+    app.before_request(buffer.start)
+
   @app.route('/api/study-sessions', methods=['POST'])
   @cross_origin()
   def create_study_session():
@@ -92,23 +176,37 @@ def load(app):
       ''')
       total_count = cursor.fetchone()['count']
 
-      # Get paginated sessions
+      # Page the sessions first, then aggregate review items for just that
+      # page from the covering (study_session_id, created_at) index
       cursor.execute('''
+        WITH page AS (
+          SELECT 
+            ss.id,
+            ss.group_id,
+            g.name as group_name,
+            sa.id as activity_id,
+            sa.name as activity_name,
+            ss.created_at
+          FROM study_sessions ss
+          LEFT JOIN groups g ON g.id = ss.group_id
+          JOIN study_activities sa ON sa.id = ss.study_activity_id
+          ORDER BY ss.created_at DESC, ss.id DESC
+          LIMIT ? OFFSET ?
+        )
         SELECT 
-          ss.id,
-          ss.group_id,
-          g.name as group_name,
-          sa.id as activity_id,
-          sa.name as activity_name,
-          ss.created_at,
-          COUNT(wri.id) as review_items_count
-        FROM study_sessions ss
-        LEFT JOIN groups g ON g.id = ss.group_id
-        JOIN study_activities sa ON sa.id = ss.study_activity_id
-        LEFT JOIN word_review_items wri ON wri.study_session_id = ss.id
-        GROUP BY ss.id
-        ORDER BY ss.created_at DESC
-        LIMIT ? OFFSET ?
+          page.*,
+          COUNT(wri.study_session_id) + COALESCE(pending.count, 0) as review_items_count,
+          NULLIF(MAX(COALESCE(MAX(wri.created_at), ''), COALESCE(pending.last_activity_time, '')), '') as last_activity_time
+        FROM page
+        LEFT JOIN word_review_items wri ON wri.study_session_id = page.id
+        LEFT JOIN (
+          -- Reviews still staged by the write-behind buffer
+          SELECT study_session_id, COUNT(*) AS count, MAX(created_at) AS last_activity_time
+          FROM review_buffer
+          GROUP BY study_session_id
+        ) pending ON pending.study_session_id = page.id
+        GROUP BY page.id
+        ORDER BY page.created_at DESC, page.id DESC
       ''', (per_page, offset))
       sessions = cursor.fetchall()
 
@@ -120,7 +218,7 @@ def load(app):
           'activity_id': session['activity_id'],
           'activity_name': session['activity_name'],
           'start_time': session['created_at'],
-          'end_time': session['created_at'],  # For now, just use the same time since we don't track end time
+          'end_time': session_end_time(session['created_at'], session['last_activity_time']),
           'review_items_count': session['review_items_count']
         } for session in sessions],
         'total': total_count,
@@ -203,6 +301,8 @@ def load(app):
         
     if word_id is None or correct is None:
         return jsonify({"error": "word_id and correct fields are required"}), 400
+    if not is_correct_flag(correct):
+        return jsonify({"error": "correct must be a boolean"}), 400
 
     # Check if word exists
     cursor.execute('SELECT id FROM words WHERE id = ?', (word_id,))
@@ -214,37 +314,61 @@ def load(app):
     if not cursor.fetchone():
         return jsonify({"error": "Study session not found"}), 404
 
-    # Insert the individual review attempt into word_review_items
-    cursor.execute('''
-        INSERT INTO word_review_items (word_id, correct, study_session_id) VALUES (?, ?, ?)
-    ''', (word_id, correct, id))
-    
-    # Update or insert aggregate review record in word_reviews
-    cursor.execute('''
-        SELECT * FROM word_reviews WHERE word_id = ?
-    ''', (word_id,))
-    review = cursor.fetchone()
-
-    if review:
-        # Update existing record
-        if correct:
-            cursor.execute('''
-           UPDATE word_reviews SET correct_count = correct_count + 1, last_reviewed = ? WHERE word_id = ?
-            ''', (datetime.now(), word_id))
-        else:
-            cursor.execute('''
-                UPDATE word_reviews SET wrong_count = wrong_count + 1, last_reviewed = ? WHERE word_id = ?
-            ''', (datetime.now(), word_id))
-    else:
-        # Insert new record
-        cursor.execute('''
-            INSERT INTO word_reviews (word_id, correct_count, wrong_count, last_reviewed)
-            VALUES (?, ?, ?, ?)
-        ''', (word_id, 1 if correct else 0, 0 if correct else 1, datetime.now()))
+    # Insert the review attempt and update the aggregate in word_reviews
+    save_reviews(app.db, cursor, id, [(word_id, correct, None)])
 
     app.db.commit()
     return jsonify({"message": "Review logged successfully"})
 
+  @app.route('/api/study-sessions/<id>/reviews', methods=['POST'])
+  @cross_origin()
+  def log_reviews(id):
+    data = request.get_json(silent=True)
+    items = data.get('reviews') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+      return jsonify({"error": "Request body must be a non-empty array of reviews"}), 400
+    if len(items) > MAX_BATCH_REVIEWS:
+      return jsonify({"error": f"At most {MAX_BATCH_REVIEWS} reviews can be logged per request"}), 400
+
+    reviews = []
+    for index, item in enumerate(items):
+      if not isinstance(item, dict) or item.get('word_id') is None or item.get('correct') is None:
+        return jsonify({"error": f"Review {index}: word_id and correct fields are required"}), 400
+      if not isinstance(item['word_id'], int) or isinstance(item['word_id'], bool):
+        return jsonify({"error": f"Review {index}: word_id must be an integer"}), 400
+      if not is_correct_flag(item['correct']):
+        return jsonify({"error": f"Review {index}: correct must be a boolean"}), 400
+      try:
+        reviewed_at = parse_reviewed_at(item.get('reviewed_at'))
+      except (TypeError, ValueError):
+        return jsonify({"error": f"Review {index}: reviewed_at must be an ISO 8601 timestamp"}), 400
+      reviews.append((item['word_id'], bool(item['correct']), reviewed_at))
+
+    cursor = app.db.cursor()
+    try:
+      # Check if study session exists
+      cursor.execute('SELECT id FROM study_sessions WHERE id = ?', (id,))
+      if not cursor.fetchone():
+        return jsonify({"error": "Study session not found"}), 404
+
+      # Validate every word id in a single query
+      word_ids = sorted({word_id for word_id, _, _ in reviews})
+      cursor.execute(
+        'SELECT id FROM words WHERE id IN (SELECT value FROM json_each(?))',
+        (json.dumps(word_ids),)
+      )
+      missing = set(word_ids) - {row['id'] for row in cursor.fetchall()}
+      if missing:
+        return jsonify({"error": "Word not found", "word_ids": sorted(missing)}), 404
+
+      save_reviews(app.db, cursor, id, reviews)
+      app.db.commit()
+    except Exception as e:
+      app.db.rollback()
+      return jsonify({"error": str(e)}), 500
+
+    return jsonify({"message": "Reviews logged successfully", "reviews_logged": len(reviews)})
+
   @app.route('/api/study-sessions/reset', methods=['POST'])
   @cross_origin()
   def reset_study_sessions():
@@ -252,12 +376,17 @@ def load(app):
       cursor = app.db.cursor()
       
       # First delete all word review items since they have foreign key constraints
+      cursor.execute('DELETE FROM review_buffer')
       cursor.execute('DELETE FROM word_review_items')
       
       # Then delete all study sessions
       cursor.execute('DELETE FROM study_sessions')
       
+      app.db.bump_versions('study_sessions', 'word_review_items')
       app.db.commit()
+
+      # Triggers only track inserts, so recompute the dashboard rollups
+      app.db.rebuild_dashboard_stats(cursor)
       
       return jsonify({"message": "Study history cleared successfully"}), 200
     except Exception as e:
@@ -7,6 +7,7 @@ logger = logging.getLogger(__name__)
 def load(app):
     @app.route('/api/word-groups', methods=['GET'])
     @cross_origin()
+    @app.cache.cached('word_groups', 'word_group_assignments')
     def get_word_groups():
         try:
             cursor = app.db.cursor()
@@ -1,7 +1,82 @@
 from flask import request, jsonify, g, make_response, abort
 from flask_cors import cross_origin
+import base64
 import json
 import math
+import re
+
+from lib.group_index import group_filter_args
+
+GERMAN_FOLDS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+
+def build_fts_query(text):
+    """Turn free text into an FTS5 prefix query; every term must match.
+
+    Terms containing umlauts or ß also match their spelled-out form
+    (schön -> schoen, straße -> strasse) via the german_folded column.
+    """
+    terms = []
+    for token in re.findall(r'\w+', text.lower()):
+        folded = token.translate(GERMAN_FOLDS)
+        if folded != token:
+            terms.append(f'("{token}"* OR "{folded}"*)')
+        else:
+            terms.append(f'"{token}"*')
+    return ' '.join(terms)
+
+def encode_cursor(row, sort_column):
+    """Encode the sort position of a row as an opaque, url-safe cursor."""
+    payload = json.dumps([row[sort_column], row['source'], row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor into (value, source, id)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, source, word_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if source not in ('practice', 'regular') or not isinstance(word_id, int):
+        raise ValueError('Invalid cursor')
+    return value, source, word_id
+
+def keyset_predicate(column, order, value, source, word_id):
+    """Build the WHERE clause selecting rows strictly after a cursor position.
+
+    Rows are ordered by (column, source, id) in the same direction; SQLite
+    sorts NULLs first ascending and last descending, so NULL sort values need
+    their own branches.
+    """
+    op = '>' if order == 'asc' else '<'
+    tiebreak = f'(source, id) {op} (?, ?)'
+    if value is None:
+        if order == 'asc':
+            return f'(({column} IS NULL AND {tiebreak}) OR {column} IS NOT NULL)', [source, word_id]
+        return f'({column} IS NULL AND {tiebreak})', [source, word_id]
+    # The leading inclusive bound lets SQLite seek the sort index to the cursor
+    clause = f'{column} {op}= ? AND ({column} {op} ? OR {tiebreak})'
+    if order == 'desc':
+        clause = f'({clause}) OR {column} IS NULL'
+    return f'({clause})', [value, value, source, word_id]
+
+def review_count_sql(db):
+    """Select list and join for a word's review counts.
+
+    The counts are kept on words by triggers on word_reviews; answers still
+    staged by the write-behind buffer are only joined in when it is enabled.
+    """
+    if db.review_buffer is None:
+        return {
+            'review_counts': 'w.correct_count, w.wrong_count',
+            'pending_join': ''
+        }
+    return {
+        'review_counts': (
+            'w.correct_count + COALESCE(p.correct_count, 0) AS correct_count, '
+            'w.wrong_count + COALESCE(p.wrong_count, 0) AS wrong_count'
+        ),
+        'pending_join': 'LEFT JOIN pending_word_reviews p ON w.id = p.word_id'
+    }
 
 def load(app):
     # Endpoint: GET /words with pagination and filtering
@@ -19,6 +94,11 @@ def load(app):
             sort_by = request.args.get('sort_by', 'german')
             order = request.args.get('order', 'asc')
             show_practice = request.args.get('show_practice', 'true').lower() == 'true'
+            # Keyset pagination: pass cursor= (empty) for the first page, then next_cursor
+            cursor_param = request.args.get('cursor')
+            # ?groups=1,2 (any of), all_groups=, exclude_groups= via the membership index
+            group_filter = group_filter_args(request.args)
+            include_total = request.args.get('include_total', 'false' if cursor_param is not None else 'true').lower() == 'true'
 
             # Validate parameters
             valid_columns = ['german', 'english', 'article', 'word_type', 'times_incorrect']
@@ -28,8 +108,10 @@ def load(app):
                 sort_by = 'german'
             if order not in ['asc', 'desc']:
                 order = 'asc'
+            # times_incorrect is exposed as wrong_count by the combined query
+            sort_column = 'wrong_count' if sort_by == 'times_incorrect' else sort_by
 
-            # Build the query for regular words
+            # Build the query for regular words; review counts live on words
             words_query = '''
                 SELECT 
                     'regular' as source,
@@ -40,12 +122,11 @@ def load(app):
                     w.article,
                     w.word_type,
                     w.additional_info,
-                    COALESCE(r.correct_count, 0) AS correct_count,
-                    COALESCE(r.wrong_count, 0) AS wrong_count
+                    {review_counts}
                 FROM words w
-                LEFT JOIN word_reviews r ON w.id = r.word_id
+                {pending_join}
                 WHERE 1=1
-            '''
+            '''.format(**review_count_sql(app.db))
             params = []
 
             # Add word type filter if specified
@@ -53,6 +134,13 @@ def load(app):
                 words_query += ' AND w.word_type = ?'
                 params.append(word_type)
 
+            # Resolve group filters to ids in-process and fetch them in one batch
+            group_ids_json = None
+            if group_filter:
+                group_ids_json = json.dumps(app.group_index.select(**group_filter))
+                words_query += ' AND w.id IN (SELECT value FROM json_each(?))'
+                params.append(group_ids_json)
+
             # Build the query for practice words
             practice_query = '''
                 SELECT 
@@ -78,75 +166,93 @@ def load(app):
             if word_type and word_type in valid_types:
                 practice_query += ' AND pw.word_type = ?'
                 params.append(word_type)
+            if group_filter:
+                # Practice words are not group members
+                practice_query += ' AND 0'
 
-            # Combine queries with UNION ALL
-            query = f'''
-                {words_query}
-                UNION ALL
-                {practice_query}
-                ORDER BY {sort_by} {order}
-                LIMIT ? OFFSET ?
-            '''
-            params.extend([words_per_page, offset])
+            next_cursor = None
+            if cursor_param is not None:
+                # Seek past the cursor position instead of skipping OFFSET rows; the
+                # predicate is pushed down into both arms of the UNION ALL
+                query = f'''
+                    SELECT * FROM (
+                        {words_query}
+                        UNION ALL
+                        {practice_query}
+                    )
+                '''
+                if cursor_param:
+                    predicate, predicate_params = keyset_predicate(sort_column, order, *decode_cursor(cursor_param))
+                    query += f' WHERE {predicate}'
+                    params.extend(predicate_params)
+                query += f' ORDER BY {sort_column} {order}, source {order}, id {order} LIMIT ?'
+                params.append(words_per_page + 1)
+            else:
+                # Combine queries with UNION ALL
+                query = f'''
+                    {words_query}
+                    UNION ALL
+                    {practice_query}
+                    ORDER BY {sort_column} {order}
+                    LIMIT ? OFFSET ?
+                '''
+                params.extend([words_per_page, offset])
 
-            app.logger.info(f"Executing query: {query} with params: {params}")
-            
-            # Execute query
-            cursor.execute(query, tuple(params))
-            words = cursor.fetchall()
-            app.logger.info(f"Found {len(words)} words")
+            # Rows come back as response-ready dicts with additional_info passed through as raw JSON
+            words = app.db.fetch_rows(query, tuple(params), raw=('additional_info',))
+            if cursor_param is not None and len(words) > words_per_page:
+                words = words[:words_per_page]
+                next_cursor = encode_cursor(words[-1], sort_column)
+            app.logger.debug('Found %d words', len(words))
+
+            if cursor_param is not None:
+                pagination = {
+                    'words_per_page': words_per_page,
+                    'next_cursor': next_cursor,
+                    'has_more': next_cursor is not None
+                }
+            else:
+                pagination = {
+                    'current_page': page,
+                    'words_per_page': words_per_page
+                }
 
             # Get total count with filters
             count_query = '''
                 SELECT (
                     SELECT COUNT(*) FROM words w WHERE 1=1
                     {word_type_filter1}
+                    {group_filter}
                 ) + (
                     SELECT COUNT(*) FROM practice_words pw WHERE 1=1
                     {word_type_filter2}
+                    {practice_group_filter}
                 )
             '''.format(
                 word_type_filter1=' AND word_type = ?' if word_type and word_type in valid_types else '',
-                word_type_filter2=' AND word_type = ?' if word_type and word_type in valid_types else ''
+                word_type_filter2=' AND word_type = ?' if word_type and word_type in valid_types else '',
+                group_filter=' AND w.id IN (SELECT value FROM json_each(?))' if group_filter else '',
+                practice_group_filter=' AND 0' if group_filter else ''
             )
             count_params = []
             if word_type and word_type in valid_types:
-                count_params.extend([word_type, word_type])
-
-            cursor.execute(count_query, tuple(count_params))
-            total_words = cursor.fetchone()[0]
-            total_pages = (total_words + words_per_page - 1) // words_per_page
-
-            # Format response
-            words_data = []
-            for word in words:
-                try:
-                    word_dict = {
-                        'source': word[0],
-                        'id': word[1],
-                        'german': word[2],
-                        'pronunciation': word[3],
-                        'english': word[4],
-                        'article': word[5],
-                        'word_type': word[6],
-                        'additional_info': json.loads(word[7]) if word[7] else {},
-                        'correct_count': word[8],
-                        'wrong_count': word[9]
-                    }
-                    words_data.append(word_dict)
-                except Exception as e:
-                    app.logger.error(f"Error processing word: {word}, error: {str(e)}")
+                count_params.append(word_type)
+            if group_filter:
+                count_params.append(group_ids_json)
+            if word_type and word_type in valid_types:
+                count_params.append(word_type)
+
+            if include_total:
+                cursor.execute(count_query, tuple(count_params))
+                total_words = cursor.fetchone()[0]
+                pagination['total_words'] = total_words
+                pagination['total_pages'] = (total_words + words_per_page - 1) // words_per_page
 
             return make_response({
                 'status': 'success',
                 'data': {
-                    'words': words_data,
-                    'pagination': {
-                        'current_page': page,
-                        'total_pages': total_pages,
-                        'words_per_page': words_per_page,
-                        'total_words': total_words
-                    }
+                    'words': words,
+                    'pagination': pagination
                 }
             })
 
@@ -163,6 +269,60 @@ def load(app):
                 'message': f'Internal server error: {str(e)}'
             }, 500)
 
+    # Endpoint: GET /words/search with prefix matching and BM25 ranking
+    @app.route('/api/words/search', methods=['GET'])
+    @cross_origin()
+    def search_words():
+        try:
+            text = request.args.get('q', '').strip()
+            limit = min(max(1, int(request.args.get('limit', 20))), 100)
+            fts_query = build_fts_query(text)
+            if not fts_query:
+                return make_response({
+                    'status': 'error',
+                    'message': 'Query parameter q is required'
+                }, 400)
+
+            cursor = app.db.cursor()
+            # Column weights favour matches on the German spelling over the translation
+            cursor.execute('''
+                SELECT source, word_id, german, english, word_type,
+                       bm25(vocabulary_fts, 10.0, 5.0, 10.0) AS score
+                FROM vocabulary_fts
+                WHERE vocabulary_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+            ''', (fts_query, limit))
+            results = cursor.fetchall()
+
+            return make_response({
+                'status': 'success',
+                'data': {
+                    'query': text,
+                    'words': [{
+                        'source': row['source'],
+                        'id': row['word_id'],
+                        'german': row['german'],
+                        'english': row['english'],
+                        'word_type': row['word_type'],
+                        'score': row['score']
+                    } for row in results]
+                }
+            })
+
+        except ValueError as e:
+            app.logger.error(f"Invalid parameter: {str(e)}")
+            return make_response({
+                'status': 'error',
+                'message': 'Invalid parameters provided'
+            }, 400)
+        except Exception as e:
+            app.logger.error(f"Error searching words: {str(e)}")
+            return make_response({
+                'status': 'error',
+                'message': f'Internal server error: {str(e)}'
+            }, 500)
+
     # Create a new word
     @app.route('/api/words', methods=['POST'])
     @cross_origin()
@@ -208,31 +368,17 @@ def load(app):
             ))
             
             word_id = cursor.lastrowid
+            app.db.bump_versions('words')
             app.db.commit()
             
             # Return the created word
-            cursor.execute('''
+            word_data = app.db.fetch_rows('''
                 SELECT w.id, w.german, w.pronunciation, w.english, w.article, 
                        w.word_type, w.additional_info,
-                       COALESCE(r.correct_count, 0) AS correct_count,
-                       COALESCE(r.wrong_count, 0) AS wrong_count
+                       w.correct_count, w.wrong_count
                 FROM words w
-                LEFT JOIN word_reviews r ON w.id = r.word_id
                 WHERE w.id = ?
-            ''', (word_id,))
-            
-            word = cursor.fetchone()
-            word_data = {
-                'id': word[0],
-                'german': word[1],
-                'pronunciation': word[2],
-                'english': word[3],
-                'article': word[4],
-                'word_type': word[5],
-                'additional_info': json.loads(word[6]) if word[6] else {},
-                'correct_count': word[7],
-                'wrong_count': word[8]
-            }
+            ''', (word_id,), raw=('additional_info',))[0]
             
             return make_response({
                 'status': 'success',
@@ -251,35 +397,22 @@ def load(app):
     @cross_origin()
     def get_word(word_id):
         try:
-            cursor = app.db.cursor()
-            cursor.execute('''
+            rows = app.db.fetch_rows('''
                 SELECT w.id, w.german, w.pronunciation, w.english, w.article, 
                        w.word_type, w.additional_info,
-                       COALESCE(r.correct_count, 0) AS correct_count,
-                       COALESCE(r.wrong_count, 0) AS wrong_count
+                       {review_counts},
+                       w.last_reviewed, w.mastery
                 FROM words w
-                LEFT JOIN word_reviews r ON w.id = r.word_id
+                {pending_join}
                 WHERE w.id = ?
-            ''', (word_id,))
-            
-            word = cursor.fetchone()
-            if not word:
+            '''.format(**review_count_sql(app.db)), (word_id,), raw=('additional_info',))
+
+            if not rows:
                 return make_response({
                     'status': 'error',
                     'message': 'Word not found'
                 }, 404)
-
-            word_data = {
-                'id': word[0],
-                'german': word[1],
-                'pronunciation': word[2],
-                'english': word[3],
-                'article': word[4],
-                'word_type': word[5],
-                'additional_info': json.loads(word[6]) if word[6] else {},
-                'correct_count': word[7],
-                'wrong_count': word[8]
-            }
+            word_data = rows[0]
 
             return make_response({
                 'status': 'success',
@@ -1,46 +1,39 @@
-import json
 import sqlite3
+import sys
 from pathlib import Path
 
-def load_json_file(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# Allow running as `python seed/seed_words.py` from the backend directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.bulk_import import import_file
+from lib.migrations import migrate
 
 def seed_words():
-    # Connect to database
-    conn = sqlite3.connect('../words.db')
-    cursor = conn.cursor()
+    # Connect to the same database the app uses
+    db_path = Path(__file__).resolve().parent.parent / 'data' / 'lang_portal.db'
+    # The importer bumps cache_versions, which the migrations create
+    migrate(str(db_path))
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA foreign_keys = ON')
     
     # Get the directory containing this script
     seed_dir = Path(__file__).parent
     
-    # Load word data
-    nouns = load_json_file(seed_dir / 'data_nouns.json')['nouns']
-    adjectives = load_json_file(seed_dir / 'data_adjectives.json')['adjectives']
-    verbs = load_json_file(seed_dir / 'data_verbs.json')['verbs']
-    
-    # Clear existing words
-    cursor.execute('DELETE FROM words')
-    
-    # Insert words
-    for word_list in [nouns, adjectives, verbs]:
-        for word in word_list:
-            cursor.execute('''
-                INSERT INTO words (german, pronunciation, english, article, word_type, additional_info)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                word['german'],
-                word.get('pronunciation'),
-                word['english'],
-                word.get('article'),  # Only nouns have articles
-                word['word_type'],
-                json.dumps(word['additional_info'])
-            ))
+    # Re-running is safe: words already present (same german and word_type)
+    # are skipped but still linked to their group, so existing reviews and
+    # schedules keep pointing at the same rows
+    for filename, group_name in [
+        ('data_nouns.json', 'Core Nouns'),
+        ('data_adjectives.json', 'Core Adjectives'),
+        ('data_verbs.json', 'Core Verbs')
+    ]:
+        key = group_name.lower().split()[-1]  # 'Core Verbs' -> 'verbs'
+        stats = import_file(conn, seed_dir / filename, group_name=group_name, key=key)
+        print(f"{filename}: {stats['inserted']} words inserted into '{group_name}', "
+              f"{stats['duplicates']} duplicates skipped ({stats['rows_per_sec']} rows/sec)")
     
-    # Commit changes
-    conn.commit()
     conn.close()
     print("Word data seeded successfully!")
 
 if __name__ == '__main__':
-    seed_words()
\ No newline at end of file
+    seed_words()
@@ -1,5 +1,7 @@
-from app import app
+from app import create_app
 from lib.db import db
 
+app = create_app()
+
 with app.app_context():
     db.setup_tables(db.cursor())
@@ -0,0 +1,37 @@
+"""Make group_id nullable in study_sessions.
+
+SQLite cannot drop NOT NULL in place, so the table is rebuilt. Databases
+created from sql/setup already have a nullable column and are left alone.
+"""
+
+def upgrade(cursor):
+  columns = {row[1]: row for row in cursor.execute('PRAGMA table_info(study_sessions)').fetchall()}
+  if 'group_id' not in columns or not columns['group_id'][3]:  # notnull flag
+    return
+
+  # Rebuilding drops the table's indexes and triggers; keep their definitions
+  cursor.execute('''
+    SELECT sql FROM sqlite_master
+    WHERE tbl_name = 'study_sessions' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+  ''')
+  dependents = [row[0] for row in cursor.fetchall()]
+
+  cursor.execute('''
+    CREATE TABLE study_sessions_new (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      group_id INTEGER,  -- The group of words being studied (optional)
+      study_activity_id INTEGER NOT NULL,  -- The activity performed
+      created_at DATETIME DEFAULT CURRENT_TIMESTAMP,  -- Timestamp of the session
+      FOREIGN KEY (group_id) REFERENCES groups(id),
+      FOREIGN KEY (study_activity_id) REFERENCES study_activities(id)
+    )
+  ''')
+  cursor.execute('''
+    INSERT INTO study_sessions_new (id, group_id, study_activity_id, created_at)
+    SELECT id, group_id, study_activity_id, created_at
+    FROM study_sessions
+  ''')
+  cursor.execute('DROP TABLE study_sessions')
+  cursor.execute('ALTER TABLE study_sessions_new RENAME TO study_sessions')
+  for sql in dependents:
+    cursor.execute(sql)
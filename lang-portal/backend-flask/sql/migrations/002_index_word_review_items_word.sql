@@ -0,0 +1,2 @@
+-- Per-word review history lookups (word detail, exports, stats rebuilds)
+CREATE INDEX IF NOT EXISTS idx_word_review_items_word ON word_review_items(word_id);
@@ -0,0 +1,11 @@
+-- One aggregate row per word, required by INSERT ... ON CONFLICT (word_id).
+-- Merge duplicate rows left by older writers first; a no-op once unique.
+UPDATE word_reviews SET
+  correct_count = (SELECT SUM(d.correct_count) FROM word_reviews d WHERE d.word_id = word_reviews.word_id),
+  wrong_count = (SELECT SUM(d.wrong_count) FROM word_reviews d WHERE d.word_id = word_reviews.word_id),
+  last_reviewed = (SELECT MAX(d.last_reviewed) FROM word_reviews d WHERE d.word_id = word_reviews.word_id)
+WHERE id IN (SELECT MIN(id) FROM word_reviews GROUP BY word_id HAVING COUNT(*) > 1);
+
+DELETE FROM word_reviews WHERE id NOT IN (SELECT MIN(id) FROM word_reviews GROUP BY word_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_word_reviews_word ON word_reviews(word_id);
@@ -0,0 +1,2 @@
+-- word_type filter on /api/words (the practice_words arm of the UNION)
+CREATE INDEX IF NOT EXISTS idx_practice_words_type ON practice_words(word_type);
@@ -0,0 +1,2 @@
+-- Newest-first session listings and the dashboard's most recent session
+CREATE INDEX IF NOT EXISTS idx_study_sessions_created ON study_sessions(created_at);
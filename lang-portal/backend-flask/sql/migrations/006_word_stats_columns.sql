@@ -0,0 +1,72 @@
+-- Per-word review stats stored on words so listings read one table.
+-- word_reviews stays the source of truth; the triggers below copy every
+-- change to it onto the word in the same transaction.
+-- mastery: 0 new, 1 learning (< 50% correct), 2 familiar, 3 mastered
+-- (>= 5 attempts and >= 80% correct, as on the dashboard)
+ALTER TABLE words ADD COLUMN correct_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE words ADD COLUMN wrong_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE words ADD COLUMN last_reviewed TIMESTAMP;
+ALTER TABLE words ADD COLUMN mastery INTEGER NOT NULL DEFAULT 0;
+
+UPDATE words SET
+  correct_count = COALESCE(wr.correct_count, 0),
+  wrong_count = COALESCE(wr.wrong_count, 0),
+  last_reviewed = wr.last_reviewed,
+  mastery = CASE
+    WHEN COALESCE(wr.correct_count, 0) + COALESCE(wr.wrong_count, 0) = 0 THEN 0
+    WHEN wr.correct_count + wr.wrong_count >= 5
+      AND wr.correct_count * 1.0 / (wr.correct_count + wr.wrong_count) >= 0.8 THEN 3
+    WHEN COALESCE(wr.correct_count, 0) * 1.0 / (wr.correct_count + wr.wrong_count) >= 0.5 THEN 2
+    ELSE 1
+  END
+FROM word_reviews wr
+WHERE wr.word_id = words.id;
+
+CREATE TRIGGER IF NOT EXISTS trg_word_stats_reviews_insert
+AFTER INSERT ON word_reviews
+BEGIN
+  UPDATE words SET
+    correct_count = COALESCE(NEW.correct_count, 0),
+    wrong_count = COALESCE(NEW.wrong_count, 0),
+    last_reviewed = NEW.last_reviewed,
+    mastery = CASE
+      WHEN COALESCE(NEW.correct_count, 0) + COALESCE(NEW.wrong_count, 0) = 0 THEN 0
+      WHEN NEW.correct_count + NEW.wrong_count >= 5
+        AND NEW.correct_count * 1.0 / (NEW.correct_count + NEW.wrong_count) >= 0.8 THEN 3
+      WHEN COALESCE(NEW.correct_count, 0) * 1.0 / (NEW.correct_count + NEW.wrong_count) >= 0.5 THEN 2
+      ELSE 1
+    END
+  WHERE id = NEW.word_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_word_stats_reviews_update
+AFTER UPDATE OF correct_count, wrong_count, last_reviewed ON word_reviews
+BEGIN
+  UPDATE words SET
+    correct_count = COALESCE(NEW.correct_count, 0),
+    wrong_count = COALESCE(NEW.wrong_count, 0),
+    last_reviewed = NEW.last_reviewed,
+    mastery = CASE
+      WHEN COALESCE(NEW.correct_count, 0) + COALESCE(NEW.wrong_count, 0) = 0 THEN 0
+      WHEN NEW.correct_count + NEW.wrong_count >= 5
+        AND NEW.correct_count * 1.0 / (NEW.correct_count + NEW.wrong_count) >= 0.8 THEN 3
+      WHEN COALESCE(NEW.correct_count, 0) * 1.0 / (NEW.correct_count + NEW.wrong_count) >= 0.5 THEN 2
+      ELSE 1
+    END
+  WHERE id = NEW.word_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_word_stats_reviews_delete
+AFTER DELETE ON word_reviews
+WHEN NOT EXISTS (SELECT 1 FROM word_reviews WHERE word_id = OLD.word_id)
+BEGIN
+  UPDATE words SET correct_count = 0, wrong_count = 0, last_reviewed = NULL, mastery = 0
+  WHERE id = OLD.word_id;
+END;
+
+-- Sort indexes for every /api/words and /api/groups/<id>/words sort_by
+-- column; rowid rides along as the keyset tiebreaker
+CREATE INDEX IF NOT EXISTS idx_words_article ON words(article);
+CREATE INDEX IF NOT EXISTS idx_words_word_type ON words(word_type, german);
+CREATE INDEX IF NOT EXISTS idx_words_correct_count ON words(correct_count);
+CREATE INDEX IF NOT EXISTS idx_words_wrong_count ON words(wrong_count);
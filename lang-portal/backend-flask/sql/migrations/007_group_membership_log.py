@@ -0,0 +1,48 @@
+"""Log word-group link changes for the in-process membership index.
+
+Triggers on the link table (word_group_assignments, or word_groups on the
+legacy schema) append one row per added or removed membership, so each
+process's lib.group_index.GroupIndex can catch up by reading the rows after
+the last one it applied. Only the newest LOG_KEEP rows are kept; an index
+that falls further behind rebuilds from the link table.
+"""
+from lib.bulk_import import group_tables
+
+LOG_KEEP = 50000
+
+def upgrade(cursor):
+  _, link_table = group_tables(cursor)
+  cursor.execute('''
+    CREATE TABLE IF NOT EXISTS group_membership_log (
+      seq INTEGER PRIMARY KEY AUTOINCREMENT,
+      group_id INTEGER NOT NULL,
+      word_id INTEGER NOT NULL,
+      added INTEGER NOT NULL  -- 1 link created, 0 link removed
+    )
+  ''')
+  prune = f'DELETE FROM group_membership_log WHERE seq <= last_insert_rowid() - {LOG_KEEP};'
+  cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_group_membership_log_insert
+    AFTER INSERT ON {link_table}
+    BEGIN
+      INSERT INTO group_membership_log (group_id, word_id, added) VALUES (NEW.group_id, NEW.word_id, 1);
+      {prune}
+    END
+  ''')
+  cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_group_membership_log_delete
+    AFTER DELETE ON {link_table}
+    BEGIN
+      INSERT INTO group_membership_log (group_id, word_id, added) VALUES (OLD.group_id, OLD.word_id, 0);
+      {prune}
+    END
+  ''')
+  cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_group_membership_log_update
+    AFTER UPDATE OF group_id, word_id ON {link_table}
+    BEGIN
+      INSERT INTO group_membership_log (group_id, word_id, added) VALUES (OLD.group_id, OLD.word_id, 0);
+      INSERT INTO group_membership_log (group_id, word_id, added) VALUES (NEW.group_id, NEW.word_id, 1);
+      {prune}
+    END
+  ''')
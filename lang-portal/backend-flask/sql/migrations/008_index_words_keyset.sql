@@ -0,0 +1,5 @@
+-- Sort indexes backing keyset pagination on /api/words; rowid rides along
+-- as the id tiebreaker, so a page seeks to the cursor instead of sorting
+CREATE INDEX IF NOT EXISTS idx_words_german ON words(german);
+CREATE INDEX IF NOT EXISTS idx_words_english ON words(english);
+CREATE INDEX IF NOT EXISTS idx_practice_words_german ON practice_words(german_word);
@@ -0,0 +1,122 @@
+-- Rollups behind /api/dashboard/stats, maintained by triggers on every write
+-- so the endpoint reads a single row instead of aggregating history.
+CREATE TABLE IF NOT EXISTS dashboard_stats (
+  id INTEGER PRIMARY KEY CHECK (id = 1),  -- Single-row table
+  total_vocabulary INTEGER NOT NULL DEFAULT 0,
+  total_sessions INTEGER NOT NULL DEFAULT 0,
+  total_reviews INTEGER NOT NULL DEFAULT 0,
+  correct_reviews INTEGER NOT NULL DEFAULT 0,
+  total_words_studied INTEGER NOT NULL DEFAULT 0,
+  mastered_words INTEGER NOT NULL DEFAULT 0  -- >= 5 attempts and >= 80% correct
+);
+
+CREATE TABLE IF NOT EXISTS daily_activity (
+  study_date TEXT PRIMARY KEY,  -- YYYY-MM-DD
+  sessions_count INTEGER NOT NULL DEFAULT 0,
+  reviews_count INTEGER NOT NULL DEFAULT 0,
+  correct_count INTEGER NOT NULL DEFAULT 0,
+  streak INTEGER NOT NULL DEFAULT 0  -- Consecutive study days ending on this date
+);
+
+CREATE TABLE IF NOT EXISTS daily_group_activity (
+  study_date TEXT NOT NULL,
+  group_id INTEGER NOT NULL,
+  PRIMARY KEY (study_date, group_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS dashboard_word_stats (
+  word_id INTEGER PRIMARY KEY,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  correct INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_dashboard_words_insert
+AFTER INSERT ON words
+BEGIN
+  UPDATE dashboard_stats SET total_vocabulary = total_vocabulary + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_dashboard_words_delete
+AFTER DELETE ON words
+BEGIN
+  UPDATE dashboard_stats SET total_vocabulary = total_vocabulary - 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_dashboard_sessions_insert
+AFTER INSERT ON study_sessions
+BEGIN
+  UPDATE dashboard_stats SET total_sessions = total_sessions + 1 WHERE id = 1;
+
+  INSERT INTO daily_activity (study_date, sessions_count, streak)
+  VALUES (
+    date(NEW.created_at),
+    1,
+    COALESCE((
+      SELECT streak FROM daily_activity
+      WHERE study_date = date(NEW.created_at, '-1 day') AND sessions_count > 0
+    ), 0) + 1
+  )
+  ON CONFLICT (study_date) DO UPDATE SET
+    sessions_count = sessions_count + 1,
+    streak = CASE WHEN sessions_count = 0 THEN excluded.streak ELSE streak END;
+
+  INSERT OR IGNORE INTO daily_group_activity (study_date, group_id)
+  SELECT date(NEW.created_at), NEW.group_id
+  WHERE NEW.group_id IS NOT NULL;
+END;
+
+-- Sessions discarded after a failed song-vocab call are deleted again; a day
+-- whose sessions_count drops to 0 gets its streak recomputed on next insert
+CREATE TRIGGER IF NOT EXISTS trg_dashboard_sessions_delete
+AFTER DELETE ON study_sessions
+BEGIN
+  UPDATE dashboard_stats SET total_sessions = total_sessions - 1 WHERE id = 1;
+
+  UPDATE daily_activity SET sessions_count = sessions_count - 1
+  WHERE study_date = date(OLD.created_at) AND sessions_count > 0;
+
+  DELETE FROM daily_group_activity
+  WHERE study_date = date(OLD.created_at)
+    AND group_id = OLD.group_id
+    AND NOT EXISTS (
+      SELECT 1 FROM study_sessions
+      WHERE group_id = OLD.group_id
+        AND created_at >= date(OLD.created_at)
+        AND created_at < date(OLD.created_at, '+1 day')
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_dashboard_reviews_insert
+AFTER INSERT ON word_review_items
+BEGIN
+  -- Remove the word's previous mastery before its counts change
+  UPDATE dashboard_stats SET
+    total_reviews = total_reviews + 1,
+    correct_reviews = correct_reviews + (NEW.correct = 1),
+    total_words_studied = total_words_studied
+      + (NOT EXISTS (SELECT 1 FROM dashboard_word_stats WHERE word_id = NEW.word_id)),
+    mastered_words = mastered_words - COALESCE((
+      SELECT attempts >= 5 AND correct * 1.0 / attempts >= 0.8
+      FROM dashboard_word_stats WHERE word_id = NEW.word_id
+    ), 0)
+  WHERE id = 1;
+
+  INSERT INTO dashboard_word_stats (word_id, attempts, correct)
+  VALUES (NEW.word_id, 1, NEW.correct = 1)
+  ON CONFLICT (word_id) DO UPDATE SET
+    attempts = attempts + 1,
+    correct = correct + excluded.correct;
+
+  UPDATE dashboard_stats SET
+    mastered_words = mastered_words + (
+      SELECT attempts >= 5 AND correct * 1.0 / attempts >= 0.8
+      FROM dashboard_word_stats WHERE word_id = NEW.word_id
+    )
+  WHERE id = 1;
+
+  INSERT INTO daily_activity (study_date, reviews_count, correct_count)
+  VALUES (date(NEW.created_at), 1, NEW.correct = 1)
+  ON CONFLICT (study_date) DO UPDATE SET
+    reviews_count = reviews_count + 1,
+    correct_count = correct_count + excluded.correct_count;
+END;
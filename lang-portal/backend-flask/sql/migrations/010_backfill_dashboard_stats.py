@@ -0,0 +1,10 @@
+"""Fill the dashboard rollups from existing history.
+
+The triggers from 009 only see writes made after they exist. Databases that
+already had the rollups (created at startup before this migration) keep them.
+"""
+from lib.dashboard import rebuild_dashboard_stats
+
+def upgrade(cursor):
+  if not cursor.execute('SELECT 1 FROM dashboard_stats WHERE id = 1').fetchone():
+    rebuild_dashboard_stats(cursor)
@@ -0,0 +1,77 @@
+-- Full-text index over words and practice_words for /api/words/search.
+-- rowid encodes the source so sync triggers can address rows directly:
+-- words.id * 2 for regular words, practice_words.id * 2 + 1 for practice words.
+-- german_folded spells umlauts and ß out (ä -> ae, ß -> ss); the tokenizer
+-- also strips diacritics, so "schon", "schoen" and "schön" all match schön.
+CREATE VIRTUAL TABLE IF NOT EXISTS vocabulary_fts USING fts5(
+  german,
+  english,
+  german_folded,
+  source UNINDEXED,
+  word_id UNINDEXED,
+  word_type UNINDEXED,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_vocabulary_fts_words_insert
+AFTER INSERT ON words
+BEGIN
+  INSERT INTO vocabulary_fts (rowid, german, english, german_folded, source, word_id, word_type)
+  VALUES (
+    NEW.id * 2, NEW.german, NEW.english,
+    replace(replace(replace(replace(replace(replace(replace(NEW.german,
+      'ä', 'ae'), 'ö', 'oe'), 'ü', 'ue'), 'Ä', 'Ae'), 'Ö', 'Oe'), 'Ü', 'Ue'), 'ß', 'ss'),
+    'regular', NEW.id, NEW.word_type
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vocabulary_fts_words_update
+AFTER UPDATE OF german, english, word_type ON words
+BEGIN
+  DELETE FROM vocabulary_fts WHERE rowid = OLD.id * 2;
+  INSERT INTO vocabulary_fts (rowid, german, english, german_folded, source, word_id, word_type)
+  VALUES (
+    NEW.id * 2, NEW.german, NEW.english,
+    replace(replace(replace(replace(replace(replace(replace(NEW.german,
+      'ä', 'ae'), 'ö', 'oe'), 'ü', 'ue'), 'Ä', 'Ae'), 'Ö', 'Oe'), 'Ü', 'Ue'), 'ß', 'ss'),
+    'regular', NEW.id, NEW.word_type
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vocabulary_fts_words_delete
+AFTER DELETE ON words
+BEGIN
+  DELETE FROM vocabulary_fts WHERE rowid = OLD.id * 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vocabulary_fts_practice_insert
+AFTER INSERT ON practice_words
+BEGIN
+  INSERT INTO vocabulary_fts (rowid, german, english, german_folded, source, word_id, word_type)
+  VALUES (
+    NEW.id * 2 + 1, NEW.german_word, NEW.english_translation,
+    replace(replace(replace(replace(replace(replace(replace(NEW.german_word,
+      'ä', 'ae'), 'ö', 'oe'), 'ü', 'ue'), 'Ä', 'Ae'), 'Ö', 'Oe'), 'Ü', 'Ue'), 'ß', 'ss'),
+    'practice', NEW.id, NEW.word_type
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vocabulary_fts_practice_update
+AFTER UPDATE OF german_word, english_translation, word_type ON practice_words
+BEGIN
+  DELETE FROM vocabulary_fts WHERE rowid = OLD.id * 2 + 1;
+  INSERT INTO vocabulary_fts (rowid, german, english, german_folded, source, word_id, word_type)
+  VALUES (
+    NEW.id * 2 + 1, NEW.german_word, NEW.english_translation,
+    replace(replace(replace(replace(replace(replace(replace(NEW.german_word,
+      'ä', 'ae'), 'ö', 'oe'), 'ü', 'ue'), 'Ä', 'Ae'), 'Ö', 'Oe'), 'Ü', 'Ue'), 'ß', 'ss'),
+    'practice', NEW.id, NEW.word_type
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vocabulary_fts_practice_delete
+AFTER DELETE ON practice_words
+BEGIN
+  DELETE FROM vocabulary_fts WHERE rowid = OLD.id * 2 + 1;
+END;
@@ -0,0 +1,27 @@
+"""Index existing words and practice words for /api/words/search.
+
+The sync triggers from 011 only see writes made after they exist. A search
+index that already has rows (created at startup before this migration) is
+left alone.
+"""
+
+# Same folding as the sync triggers in 011_vocabulary_fts.sql
+def fold(column):
+  return (
+    f"replace(replace(replace(replace(replace(replace(replace({column}, "
+    "'ä', 'ae'), 'ö', 'oe'), 'ü', 'ue'), 'Ä', 'Ae'), 'Ö', 'Oe'), 'Ü', 'Ue'), 'ß', 'ss')"
+  )
+
+def upgrade(cursor):
+  if cursor.execute('SELECT 1 FROM vocabulary_fts LIMIT 1').fetchone():
+    return
+  cursor.execute(f'''
+    INSERT INTO vocabulary_fts (rowid, german, english, german_folded, source, word_id, word_type)
+    SELECT id * 2, german, english, {fold('german')}, 'regular', id, word_type
+    FROM words
+  ''')
+  cursor.execute(f'''
+    INSERT INTO vocabulary_fts (rowid, german, english, german_folded, source, word_id, word_type)
+    SELECT id * 2 + 1, german_word, english_translation, {fold('german_word')}, 'practice', id, word_type
+    FROM practice_words
+  ''')
@@ -0,0 +1,62 @@
+"""Add the SM-2 columns to word_reviews and the per-group due queue.
+
+Per-word SM-2 state lives on word_reviews; review_schedule holds one
+(group_id, word_id, due_at) row per membership so the next due words of a
+group are a range scan on idx_review_schedule_due. Triggers on the link table
+(word_group_assignments, or word_groups on the legacy schema) keep it in step
+with group membership. Databases that already have the queue keep it.
+"""
+from lib.bulk_import import group_tables
+
+SCHEDULE_COLUMNS = {
+  'ease': 'REAL NOT NULL DEFAULT 2.5',
+  'interval_days': 'REAL NOT NULL DEFAULT 0',
+  'repetitions': 'INTEGER NOT NULL DEFAULT 0',
+  'due_at': 'TIMESTAMP',
+}
+
+def upgrade(cursor):
+  existing = {row[1] for row in cursor.execute('PRAGMA table_info(word_reviews)').fetchall()}
+  for column, definition in SCHEDULE_COLUMNS.items():
+    if column not in existing:
+      cursor.execute(f'ALTER TABLE word_reviews ADD COLUMN {column} {definition}')
+
+  if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'review_schedule'").fetchone():
+    return
+
+  _, link_table = group_tables(cursor)
+  cursor.execute('''
+    CREATE TABLE review_schedule (
+      group_id INTEGER NOT NULL,
+      word_id INTEGER NOT NULL,
+      due_at TIMESTAMP NOT NULL,
+      PRIMARY KEY (group_id, word_id)
+    ) WITHOUT ROWID
+  ''')
+  cursor.execute('CREATE INDEX idx_review_schedule_due ON review_schedule(group_id, due_at)')
+  cursor.execute('CREATE INDEX idx_review_schedule_word ON review_schedule(word_id)')
+  cursor.execute(f'''
+    CREATE TRIGGER trg_review_schedule_link_insert
+    AFTER INSERT ON {link_table}
+    BEGIN
+      INSERT OR IGNORE INTO review_schedule (group_id, word_id, due_at)
+      VALUES (
+        NEW.group_id,
+        NEW.word_id,
+        COALESCE((SELECT due_at FROM word_reviews WHERE word_id = NEW.word_id), CURRENT_TIMESTAMP)
+      );
+    END
+  ''')
+  cursor.execute(f'''
+    CREATE TRIGGER trg_review_schedule_link_delete
+    AFTER DELETE ON {link_table}
+    BEGIN
+      DELETE FROM review_schedule WHERE group_id = OLD.group_id AND word_id = OLD.word_id;
+    END
+  ''')
+  cursor.execute(f'''
+    INSERT OR IGNORE INTO review_schedule (group_id, word_id, due_at)
+    SELECT l.group_id, l.word_id, COALESCE(wr.due_at, CURRENT_TIMESTAMP)
+    FROM {link_table} l
+    LEFT JOIN word_reviews wr ON wr.word_id = l.word_id
+  ''')
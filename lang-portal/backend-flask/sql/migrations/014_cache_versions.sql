@@ -0,0 +1,5 @@
+-- Per-table write version counters used to invalidate cached responses
+CREATE TABLE IF NOT EXISTS cache_versions (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
@@ -0,0 +1,3 @@
+-- Covering index for per-session review counts and last activity time
+CREATE INDEX IF NOT EXISTS idx_word_review_items_session ON word_review_items(study_session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_study_sessions_group ON study_sessions(group_id, created_at);
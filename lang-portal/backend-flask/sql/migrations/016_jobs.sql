@@ -0,0 +1,16 @@
+-- Background jobs; rowid gives FIFO order, id is the public handle
+CREATE TABLE IF NOT EXISTS jobs (
+  id TEXT NOT NULL UNIQUE,
+  kind TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'queued',  -- queued, running, succeeded, failed
+  stage TEXT,  -- Free-form progress label set by the handler
+  payload TEXT NOT NULL,  -- JSON
+  result TEXT,  -- JSON
+  error TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  started_at TIMESTAMP,
+  finished_at TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, updated_at);
@@ -0,0 +1,19 @@
+-- Reviews staged by the optional write-behind buffer (REVIEW_BUFFER=true).
+-- A flusher folds them into word_review_items and word_reviews in group
+-- commits; until then reads add pending_word_reviews to the stored counts.
+CREATE TABLE IF NOT EXISTS review_buffer (
+  id INTEGER PRIMARY KEY,
+  study_session_id INTEGER NOT NULL,
+  word_id INTEGER NOT NULL,
+  correct BOOLEAN NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE VIEW IF NOT EXISTS pending_word_reviews AS
+SELECT
+  word_id,
+  SUM(correct = 1) AS correct_count,
+  SUM(correct = 0) AS wrong_count,
+  MAX(created_at) AS last_reviewed
+FROM review_buffer
+GROUP BY word_id;
@@ -4,5 +4,9 @@ CREATE TABLE IF NOT EXISTS word_reviews (
   correct_count INTEGER DEFAULT 0,
   wrong_count INTEGER DEFAULT 0,
   last_reviewed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  ease REAL NOT NULL DEFAULT 2.5,  -- SM-2 ease factor
+  interval_days REAL NOT NULL DEFAULT 0,  -- Current review interval
+  repetitions INTEGER NOT NULL DEFAULT 0,  -- Consecutive correct reviews
+  due_at TIMESTAMP,  -- When the word is next due (UTC)
   FOREIGN KEY (word_id) REFERENCES words(id)
-);
\ No newline at end of file
+);
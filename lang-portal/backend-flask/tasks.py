@@ -11,6 +11,37 @@ def init_db(ctx):
   db.init(app)
   print("Database initialized successfully.")
 
+@task(help={
+  'path': 'JSON, JSONL or CSV file of words',
+  'group': 'Optional group to add the imported words to',
+  'format': 'json, jsonl or csv (default: from the file extension)',
+  'key': 'For JSON objects, only import the array under this key',
+  'batch_size': 'Rows staged per executemany call'
+})
+def import_words(ctx, path, group=None, format=None, key=None, batch_size=1000):
+  """Bulk import a vocabulary file in a single transaction"""
+  from lib.bulk_import import import_file
+  from lib.migrations import migrate
+  migrate(db.database)
+  stats = import_file(db.connect(), path, group_name=group, file_format=format, key=key, batch_size=int(batch_size))
+  db.close()
+  print(f"Read {stats['read']} rows in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec): "
+        f"{stats['inserted']} inserted, {stats['duplicates']} duplicates, "
+        f"{stats['skipped']} invalid, {stats['linked']} linked to group")
+
+@task(help={
+  'mode': 'client, http or both',
+  'requests': 'Timed requests per endpoint and mode',
+  'threads': 'Concurrent HTTP clients',
+  'generate': 'Regenerate the synthetic database first',
+  'update_baseline': 'Record the results as the new baseline'
+})
+def bench(ctx, mode='both', requests=200, threads=8, generate=False, update_baseline=False):
+  """Benchmark every route against a synthetic database and compare with bench/baseline.json"""
+  flags = ' --generate' if generate else ''
+  flags += ' --update-baseline' if update_baseline else ''
+  ctx.run(f'python -m bench.run --mode {mode} --requests {requests} --threads {threads}{flags}', pty=True)
+
 @task
 def setup_db(ctx):
     """Initialize the database with tables and sample data"""
@@ -0,0 +1,45 @@
+import os
+import sqlite3
+import tempfile
+
+os.environ.setdefault('SECRET_KEY', 'test')
+
+from app import create_app
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETUP_DIR = os.path.join(BASE_DIR, 'sql', 'setup')
+
+SETUP_FILES = [
+    'create_table_words.sql',
+    'create_table_groups.sql',
+    'create_table_word_groups.sql',
+    'create_table_word_reviews.sql',
+    'create_table_study_sessions.sql',
+    'create_table_study_activities.sql',
+    'create_table_practice_words.sql',
+    'create_table_word_review_items.sql',
+    'insert_study_activities.sql',
+]
+
+def create_test_app(config=None):
+    """Create an app backed by a throwaway database built from sql/setup.
+
+    `config` overrides app settings. Returns the app and the
+    TemporaryDirectory holding the database; call cleanup_test_app() when done.
+    """
+    tmpdir = tempfile.TemporaryDirectory()
+    db_path = os.path.join(tmpdir.name, 'test.db')
+    conn = sqlite3.connect(db_path)
+    for sql_file in SETUP_FILES:
+        with open(os.path.join(SETUP_DIR, sql_file)) as f:
+            conn.executescript(f.read())
+    conn.commit()
+    conn.close()
+
+    app = create_app({'DATABASE': db_path, 'TESTING': True, 'MIGRATE_ON_STARTUP': True, **(config or {})})
+    return app, tmpdir
+
+def cleanup_test_app(app, tmpdir):
+    app.jobs.stop()
+    app.db.dispose()
+    tmpdir.cleanup()
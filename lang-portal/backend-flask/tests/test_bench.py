@@ -0,0 +1,86 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from bench.datagen import generate
+from bench.run import compare, parse_args, run, summarize
+from bench.serialize import legacy_body, make_database, measure, shared_body
+from lib.serialization import JSONProvider
+
+class TestDatagen(unittest.TestCase):
+    def test_generates_consistent_dataset(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'bench.db')
+            stats = generate(path, words=90, groups=4, sessions=30, reviews_per_session=5)
+            conn = sqlite3.connect(path)
+            try:
+                count = lambda table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                self.assertEqual(count('words'), 90)
+                self.assertEqual(count('word_review_items'), stats['review_items'])
+                self.assertEqual(count('word_group_assignments'), stats['links'])
+                reviews = conn.execute('SELECT SUM(correct_count + wrong_count) FROM word_reviews').fetchone()[0]
+                self.assertEqual(reviews, 150)
+                self.assertEqual(conn.execute('PRAGMA foreign_key_check').fetchall(), [])
+            finally:
+                conn.close()
+
+class TestCompare(unittest.TestCase):
+    baseline = {'client': {'words_list': summarize([10.0] * 100, 0, 1.0)}}
+
+    def test_within_tolerance(self):
+        results = {'client': {'words_list': summarize([11.0] * 100, 0, 1.1)}}
+        self.assertEqual(compare(results, self.baseline, 0.25), [])
+
+    def test_latency_and_error_regressions(self):
+        results = {'client': {'words_list': summarize([20.0] * 99, 1, 2.0)}}
+        regressions = compare(results, self.baseline, 0.25)
+        self.assertEqual(len(regressions), 3)  # errors, p95 and throughput
+
+    def test_sub_millisecond_noise_ignored(self):
+        baseline = {'client': {'word_detail': summarize([0.3] * 100, 0, 1.0)}}
+        results = {'client': {'word_detail': summarize([0.9] * 100, 0, 1.0)}}
+        self.assertEqual(compare(results, baseline, 0.25), [])
+
+class TestRun(unittest.TestCase):
+    def test_client_run_against_generated_database(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            args = parse_args([
+                '--db', os.path.join(tmpdir, 'bench.db'), '--words', '60', '--groups', '3',
+                '--sessions', '20', '--reviews-per-session', '3', '--mode', 'client', '--requests', '2',
+                '--only', 'words_list', '--only', 'dashboard_stats', '--only', 'log_reviews_batch',
+                '--baseline', os.path.join(tmpdir, 'baseline.json'), '--json', os.path.join(tmpdir, 'out.json'),
+                '--update-baseline'
+            ])
+            self.assertEqual(run(args), 0)
+            with open(args.json) as f:
+                results = json.load(f)['client']
+            self.assertEqual(sorted(results), ['dashboard_stats', 'log_reviews_batch', 'words_list'])
+            self.assertTrue(all(r['errors'] == 0 for r in results.values()))
+
+            # Timings from two requests are noise; only the comparison path is under test
+            args.update_baseline = False
+            args.tolerance = 1000
+            self.assertEqual(run(args), 0)
+
+class TestSerializeBench(unittest.TestCase):
+    def test_both_paths_produce_the_same_words(self):
+        conn = make_database(20)
+        app = Flask(__name__)
+        try:
+            with app.app_context():
+                legacy = json.loads(legacy_body(conn, DefaultJSONProvider(app), 20))
+                shared = json.loads(shared_body(conn, JSONProvider(app), 20))
+        finally:
+            conn.close()
+        self.assertEqual(shared, legacy)
+        self.assertEqual(len(shared['data']['words']), 20)
+
+    def test_measure(self):
+        results = measure(5, repeat=1)
+        self.assertEqual(sorted(results), ['legacy', 'shared'])
+        self.assertTrue(all(r['us_per_row'] > 0 for r in results.values()))
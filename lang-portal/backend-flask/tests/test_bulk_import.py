@@ -0,0 +1,116 @@
+import io
+import json
+import os
+import unittest
+
+from lib.bulk_import import JsonStream, import_file, bulk_import_words
+from support import create_test_app, cleanup_test_app
+
+WORDS = [
+    {'german': 'gehen', 'english': 'to go', 'word_type': 'verb', 'additional_info': {'present': {'ich': 'gehe'}}},
+    {'german': 'sehen', 'english': 'to see', 'word_type': 'verb'},
+    {'german': 'gehen', 'english': 'to walk', 'word_type': 'verb'},
+    {'german': 'schön', 'english': 'beautiful', 'word_type': 'adjective'},
+    {'german': 'kaputt', 'word_type': 'adjective'},
+]
+
+class TestJsonStream(unittest.TestCase):
+    def test_streams_arrays_across_chunk_boundaries(self):
+        """Records split over tiny reads are decoded intact"""
+        document = json.dumps({'count': 12345, 'verbs': WORDS, 'nouns': WORDS[:1]})
+        records = list(JsonStream(io.StringIO(document), chunk_size=7).records())
+        self.assertEqual(records, WORDS + WORDS[:1])
+
+    def test_selects_key(self):
+        """Only the array under the requested key is yielded"""
+        document = json.dumps({'nouns': WORDS[:1], 'verbs': WORDS[1:3]})
+        self.assertEqual(list(JsonStream(io.StringIO(document), chunk_size=5).records('verbs')), WORDS[1:3])
+
+    def test_top_level_array(self):
+        self.assertEqual(list(JsonStream(io.StringIO(json.dumps(WORDS)), chunk_size=3)), WORDS)
+
+class TestBulkImport(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.conn = self.app.db.connect()
+
+    def tearDown(self):
+        self.app.db.close()
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_json_import_dedupes_and_links_group(self):
+        """Duplicates and invalid rows are skipped; the group count is refreshed"""
+        path = self.write('words.json', json.dumps({'verbs': WORDS}))
+        stats = import_file(self.conn, path, group_name='Core Words', batch_size=2)
+        self.assertEqual(stats['read'], 5)
+        self.assertEqual(stats['skipped'], 1)
+        self.assertEqual(stats['inserted'], 3)
+        self.assertEqual(stats['duplicates'], 1)
+        self.assertEqual(stats['linked'], 3)
+
+        english = self.conn.execute("SELECT english FROM words WHERE german = 'gehen'").fetchall()
+        self.assertEqual([row[0] for row in english], ['to go'])
+        linked = self.conn.execute('''
+            SELECT COUNT(*) FROM word_group_assignments wga
+            JOIN word_groups wg ON wg.id = wga.group_id
+            WHERE wg.name = 'Core Words'
+        ''').fetchone()[0]
+        self.assertEqual(linked, 3)
+
+    def test_legacy_group_schema_refreshes_words_count(self):
+        """Databases linking through word_groups(word_id, group_id) update groups.words_count"""
+        self.conn.executescript('''
+            DROP TABLE word_group_assignments;
+            DROP TABLE word_groups;
+            CREATE TABLE word_groups (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              word_id INTEGER NOT NULL,
+              group_id INTEGER NOT NULL,
+              FOREIGN KEY (word_id) REFERENCES words(id),
+              FOREIGN KEY (group_id) REFERENCES groups(id)
+            );
+        ''')
+        path = self.write('verbs.json', json.dumps(WORDS))
+        import_file(self.conn, path, group_name='Core Verbs')
+        import_file(self.conn, path, group_name='Core Verbs')
+        words_count = self.conn.execute("SELECT words_count FROM groups WHERE name = 'Core Verbs'").fetchone()[0]
+        self.assertEqual(words_count, 3)
+
+    def test_reimport_inserts_nothing(self):
+        """Existing (german, word_type) pairs are not inserted twice"""
+        path = self.write('words.jsonl', '\n'.join(json.dumps(word) for word in WORDS))
+        import_file(self.conn, path)
+        stats = import_file(self.conn, path)
+        self.assertEqual(stats['inserted'], 0)
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM words').fetchone()[0], 3)
+
+    def test_csv_import(self):
+        """CSV rows with JSON additional_info are imported"""
+        path = self.write('words.csv', (
+            'german,english,word_type,article,additional_info\n'
+            'Hund,dog,noun,der,"{""plural"": ""Hunde""}"\n'
+            'Katze,cat,noun,die,\n'
+        ))
+        stats = import_file(self.conn, path)
+        self.assertEqual(stats['inserted'], 2)
+        info = self.conn.execute("SELECT additional_info FROM words WHERE german = 'Hund'").fetchone()[0]
+        self.assertEqual(json.loads(info), {'plural': 'Hunde'})
+
+    def test_failure_rolls_back(self):
+        """A failing import leaves no partial rows behind"""
+        def records():
+            yield WORDS[0]
+            raise RuntimeError('broken input')
+
+        with self.assertRaises(RuntimeError):
+            bulk_import_words(self.conn, records())
+        self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM words').fetchone()[0], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime, timedelta
+
+from support import create_test_app, cleanup_test_app
+
+class TestDashboardStats(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+
+        today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.execute("INSERT INTO groups (name) VALUES ('Core Verbs')")
+            group_id = cursor.lastrowid
+            cursor.executemany('''
+                INSERT INTO words (german, english, word_type) VALUES (?, ?, 'verb')
+            ''', [('gehen', 'to go'), ('sehen', 'to see'), ('essen', 'to eat')])
+
+            # Study days: 10 days ago, then yesterday and today
+            session_ids = []
+            for days_ago in (10, 1, 0):
+                cursor.execute('''
+                    INSERT INTO study_sessions (group_id, study_activity_id, created_at)
+                    VALUES (?, 1, ?)
+                ''', (group_id, (today - timedelta(days=days_ago)).strftime('%Y-%m-%d %H:%M:%S')))
+                session_ids.append(cursor.lastrowid)
+
+            # Word 1 is mastered (5/5), word 2 is not (3/5), word 3 has one wrong answer
+            reviews = [(1, True)] * 5 + [(2, True)] * 3 + [(2, False)] * 2 + [(3, False)]
+            cursor.executemany('''
+                INSERT INTO word_review_items (word_id, study_session_id, correct)
+                VALUES (?, ?, ?)
+            ''', [(word_id, session_ids[-1], correct) for word_id, correct in reviews])
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def test_stats_are_maintained_by_triggers(self):
+        """Inserts keep the single-row rollup current"""
+        stats = self.client.get('/api/dashboard/stats').get_json()
+        self.assertEqual(stats['total_vocabulary'], 3)
+        self.assertEqual(stats['total_sessions'], 3)
+        self.assertEqual(stats['total_words_studied'], 3)
+        self.assertEqual(stats['mastered_words'], 1)
+        self.assertAlmostEqual(stats['success_rate'], 8 / 11)
+        self.assertEqual(stats['active_groups'], 1)
+        self.assertEqual(stats['current_streak'], 2)
+
+    def test_rebuild_matches_incremental_stats(self):
+        """A full recompute agrees with the trigger-maintained values"""
+        before = self.client.get('/api/dashboard/stats').get_json()
+        with self.app.app_context():
+            self.app.db.rebuild_dashboard_stats(self.app.db.cursor())
+        after = self.client.get('/api/dashboard/stats').get_json()
+        self.assertEqual(before, after)
+
+    def test_reset_clears_history_stats(self):
+        """Resetting study history recomputes the rollups"""
+        self.client.post('/api/study-sessions/reset')
+        stats = self.client.get('/api/dashboard/stats').get_json()
+        self.assertEqual(stats['total_sessions'], 0)
+        self.assertEqual(stats['total_words_studied'], 0)
+        self.assertEqual(stats['success_rate'], 0)
+        self.assertEqual(stats['current_streak'], 0)
+        self.assertEqual(stats['total_vocabulary'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from lib.db import Db, PoolTimeoutError
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'pool.db')
+        self.db = Db(f'sqlite:///{self.db_path}', pool_size=2, pool_timeout=0.2)
+
+    def tearDown(self):
+        self.db.dispose()
+        self.tmpdir.cleanup()
+
+    def test_connections_use_wal_and_foreign_keys(self):
+        """Pooled connections are opened with the tuned pragmas"""
+        conn = self.db.connect()
+        self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(conn.execute('PRAGMA foreign_keys').fetchone()[0], 1)
+        self.assertEqual(conn.execute('PRAGMA synchronous').fetchone()[0], 1)  # NORMAL
+
+    def test_close_returns_connection_to_pool(self):
+        """Closing reuses the same connection on the next checkout"""
+        first = self.db.connect()
+        self.db.close()
+        second = self.db.connect()
+        self.assertIs(first, second)
+        self.assertEqual(self.db.pool.stats()['opened'], 1)
+
+    def test_checkin_rolls_back_open_transaction(self):
+        """Uncommitted work is discarded when a connection goes back to the pool"""
+        self.db.execute('CREATE TABLE t (x INTEGER)')
+        self.db.commit()
+        self.db.execute('INSERT INTO t VALUES (1)')
+        self.db.close()
+        self.assertEqual(self.db.execute('SELECT COUNT(*) FROM t').fetchone()[0], 0)
+
+    def test_checkout_times_out_when_exhausted(self):
+        """A third concurrent checkout waits and then raises"""
+        held = [self.db.pool.checkout(), self.db.pool.checkout()]
+        with self.assertRaises(PoolTimeoutError):
+            self.db.pool.checkout()
+        for conn in held:
+            self.db.pool.checkin(conn)
+
+    def test_unhealthy_connection_is_replaced(self):
+        """A connection that fails the health check is discarded on checkout"""
+        conn = self.db.connect()
+        self.db.close()
+        conn.close()
+        fresh = self.db.connect()
+        self.assertIsNot(conn, fresh)
+        self.assertEqual(fresh.execute('SELECT 1').fetchone()[0], 1)
+
+    def test_dispose_closes_checked_out_connection_on_checkin(self):
+        """A connection in use during dispose is closed when returned, and the pool stays usable"""
+        held = self.db.pool.checkout()
+        self.db.pool.dispose()
+        self.db.pool.checkin(held)
+        self.assertEqual(self.db.pool.stats(), {'size': 2, 'opened': 0, 'idle': 0})
+        with self.assertRaises(sqlite3.ProgrammingError):
+            held.execute('SELECT 1')
+
+        fresh = self.db.connect()
+        self.assertIsNot(fresh, held)
+        self.db.close()
+        self.assertIs(self.db.connect(), fresh)
+
+    def test_threads_get_distinct_connections(self):
+        """Each thread checks out its own connection"""
+        seen = []
+
+        def worker():
+            seen.append(id(self.db.connect()))
+            self.db.close()
+
+        main_conn = self.db.connect()
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(seen), 1)
+        self.assertNotEqual(seen[0], id(main_conn))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+import unittest
+
+from support import create_test_app, cleanup_test_app
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app({'EXPORT_CHUNK_ROWS': 2, 'EXPORT_MAX_CONCURRENCY': 1})
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.executemany('''
+                INSERT INTO words (german, english, word_type, additional_info) VALUES (?, ?, 'noun', ?)
+            ''', [('Haus', 'house', '{"plural": "Häuser"}'), ('Baum', 'tree', None), ('Hund', 'dog', '{}')])
+            cursor.execute("INSERT INTO word_groups (name) VALUES ('Animals')")
+            self.group_id = cursor.lastrowid
+            cursor.execute('INSERT INTO word_group_assignments (word_id, group_id) VALUES (3, ?)', (self.group_id,))
+            cursor.execute('INSERT INTO study_sessions (study_activity_id) VALUES (1)')
+            session_id = cursor.lastrowid
+            cursor.executemany('''
+                INSERT INTO word_review_items (word_id, study_session_id, correct, created_at) VALUES (?, ?, ?, ?)
+            ''', [
+                (1, session_id, 1, '2024-01-01 10:00:00'),
+                (3, session_id, 0, '2024-01-02 10:00:00'),
+                (3, session_id, 1, '2024-01-03 10:00:00'),
+                (2, session_id, 1, '2024-01-04 10:00:00'),
+                (1, session_id, 0, '2024-01-05 10:00:00')
+            ])
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def ndjson(self, path, **params):
+        response = self.client.get(path, query_string=params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertTrue(response.is_streamed)
+        body = response.get_data(as_text=True)
+        response.close()  # As the WSGI server does; frees the export slot
+        return [json.loads(line) for line in body.splitlines()]
+
+    def csv(self, path, **params):
+        response = self.client.get(path, query_string={'format': 'csv', **params})
+        self.assertEqual(response.mimetype, 'text/csv')
+        self.assertIn('.csv', response.headers['Content-Disposition'])
+        body = response.get_data(as_text=True)
+        response.close()
+        return list(csv.DictReader(io.StringIO(body)))
+
+    def test_words_ndjson(self):
+        words = self.ndjson('/api/export/words')
+        self.assertEqual([w['german'] for w in words], ['Haus', 'Baum', 'Hund'])
+        self.assertEqual([w['additional_info'] for w in words], [{'plural': 'Häuser'}, {}, {}])
+        self.assertEqual(words[0]['mastery'], 0)
+        self.assertEqual([w['german'] for w in self.ndjson('/api/export/words', group_id=self.group_id)], ['Hund'])
+
+    def test_reviews_filters(self):
+        reviews = self.ndjson('/api/export/reviews')
+        self.assertEqual(len(reviews), 5)
+        self.assertEqual((reviews[1]['german'], reviews[1]['correct']), ('Hund', False))
+
+        ranged = self.ndjson('/api/export/reviews', since='2024-01-02', until='2024-01-05')
+        self.assertEqual([r['created_at'][:10] for r in ranged], ['2024-01-02', '2024-01-03', '2024-01-04'])
+        grouped = self.ndjson('/api/export/reviews', group_id=self.group_id, since='2024-01-03T00:00:00+00:00')
+        self.assertEqual([r['id'] for r in grouped], [3])
+
+        self.assertEqual(self.client.get('/api/export/reviews?since=yesterday').status_code, 400)
+        self.assertEqual(self.client.get('/api/export/reviews?format=xml').status_code, 400)
+
+    def test_csv(self):
+        rows = self.csv('/api/export/reviews')
+        self.assertEqual(len(rows), 5)
+        self.assertEqual((rows[0]['german'], rows[0]['correct']), ('Haus', 'True'))
+
+        words = self.csv('/api/export/words')
+        self.assertEqual(json.loads(words[0]['additional_info']), {'plural': 'Häuser'})
+
+    def test_concurrent_exports_are_capped(self):
+        first = self.client.get('/api/export/words')
+        next(first.response)  # Streaming has started and holds the only slot
+        second = self.client.get('/api/export/words')
+        self.assertEqual(second.status_code, 503)
+        self.assertIn('Retry-After', second.headers)
+        first.close()
+        self.assertEqual(len(self.ndjson('/api/export/words')), 3)
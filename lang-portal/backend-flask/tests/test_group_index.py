@@ -0,0 +1,83 @@
+import unittest
+
+from support import create_test_app, cleanup_test_app
+from lib.group_index import from_bitmap, to_bitmap
+
+class TestBitmaps(unittest.TestCase):
+    def test_round_trip(self):
+        ids = [1, 7, 8, 9, 64, 1000]
+        self.assertEqual(from_bitmap(to_bitmap(ids)), ids)
+        self.assertEqual(from_bitmap(to_bitmap([])), [])
+
+class TestGroupIndex(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.executemany(
+                "INSERT INTO words (german, english, word_type) VALUES (?, ?, 'noun')",
+                [(f'Wort{i}', f'word {i}') for i in range(1, 7)]
+            )
+            cursor.executemany('INSERT INTO word_groups (id, name) VALUES (?, ?)', [(1, 'A'), (2, 'B'), (3, 'C')])
+            cursor.executemany('INSERT INTO word_group_assignments (word_id, group_id) VALUES (?, ?)', [
+                (1, 1), (2, 1), (3, 1), (4, 1),
+                (3, 2), (4, 2), (5, 2),
+                (4, 3), (6, 3)
+            ])
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def select(self, **kwargs):
+        with self.app.app_context():
+            return self.app.group_index.select(**kwargs)
+
+    def test_set_operations(self):
+        self.assertEqual(self.select(any_of=[2, 3]), [3, 4, 5, 6])
+        self.assertEqual(self.select(all_of=[1, 2]), [3, 4])
+        self.assertEqual(self.select(any_of=[1], none_of=[2]), [1, 2])
+        self.assertEqual(self.select(all_of=[1, 2], none_of=[3]), [3])
+        self.assertEqual(self.select(any_of=[99]), [])
+
+    def test_link_changes_are_applied_incrementally(self):
+        self.assertEqual(self.select(any_of=[3]), [4, 6])
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.execute('INSERT INTO word_group_assignments (word_id, group_id) VALUES (1, 3)')
+            cursor.execute('DELETE FROM word_group_assignments WHERE word_id = 4 AND group_id = 3')
+            cursor.execute('UPDATE word_group_assignments SET group_id = 3 WHERE word_id = 5 AND group_id = 2')
+            self.app.db.commit()
+        self.assertEqual(self.select(any_of=[3]), [1, 5, 6])
+        self.assertEqual(self.select(any_of=[2]), [3, 4])
+        self.assertEqual(self.app.group_index.rebuilds, 1)
+        self.assertEqual(self.app.group_index.applied, 4)
+
+    def test_falls_back_to_rebuild(self):
+        self.app.group_index.rebuild_after = 1
+        self.select(any_of=[1])
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.executemany('INSERT INTO word_group_assignments (word_id, group_id) VALUES (?, 2)', [(1,), (2,)])
+            self.app.db.commit()
+        self.assertEqual(self.select(any_of=[2]), [1, 2, 3, 4, 5])
+        self.assertEqual(self.app.group_index.rebuilds, 2)
+
+    def test_words_route(self):
+        response = self.client.get('/api/words', query_string={'groups': '1', 'exclude_groups': '2'})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()['data']
+        self.assertEqual([w['german'] for w in data['words']], ['Wort1', 'Wort2'])
+        self.assertEqual(data['pagination']['total_words'], 2)
+
+        response = self.client.get('/api/words', query_string={'all_groups': '1,2', 'cursor': ''})
+        self.assertEqual([w['id'] for w in response.get_json()['data']['words']], [3, 4])
+        self.assertEqual(self.client.get('/api/words?groups=a').status_code, 400)
+
+    def test_study_activity_words_route(self):
+        response = self.client.get('/api/study-activities/words', query_string={'groups': '2,3', 'exclude_groups': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(w['id'] for w in response.get_json()['words']), [5, 6])
+        self.assertEqual(self.client.get('/api/study-activities/words?exclude_groups=1').status_code, 400)
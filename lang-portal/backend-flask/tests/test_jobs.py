@@ -0,0 +1,104 @@
+import threading
+import unittest
+
+from support import create_test_app, cleanup_test_app
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app({'JOB_POLL_INTERVAL': 0.05})
+        self.client = self.app.test_client()
+        self.release = threading.Event()
+
+        def slow(job):
+            job.progress('waiting')
+            self.release.wait(5)
+            return {'echo': job.payload['value']}
+
+        def broken(job):
+            raise ValueError('bad input')
+
+        self.app.jobs.register('test.slow', slow)
+        self.app.jobs.register('test.broken', broken)
+
+    def tearDown(self):
+        self.release.set()
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def test_job_runs_in_background(self):
+        job_id = self.app.jobs.enqueue('test.slow', {'value': 42})
+        job = self.client.get(f'/api/jobs/{job_id}').get_json()
+        self.assertIn(job['status'], ('queued', 'running'))
+
+        self.release.set()
+        self.app.jobs.wait(job_id, timeout=5)
+        job = self.client.get(f'/api/jobs/{job_id}').get_json()
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result'], {'echo': 42})
+        self.assertIsNotNone(job['finished_at'])
+
+    def test_failed_job_records_error(self):
+        job_id = self.app.jobs.enqueue('test.broken', {})
+        job = self.app.jobs.wait(job_id, timeout=5)
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], 'bad input')
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get('/api/jobs/nope').status_code, 404)
+        self.assertEqual(self.client.get('/api/jobs/nope/events').status_code, 404)
+        with self.assertRaises(ValueError):
+            self.app.jobs.enqueue('test.missing', {})
+
+    def test_event_stream(self):
+        job_id = self.app.jobs.enqueue('test.slow', {'value': 'x'})
+        threading.Timer(0.2, self.release.set).start()
+        response = self.client.get(f'/api/jobs/{job_id}/events')
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        body = response.get_data(as_text=True)
+        self.assertIn('event: progress', body)
+        self.assertTrue(body.rstrip().split('\n\n')[-1].startswith('event: done'))
+        self.assertIn('"status": "succeeded"', body)
+
+    def test_stale_running_jobs_fail(self):
+        self.app.jobs.stop()
+        with self.app.app_context():
+            self.app.db.execute('''
+                INSERT INTO jobs (id, kind, status, payload, updated_at)
+                VALUES ('stale', 'test.slow', 'running', '{}', datetime('now', '-1 hour'))
+            ''')
+            self.app.db.commit()
+            self.app.jobs.fail_stale()
+            self.assertEqual(self.app.jobs.get('stale')['status'], 'failed')
+
+    def test_enqueue_leaves_caller_connection_alone(self):
+        self.app.jobs.stop()
+        with self.app.app_context():
+            conn = self.app.db.connect()
+            conn.execute('BEGIN')
+            conn.execute('SELECT COUNT(*) FROM groups').fetchone()
+            job_id = self.app.jobs.enqueue('test.slow', {'value': 1})
+            self.assertIsNotNone(self.app.jobs.get(job_id))
+            # Still the request's connection, with its transaction still open
+            self.assertIs(self.app.db.connection, conn)
+            self.assertTrue(conn.in_transaction)
+            self.app.db.rollback()
+
+    def test_concurrent_start_spawns_one_pool(self):
+        self.app.jobs.stop()
+        before = len([t for t in threading.enumerate() if t.name == 'job-worker-0'])
+        barrier = threading.Barrier(8)
+
+        def start():
+            barrier.wait()
+            self.app.jobs.start()
+
+        threads = [threading.Thread(target=start) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        workers = [t for t in threading.enumerate() if t in self.app.jobs._threads and t.is_alive()]
+        self.assertEqual(len(workers), self.app.jobs.workers)
+        self.assertEqual(len([t for t in threading.enumerate() if t.name == 'job-worker-0']) - before, 1)
+
+if __name__ == '__main__':
+    unittest.main()
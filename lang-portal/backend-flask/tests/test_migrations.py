@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from lib.migrations import MigrationError, discover, migrate, pending, split_statements
+from support import create_app, create_test_app, cleanup_test_app
+
+class TestMigrationRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.tmpdir.name, 'test.db')
+        self.migrations = os.path.join(self.tmpdir.name, 'migrations')
+        os.mkdir(self.migrations)
+        conn = sqlite3.connect(self.database)
+        conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+        conn.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, filename, content):
+        with open(os.path.join(self.migrations, filename), 'w') as f:
+            f.write(content)
+
+    def query(self, sql):
+        conn = sqlite3.connect(self.database)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_applies_pending_in_order_once(self):
+        self.write('002_add_index.sql', 'CREATE INDEX idx_items_label ON items(label);')
+        self.write('001_add_column.sql', 'ALTER TABLE items ADD COLUMN label TEXT;')
+        self.write('003_seed.py', "def upgrade(cursor):\n  cursor.execute(\"INSERT INTO items (name) VALUES ('a;b')\")\n")
+        self.write('notes.txt', 'ignored')
+
+        self.assertEqual(migrate(self.database, self.migrations), [1, 2, 3])
+        self.assertEqual(migrate(self.database, self.migrations), [])
+        self.assertEqual(pending(self.database, self.migrations), [])
+        self.assertEqual(self.query('SELECT version, name FROM schema_migrations ORDER BY version'), [
+            (1, 'add_column'), (2, 'add_index'), (3, 'seed')
+        ])
+        self.assertEqual(self.query('SELECT name FROM items'), [('a;b',)])
+
+    def test_failed_migration_rolls_back(self):
+        self.write('001_ok.sql', 'CREATE INDEX idx_items_name ON items(name);')
+        self.write('002_broken.sql', "INSERT INTO items (name) VALUES ('x');\nCREATE INDEX bad ON missing(x);")
+        self.write('003_never.sql', 'CREATE INDEX idx_never ON items(id);')
+
+        with self.assertRaises(MigrationError):
+            migrate(self.database, self.migrations)
+        self.assertEqual(self.query('SELECT version FROM schema_migrations'), [(1,)])
+        self.assertEqual(self.query('SELECT COUNT(*) FROM items'), [(0,)])
+        self.assertEqual([m.version for m in pending(self.database, self.migrations)], [2, 3])
+
+    def test_up_to_date_startup_is_fast(self):
+        for version in range(1, 21):
+            self.write(f'{version:03d}_index_{version}.sql', f'CREATE INDEX idx_{version} ON items(name, id);')
+        migrate(self.database, self.migrations)
+        started = time.perf_counter()
+        self.assertEqual(migrate(self.database, self.migrations), [])
+        self.assertLess(time.perf_counter() - started, 0.25)
+
+    def test_split_statements_keeps_trigger_bodies(self):
+        statements = list(split_statements('''
+            CREATE TABLE t (x);
+            CREATE TRIGGER tr AFTER INSERT ON t BEGIN UPDATE t SET x = ';'; END;
+        '''))
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[1].strip().endswith('END;'))
+
+class TestAppMigrations(unittest.TestCase):
+    def test_startup_applies_performance_indexes(self):
+        app, tmpdir = create_test_app()
+        try:
+            with app.app_context():
+                indexes = {row[0] for row in app.db.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                ).fetchall()}
+                applied = app.db.execute('SELECT COUNT(*) FROM schema_migrations').fetchone()[0]
+            self.assertTrue({
+                'idx_word_review_items_word', 'idx_word_reviews_word',
+                'idx_practice_words_type', 'idx_study_sessions_created'
+            } <= indexes)
+            self.assertEqual(applied, len(discover()))
+        finally:
+            cleanup_test_app(app, tmpdir)
+
+    def test_up_to_date_startup_runs_no_ddl(self):
+        """Restarting with nothing pending creates and alters nothing"""
+        app, tmpdir = create_test_app()
+        statements = []
+        connect = sqlite3.connect
+
+        def traced_connect(*args, **kwargs):
+            conn = connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        try:
+            with mock.patch('sqlite3.connect', traced_connect):
+                restarted = create_app({'DATABASE': app.config['DATABASE'], 'TESTING': True, 'MIGRATE_ON_STARTUP': True})
+            restarted.jobs.stop()
+            restarted.db.dispose()
+            ddl = [sql for sql in statements if sql.split()[0].upper() in ('CREATE', 'ALTER', 'DROP')]
+            self.assertEqual(ddl, [])
+            self.assertTrue(any('schema_migrations' in sql for sql in statements))
+        finally:
+            cleanup_test_app(app, tmpdir)
+
+    def test_keyset_page_seeks_sort_index(self):
+        """On a migrated baseline schema, a cursor page seeks instead of sorting"""
+        # A zero threshold makes every SELECT "slow" so its plan is captured
+        app, tmpdir = create_test_app({'PROFILING': True, 'PROFILING_SLOW_MS': 0})
+        try:
+            with app.app_context():
+                app.db.cursor().executemany(
+                    "INSERT INTO words (german, english, word_type) VALUES (?, ?, 'noun')",
+                    [(f'wort{i:02d}', f'word {i}') for i in range(30)]
+                )
+                app.db.commit()
+            client = app.test_client()
+            first = client.get('/api/words', query_string={'sort_by': 'german', 'cursor': '', 'per_page': 10})
+            cursor = first.get_json()['data']['pagination']['next_cursor']
+            client.delete('/api/debug/perf')
+            self.assertEqual(client.get('/api/words', query_string={'sort_by': 'german', 'cursor': cursor}).status_code, 200)
+
+            statements = client.get('/api/debug/perf').get_json()['statements']
+            page = next(s for s in statements if 'UNION ALL' in s['sql'])
+            plan = ' '.join(page['plan'])
+            self.assertIn('USING INDEX idx_words_german', plan)
+            self.assertIn('USING INDEX idx_practice_words_german', plan)
+            self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+        finally:
+            cleanup_test_app(app, tmpdir)
+
+if __name__ == '__main__':
+    unittest.main()
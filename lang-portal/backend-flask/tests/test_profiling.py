@@ -0,0 +1,63 @@
+import unittest
+
+from lib.profiling import Histogram
+from support import create_test_app, cleanup_test_app
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles_use_bucket_bounds(self):
+        histogram = Histogram()
+        for ms in [0.2] * 90 + [7] * 9 + [6000]:
+            histogram.observe(ms)
+        self.assertEqual(histogram.quantile(0.5), 0.5)
+        self.assertEqual(histogram.quantile(0.95), 10)
+        self.assertEqual(histogram.quantile(1.0), 6000)
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        # A zero threshold makes every SELECT "slow" so its plan is captured
+        self.app, self.tmpdir = create_test_app({'PROFILING': True, 'PROFILING_SLOW_MS': 0})
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.app.db.execute("INSERT INTO words (german, english, word_type) VALUES ('gehen', 'to go', 'verb')")
+            self.app.db.commit()
+        self.client.delete('/api/debug/perf')
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def test_disabled_by_default(self):
+        app, tmpdir = create_test_app()
+        try:
+            self.assertIsNone(app.profiler)
+            self.assertEqual(app.test_client().get('/api/debug/perf').status_code, 404)
+        finally:
+            cleanup_test_app(app, tmpdir)
+
+    def test_records_routes_and_statements(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/words/1').status_code, 200)
+
+        report = self.client.get('/api/debug/perf').get_json()
+        routes = {route['route']: route for route in report['routes']}
+        self.assertEqual(routes['GET /api/words/<int:word_id>']['count'], 3)
+        self.assertEqual(routes['GET /api/words/<int:word_id>']['statuses'], {'200': 3})
+
+        lookup = next(s for s in report['statements'] if 'w.mastery FROM words w' in s['sql'])
+        self.assertEqual(lookup['routes'], ['GET /api/words/<int:word_id>'])
+        self.assertEqual(lookup['count'], 3)
+        self.assertEqual(lookup['rows'], 3)
+        self.assertTrue(any('INTEGER PRIMARY KEY' in step for step in lookup['plan']))
+
+    def test_prometheus_export(self):
+        self.client.get('/api/words/1')
+        response = self.client.get('/api/debug/perf/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.mimetype.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+        self.assertIn('# TYPE lang_portal_route_duration_seconds histogram', text)
+        self.assertIn('lang_portal_route_duration_seconds_count{route="GET /api/words/<int:word_id>"} 1', text)
+        self.assertIn('lang_portal_sql_duration_seconds_bucket{', text)
+        self.assertIn('le="+Inf"', text)
+
+if __name__ == '__main__':
+    unittest.main()
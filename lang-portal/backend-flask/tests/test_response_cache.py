@@ -0,0 +1,67 @@
+import unittest
+
+from support import create_test_app, cleanup_test_app
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def test_etag_and_not_modified(self):
+        """A matching If-None-Match is answered with an empty 304"""
+        response = self.client.get('/api/groups')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+
+        response = self.client.get('/api/groups', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+    def test_cached_body_is_reused(self):
+        """Repeat requests are served from the cache without re-running the view"""
+        first = self.client.get('/api/study-activities')
+        second = self.client.get('/api/study-activities')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(self.app.cache.hits, 1)
+        self.assertEqual(self.app.cache.misses, 1)
+
+    def test_query_args_are_part_of_the_key(self):
+        """Different query strings get different entries and ETags"""
+        asc = self.client.get('/api/groups?order=asc&sort_by=name')
+        desc = self.client.get('/api/groups?sort_by=name&order=desc')
+        same = self.client.get('/api/groups?sort_by=name&order=asc')
+        self.assertNotEqual(asc.headers['ETag'], desc.headers['ETag'])
+        self.assertEqual(asc.headers['ETag'], same.headers['ETag'])
+
+    def test_write_invalidates(self):
+        """Creating a group bumps the groups version and changes the response"""
+        before = self.client.get('/api/groups')
+        etag = before.headers['ETag']
+
+        response = self.client.post('/api/groups', json={'name': 'Animals'})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get('/api/groups', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual([g['group_name'] for g in response.get_json()['groups']], ['Animals'])
+
+    def test_unrelated_write_keeps_entry(self):
+        """Writes to other tables leave the cached response valid"""
+        etag = self.client.get('/api/study-activities').headers['ETag']
+        self.client.post('/api/groups', json={'name': 'Animals'})
+        response = self.client.get('/api/study-activities', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_errors_are_not_cached(self):
+        """Non-200 responses pass through without an ETag"""
+        response = self.client.get('/api/groups?page=abc')
+        self.assertEqual(response.status_code, 500)
+        self.assertNotIn('ETag', response.headers)
+
+if __name__ == '__main__':
+    unittest.main()
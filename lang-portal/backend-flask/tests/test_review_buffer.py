@@ -0,0 +1,99 @@
+import unittest
+
+from support import create_test_app, cleanup_test_app
+
+class TestReviewBuffer(unittest.TestCase):
+    def setUp(self):
+        # A long interval so flushes only happen when the tests ask for them
+        self.app, self.tmpdir = create_test_app({
+            'REVIEW_BUFFER': True, 'REVIEW_BUFFER_INTERVAL_MS': 60000, 'REVIEW_BUFFER_MAX_EVENTS': 1000
+        })
+        self.client = self.app.test_client()
+        self.buffer = self.app.db.review_buffer
+
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.executemany('''
+                INSERT INTO words (german, english, word_type) VALUES (?, ?, 'verb')
+            ''', [('gehen', 'to go'), ('sehen', 'to see')])
+            cursor.execute("INSERT INTO groups (name) VALUES ('Verbs')")
+            self.group_id = cursor.lastrowid
+            cursor.execute('INSERT INTO study_sessions (group_id, study_activity_id) VALUES (?, 1)', (self.group_id,))
+            self.session_id = cursor.lastrowid
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def count(self, sql):
+        with self.app.app_context():
+            return self.app.db.execute(sql).fetchone()[0]
+
+    def log(self, reviews):
+        response = self.client.post(f'/api/study-sessions/{self.session_id}/reviews', json=reviews)
+        self.assertEqual(response.status_code, 200)
+
+    def test_reviews_are_staged_then_flushed(self):
+        self.log([{'word_id': 1, 'correct': True}, {'word_id': 1, 'correct': False}])
+        self.client.post(f'/api/study-sessions/{self.session_id}/review', json={'word_id': 2, 'correct': True})
+        self.assertEqual(self.count('SELECT COUNT(*) FROM review_buffer'), 3)
+        self.assertEqual(self.count('SELECT COUNT(*) FROM word_review_items'), 0)
+
+        self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(self.count('SELECT COUNT(*) FROM review_buffer'), 0)
+        self.assertEqual(self.count('SELECT COUNT(*) FROM word_review_items'), 3)
+        self.assertEqual(self.count('SELECT correct_count + wrong_count FROM word_reviews WHERE word_id = 1'), 2)
+        self.assertEqual(self.count('SELECT COUNT(*) FROM word_reviews WHERE due_at IS NULL'), 0)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_reads_merge_pending_reviews(self):
+        self.log([{'word_id': 1, 'correct': True}])
+        self.buffer.flush()
+        self.log([{'word_id': 1, 'correct': False}, {'word_id': 2, 'correct': True}])
+
+        def snapshot():
+            word = self.client.get('/api/words/1').get_json()['data']
+            stats = self.client.get('/api/dashboard/stats').get_json()
+            recent = self.client.get('/api/dashboard/recent-session').get_json()
+            sessions = self.client.get('/api/study-sessions').get_json()['items']
+            group_sessions = self.client.get(f'/api/groups/{self.group_id}/study_sessions').get_json()['study_sessions']
+            return (
+                (word['correct_count'], word['wrong_count']),
+                (stats['total_words_studied'], stats['success_rate']),
+                (recent['correct_count'], recent['wrong_count']),
+                sessions[0]['review_items_count'],
+                (group_sessions[0]['review_items_count'], group_sessions[0]['end_time'])
+            )
+
+        pending = snapshot()
+        self.buffer.flush()
+        self.assertEqual(pending, snapshot())
+        self.assertEqual(pending[0], (1, 1))
+        self.assertEqual(pending[3], 3)
+        self.assertEqual(pending[4][0], 3)
+
+    def test_export_includes_staged_reviews(self):
+        self.log([{'word_id': 1, 'correct': True}, {'word_id': 2, 'correct': False}])
+        lines = self.client.get('/api/export/reviews').get_data(as_text=True).splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(self.count('SELECT COUNT(*) FROM review_buffer'), 0)
+
+    def test_reviews_for_deleted_sessions_are_dropped(self):
+        self.log([{'word_id': 1, 'correct': True}])
+        with self.app.app_context():
+            self.app.db.execute('DELETE FROM study_sessions')
+            self.app.db.commit()
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.count('SELECT COUNT(*) FROM review_buffer'), 0)
+
+    def test_max_events_wakes_the_flusher(self):
+        self.buffer.max_events = 2
+        self.log([{'word_id': 1, 'correct': True}, {'word_id': 2, 'correct': True}])
+        for _ in range(100):
+            if not self.count('SELECT COUNT(*) FROM review_buffer'):
+                break
+            self.buffer._thread.join(0.02)
+        self.assertEqual(self.count('SELECT COUNT(*) FROM word_review_items'), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from datetime import datetime
+
+from support import create_test_app, cleanup_test_app
+
+class TestReviewRoutes(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.executemany('''
+                INSERT INTO words (german, english, word_type) VALUES (?, ?, 'verb')
+            ''', [('gehen', 'to go'), ('sehen', 'to see')])
+            cursor.execute('INSERT INTO study_sessions (study_activity_id) VALUES (1)')
+            self.session_id = cursor.lastrowid
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def word_reviews(self):
+        with self.app.app_context():
+            rows = self.app.db.execute('''
+                SELECT word_id, correct_count, wrong_count FROM word_reviews ORDER BY word_id
+            ''').fetchall()
+            return [tuple(row) for row in rows]
+
+    def test_batch_logs_items_and_aggregates(self):
+        """One request inserts every item and folds them into word_reviews"""
+        response = self.client.post(f'/api/study-sessions/{self.session_id}/reviews', json=[
+            {'word_id': 1, 'correct': True, 'reviewed_at': '2025-03-04T10:00:00Z'},
+            {'word_id': 1, 'correct': False},
+            {'word_id': 2, 'correct': True},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['reviews_logged'], 3)
+        self.assertEqual(self.word_reviews(), [(1, 1, 1), (2, 1, 0)])
+
+        with self.app.app_context():
+            created_at = self.app.db.execute('''
+                SELECT created_at FROM word_review_items WHERE word_id = 1 ORDER BY id LIMIT 1
+            ''').fetchone()[0]
+        self.assertEqual(created_at, '2025-03-04 10:00:00')
+
+    def test_batch_upserts_existing_aggregates(self):
+        """Single and batch endpoints accumulate into the same row"""
+        self.client.post(f'/api/study-sessions/{self.session_id}/review', json={'word_id': 2, 'correct': False})
+        self.client.post(f'/api/study-sessions/{self.session_id}/reviews', json={
+            'reviews': [{'word_id': 2, 'correct': True}, {'word_id': 2, 'correct': False}]
+        })
+        self.assertEqual(self.word_reviews(), [(2, 1, 2)])
+
+    def test_unknown_word_rejects_whole_batch(self):
+        """Nothing is written when any word id is unknown"""
+        response = self.client.post(f'/api/study-sessions/{self.session_id}/reviews', json=[
+            {'word_id': 1, 'correct': True},
+            {'word_id': 999, 'correct': True},
+        ])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json()['word_ids'], [999])
+        self.assertEqual(self.word_reviews(), [])
+
+    def test_invalid_payloads(self):
+        """Malformed batches are rejected with 400"""
+        url = f'/api/study-sessions/{self.session_id}/reviews'
+        self.assertEqual(self.client.post(url, json=[]).status_code, 400)
+        self.assertEqual(self.client.post(url, json=[{'word_id': 1}]).status_code, 400)
+        self.assertEqual(self.client.post(url, json=[{'word_id': 1, 'correct': True, 'reviewed_at': 'yesterday'}]).status_code, 400)
+        for correct in ('false', 'yes', 2, 1.0, [], {}):
+            self.assertEqual(self.client.post(url, json=[{'word_id': 1, 'correct': correct}]).status_code, 400)
+        self.assertEqual(self.client.post(url, json=[{'word_id': 1, 'correct': 0}]).status_code, 200)
+        self.assertEqual(self.word_reviews(), [(1, 0, 1)])
+
+    def test_untimed_reviews_share_one_utc_timestamp(self):
+        """Items and aggregates record the same naive UTC second"""
+        before = datetime.utcnow().replace(microsecond=0)
+        self.client.post(f'/api/study-sessions/{self.session_id}/reviews', json=[{'word_id': 1, 'correct': True}])
+        after = datetime.utcnow()
+
+        with self.app.app_context():
+            created_at = self.app.db.execute('SELECT created_at FROM word_review_items WHERE word_id = 1').fetchone()[0]
+            last_reviewed = self.app.db.execute('SELECT last_reviewed FROM word_reviews WHERE word_id = 1').fetchone()[0]
+        self.assertEqual(created_at, last_reviewed)
+        self.assertTrue(before <= datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S') <= after)
+
+    def test_unknown_session(self):
+        """Reviews for a missing session return 404"""
+        response = self.client.post('/api/study-sessions/999/reviews', json=[{'word_id': 1, 'correct': True}])
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
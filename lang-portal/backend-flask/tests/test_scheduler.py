@@ -0,0 +1,95 @@
+import unittest
+
+from lib.scheduler import next_schedule, MIN_EASE
+from support import create_test_app, cleanup_test_app
+
+class TestNextSchedule(unittest.TestCase):
+    def test_correct_answers_grow_interval(self):
+        """Intervals go 1, 6, then multiply by the ease factor"""
+        state = (2.5, 0, 0)
+        intervals = []
+        for _ in range(4):
+            state = next_schedule(*state, correct=True)
+            intervals.append(state[1])
+        self.assertEqual(intervals[:2], [1, 6])
+        self.assertGreater(intervals[2], 6)
+        self.assertGreater(intervals[3], intervals[2])
+
+    def test_wrong_answer_resets_and_lowers_ease(self):
+        """A lapse resets repetitions and never drops ease below the floor"""
+        ease, interval_days, repetitions = next_schedule(2.5, 15, 3, correct=False)
+        self.assertEqual((interval_days, repetitions), (1, 0))
+        self.assertLess(ease, 2.5)
+        for _ in range(10):
+            ease, _, _ = next_schedule(ease, 1, 0, correct=False)
+        self.assertEqual(ease, MIN_EASE)
+
+class TestDueQueue(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.execute("INSERT INTO word_groups (name) VALUES ('Verbs')")
+            self.group_id = cursor.lastrowid
+            cursor.executemany('''
+                INSERT INTO words (german, english, word_type) VALUES (?, ?, 'verb')
+            ''', [('gehen', 'to go'), ('sehen', 'to see'), ('essen', 'to eat')])
+            cursor.executemany('''
+                INSERT INTO word_group_assignments (word_id, group_id) VALUES (?, ?)
+            ''', [(word_id, self.group_id) for word_id in (1, 2, 3)])
+            # Make the queue order deterministic: word 3, then 1, then 2
+            cursor.executemany('UPDATE review_schedule SET due_at = ? WHERE word_id = ?', [
+                ('2025-01-02 00:00:00', 1), ('2025-01-03 00:00:00', 2), ('2025-01-01 00:00:00', 3)
+            ])
+            cursor.execute('INSERT INTO study_sessions (study_activity_id) VALUES (1)')
+            self.session_id = cursor.lastrowid
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def due_words(self, **params):
+        response = self.client.get('/api/study-activities/words', query_string={'group_id': self.group_id, **params})
+        self.assertEqual(response.status_code, 200)
+        return [word['id'] for word in response.get_json()['words']]
+
+    def test_words_come_back_most_overdue_first(self):
+        self.assertEqual(self.due_words(), [3, 1, 2])
+        self.assertEqual(self.due_words(limit=2), [3, 1])
+
+    def test_review_pushes_word_back(self):
+        """A correct review schedules the word a day out, behind the due words"""
+        self.client.post(f'/api/study-sessions/{self.session_id}/review', json={'word_id': 3, 'correct': True})
+        self.assertEqual(self.due_words(), [1, 2, 3])
+        self.assertEqual(self.due_words(due='true'), [1, 2])
+
+        with self.app.app_context():
+            row = self.app.db.execute('''
+                SELECT ease, interval_days, repetitions FROM word_reviews WHERE word_id = 3
+            ''').fetchone()
+        self.assertEqual(tuple(row), (2.5, 1, 1))
+
+    def test_batch_reviews_compound(self):
+        """Several answers for one word in a batch apply in order"""
+        self.client.post(f'/api/study-sessions/{self.session_id}/reviews', json=[
+            {'word_id': 1, 'correct': True},
+            {'word_id': 1, 'correct': True},
+        ])
+        with self.app.app_context():
+            row = self.app.db.execute('SELECT interval_days, repetitions FROM word_reviews WHERE word_id = 1').fetchone()
+        self.assertEqual(tuple(row), (6, 2))
+
+    def test_new_membership_joins_queue(self):
+        """Linking a word to another group adds it to that group's queue"""
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.execute("INSERT INTO word_groups (name) VALUES ('Favourites')")
+            group_id = cursor.lastrowid
+            cursor.execute('INSERT INTO word_group_assignments (word_id, group_id) VALUES (2, ?)', (group_id,))
+            self.app.db.commit()
+        self.assertEqual(self.due_words(group_id=group_id), [2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import datetime
+import json
+import sqlite3
+import unittest
+from unittest import mock
+
+from flask.json.provider import _default
+
+from support import create_test_app, cleanup_test_app
+import lib.serialization
+from lib.serialization import RawJSON, dumps, row_factory
+
+class TestDumps(unittest.TestCase):
+    value = {
+        'words': [{'id': 1, 'additional_info': RawJSON('{"plural": "Häuser"}')}, {'id': 2, 'additional_info': RawJSON('{}')}],
+        'when': datetime.date(2024, 1, 2),
+        'sneaky': '\x00not a placeholder\x00',
+        'big': 2 ** 70
+    }
+
+    def check(self):
+        encoded = dumps(self.value, default=_default, sort_keys=True)
+        decoded = json.loads(encoded)
+        self.assertEqual(decoded['words'][0]['additional_info'], {'plural': 'Häuser'})
+        self.assertEqual(decoded['words'][1]['additional_info'], {})
+        # Raw text goes out as stored, and dates keep Flask's HTTP format
+        self.assertIn('{"plural": "Häuser"}', encoded)
+        self.assertEqual(decoded['when'], 'Tue, 02 Jan 2024 00:00:00 GMT')
+        self.assertEqual(decoded['sneaky'], '\x00not a placeholder\x00')
+        self.assertEqual(decoded['big'], 2 ** 70)
+        self.assertEqual(list(decoded), sorted(decoded))
+        return encoded
+
+    @unittest.skipIf(lib.serialization.orjson is None, 'orjson not installed')
+    def test_orjson_and_stdlib_agree(self):
+        fast = self.check()
+        with mock.patch.object(lib.serialization, 'orjson', None):
+            self.assertEqual(self.check(), fast)
+
+    def test_stdlib_fallback(self):
+        with mock.patch.object(lib.serialization, 'orjson', None):
+            self.check()
+            self.assertEqual(dumps({'a': RawJSON('[1]')}, indent=2), '{\n  "a": [1]\n}')
+
+class TestRowFactory(unittest.TestCase):
+    def test_rows_are_dicts_with_raw_columns(self):
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.cursor()
+        cursor.row_factory = row_factory(raw=('additional_info',))
+        rows = cursor.execute('''
+            SELECT 1 AS id, '{"a": 1}' AS additional_info
+            UNION ALL SELECT 2, NULL
+        ''').fetchall()
+        self.assertEqual(rows, [
+            {'id': 1, 'additional_info': RawJSON('{"a": 1}')},
+            {'id': 2, 'additional_info': RawJSON('{}')}
+        ])
+        # A second statement on the same cursor picks up its own columns
+        self.assertEqual(cursor.execute('SELECT 3 AS n').fetchall(), [{'n': 3}])
+        conn.close()
+
+class TestWordResponses(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.execute('''
+                INSERT INTO words (german, english, word_type, additional_info)
+                VALUES ('Haus', 'house', 'noun', '{"plural": "Häuser"}'), ('gehen', 'to go', 'verb', NULL)
+            ''')
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def test_additional_info_passes_through(self):
+        words = self.client.get('/api/words', query_string={'show_practice': 'false'}).get_json()['data']['words']
+        self.assertEqual(
+            {w['german']: w['additional_info'] for w in words},
+            {'Haus': {'plural': 'Häuser'}, 'gehen': {}}
+        )
+        self.assertEqual(set(words[0]), {
+            'source', 'id', 'german', 'pronunciation', 'english', 'article', 'word_type',
+            'additional_info', 'correct_count', 'wrong_count'
+        })
+        self.assertEqual(self.client.get('/api/words/1').get_json()['data']['additional_info'], {'plural': 'Häuser'})
+
+        response = self.client.post('/api/words', json={
+            'german': 'Baum', 'english': 'tree', 'word_type': 'noun', 'additional_info': {'plural': 'Bäume'}
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()['data']['additional_info'], {'plural': 'Bäume'})
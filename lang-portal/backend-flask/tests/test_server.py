@@ -0,0 +1,40 @@
+import unittest
+
+from support import create_test_app, cleanup_test_app
+from lib.server import WARMUP_PATHS, WORKER_WARMUP_PATHS, after_fork, before_fork, drain, warm
+
+class TestServerLifecycle(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app({'REVIEW_BUFFER': True, 'JOB_POLL_INTERVAL': 0.05})
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def background_threads(self):
+        threads = list(self.app.jobs._threads) + [self.app.db.review_buffer._thread]
+        return sorted(t.name for t in threads if t is not None and t.is_alive())
+
+    def test_warmup_paths_exist(self):
+        """Every default warm-up request hits a registered route"""
+        with self.app.app_context():
+            self.app.db.execute("INSERT INTO words (german, english, word_type) VALUES ('gehen', 'to go', 'verb')")
+            self.app.db.commit()
+        for paths in (WARMUP_PATHS, WORKER_WARMUP_PATHS):
+            self.assertEqual(set(warm(self.app, paths).values()), {200})
+
+    def test_fork_lifecycle(self):
+        statuses = warm(self.app, ('/api/words', '/api/groups'))
+        self.assertEqual(statuses, {'/api/words': 200, '/api/groups': 200})
+        self.assertTrue(self.background_threads())  # Started by the warm-up requests
+        self.assertIsNotNone(self.app.group_index._seq)
+
+        # The master forks with no threads and no open connections
+        before_fork(self.app)
+        self.assertEqual(self.background_threads(), [])
+        self.assertEqual(len(self.app.db.pool._all), 0)
+
+        after_fork(self.app)
+        self.assertEqual(self.background_threads(), ['job-worker-0', 'job-worker-1', 'review-buffer'])
+
+        drain(self.app, timeout=1)
+        self.assertEqual(self.background_threads(), [])
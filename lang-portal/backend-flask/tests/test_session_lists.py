@@ -0,0 +1,75 @@
+import unittest
+
+from routes.study_sessions import session_end_time
+from support import create_test_app, cleanup_test_app
+
+class TestSessionEndTime(unittest.TestCase):
+    def test_last_activity_wins(self):
+        self.assertEqual(session_end_time('2025-01-01 10:00:00', '2025-01-01 10:05:00'), '2025-01-01 10:05:00')
+
+    def test_fallback_matches_sqlite_datetime(self):
+        """Sessions without reviews end 30 minutes after they start"""
+        self.assertEqual(session_end_time('2025-01-01 23:45:00', None), '2025-01-02 00:15:00')
+        self.assertEqual(session_end_time('2025-01-01T10:00:00.123456', None), '2025-01-01 10:30:00')
+        self.assertIsNone(session_end_time(None, None))
+
+class TestSessionLists(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.execute("INSERT INTO groups (name) VALUES ('Core Verbs')")
+            cursor.execute("INSERT INTO words (german, english, word_type) VALUES ('gehen', 'to go', 'verb')")
+            cursor.executemany('''
+                INSERT INTO study_sessions (group_id, study_activity_id, created_at) VALUES (1, 1, ?)
+            ''', [(f'2025-01-{day:02d} 10:00:00',) for day in range(1, 13)])
+            # Session 12 (newest) gets three reviews, session 11 one
+            cursor.executemany('''
+                INSERT INTO word_review_items (word_id, study_session_id, correct, created_at) VALUES (1, ?, 1, ?)
+            ''', [
+                (12, '2025-01-12 10:01:00'),
+                (12, '2025-01-12 10:07:00'),
+                (12, '2025-01-12 10:03:00'),
+                (11, '2025-01-11 10:02:00'),
+            ])
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def test_group_sessions_counts_and_end_times(self):
+        response = self.client.get('/api/groups/1/study_sessions')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['total_pages'], 2)
+        sessions = data['study_sessions']
+        self.assertEqual([s['id'] for s in sessions], list(range(12, 2, -1)))
+        self.assertEqual(sessions[0]['review_items_count'], 3)
+        self.assertEqual(sessions[0]['end_time'], '2025-01-12 10:07:00')
+        self.assertEqual(sessions[1]['review_items_count'], 1)
+        self.assertEqual(sessions[2]['review_items_count'], 0)
+        self.assertEqual(sessions[2]['end_time'], '2025-01-10 10:30:00')
+
+    def test_group_sessions_sort_by_review_count(self):
+        response = self.client.get('/api/groups/1/study_sessions?sort_by=reviewItemsCount&order=desc')
+        sessions = response.get_json()['study_sessions']
+        self.assertEqual([s['review_items_count'] for s in sessions[:3]], [3, 1, 0])
+
+    def test_study_sessions_pages(self):
+        """Aggregates are computed for the requested page only, newest first"""
+        response = self.client.get('/api/study-sessions?per_page=5&page=1')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['total'], 12)
+        self.assertEqual([s['id'] for s in data['items']], [12, 11, 10, 9, 8])
+        self.assertEqual([s['review_items_count'] for s in data['items']], [3, 1, 0, 0, 0])
+        self.assertEqual(data['items'][0]['end_time'], '2025-01-12 10:07:00')
+        self.assertEqual(data['items'][2]['end_time'], '2025-01-10 10:30:00')
+
+        response = self.client.get('/api/study-sessions?per_page=5&page=3')
+        self.assertEqual([s['id'] for s in response.get_json()['items']], [2, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import json
+import sqlite3
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lib.song_vocab import CircuitBreaker, SongVocabClient, SongVocabUnavailable
+from support import create_test_app, cleanup_test_app
+
+class StubSongVocab:
+    """Minimal song-vocab stand-in; `handle(method, path, body)` returns (status, payload)."""
+
+    def __init__(self, handle):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, payload = stub.handle(self.command, self.path, body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = respond
+
+            def log_message(self, *args):
+                pass
+
+        self.handle = handle
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_then_half_opens(self):
+        breaker = CircuitBreaker(threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        with self.assertRaises(SongVocabUnavailable):
+            breaker.before_call()
+
+        time.sleep(0.06)
+        breaker.before_call()  # the single trial call
+        with self.assertRaises(SongVocabUnavailable):
+            breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+
+class TestSongVocabClient(unittest.TestCase):
+    def test_connection_errors_trip_the_breaker(self):
+        client = SongVocabClient('http://127.0.0.1:9', connect_timeout=0.2, retries=0, breaker_threshold=2)
+        for _ in range(2):
+            with self.assertRaises(SongVocabUnavailable):
+                client.request('GET', '/api/songs')
+        self.assertEqual(client.breaker.state, 'open')
+        with self.assertRaisesRegex(SongVocabUnavailable, 'circuit is open'):
+            client.request('GET', '/api/songs')
+
+    def test_concurrency_limit(self):
+        release = threading.Event()
+        stub = StubSongVocab(lambda method, path, body: (release.wait(2), (200, {}))[1])
+        client = SongVocabClient(stub.url, max_concurrency=1, queue_timeout=0.05)
+        try:
+            worker = threading.Thread(target=client.request, args=('GET', '/slow'))
+            worker.start()
+            time.sleep(0.1)
+            with self.assertRaisesRegex(SongVocabUnavailable, 'busy'):
+                client.request('GET', '/other')
+            release.set()
+            worker.join()
+            self.assertEqual(client.request('GET', '/other'), {})
+        finally:
+            release.set()
+            client.close()
+            stub.close()
+
+    def test_client_errors_do_not_count_as_failures(self):
+        stub = StubSongVocab(lambda method, path, body: (404, {'detail': 'Not found'}))
+        client = SongVocabClient(stub.url, breaker_threshold=1)
+        try:
+            with self.assertRaises(Exception):
+                client.request('GET', '/api/songs/missing')
+            self.assertEqual(client.breaker.state, 'closed')
+        finally:
+            client.close()
+            stub.close()
+
+class TestProcessSong(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.stub = StubSongVocab(self.handle)
+        self.status = 200
+        self.app, self.tmpdir = create_test_app({
+            'SONG_VOCAB_URL': self.stub.url, 'SONG_VOCAB_RETRIES': 0, 'JOB_POLL_INTERVAL': 0.05
+        })
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.app.db.execute("INSERT INTO groups (name) VALUES ('Songs')")
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+        self.stub.close()
+
+    def handle(self, method, path, body):
+        # Another writer must be able to commit while the agent is running
+        conn = sqlite3.connect(self.app.config['DATABASE'], timeout=0)
+        try:
+            conn.execute("INSERT INTO groups (name) VALUES (?)", (f'concurrent {len(self.calls)}',))
+            conn.commit()
+            self.calls.append((method, path, body, None))
+        except sqlite3.OperationalError as e:
+            self.calls.append((method, path, body, str(e)))
+        finally:
+            conn.close()
+        return self.status, {'lyrics': '...', 'vocabulary': [{'word': 'Herz'}]}
+
+    def post(self):
+        response = self.client.post('/api/study-activities/2/songs/process', json={
+            'song_title': '99 Luftballons', 'artist': 'Nena', 'group_id': 1
+        })
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+        self.assertEqual(response.headers['Location'], f'/api/jobs/{job_id}')
+        with self.app.app_context():
+            self.app.jobs.wait(job_id, timeout=5)
+        return self.client.get(f'/api/jobs/{job_id}').get_json()
+
+    def session_count(self):
+        with self.app.app_context():
+            return self.app.db.execute('SELECT COUNT(*) FROM study_sessions').fetchone()[0]
+
+    def test_success_keeps_session_and_holds_no_lock(self):
+        job = self.post()
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result']['vocabulary'], [{'word': 'Herz'}])
+        method, path, body, lock_error = self.calls[0]
+        self.assertEqual((method, path), ('POST', '/api/agent'))
+        self.assertIsNone(lock_error)
+        self.assertEqual(body['external_session_id'], 1)
+        self.assertEqual(self.session_count(), 1)
+
+    def test_failure_discards_session(self):
+        self.status = 500
+        job = self.post()
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], 'Could not connect to song processing service')
+        self.assertIsNone(self.calls[0][3])
+        self.assertEqual(self.session_count(), 0)
+        stats = self.client.get('/api/dashboard/stats').get_json()
+        self.assertEqual(stats['total_sessions'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
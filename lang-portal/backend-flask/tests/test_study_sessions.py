@@ -1,13 +1,13 @@
 import unittest
 from flask import json
-from app import create_app
+from support import create_test_app, cleanup_test_app
 from datetime import datetime
 
 class TestStudySessionsRoutes(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Create tables before running any tests"""
-        cls.app = create_app()
+        cls.app, cls.tmpdir = create_test_app()
         with cls.app.app_context():
             cursor = cls.app.db.cursor()
             
@@ -42,9 +42,12 @@ class TestStudySessionsRoutes(unittest.TestCase):
             """)
             
             cls.app.db.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_app(cls.app, cls.tmpdir)
     
     def setUp(self):
-        self.app = create_app()
         self.client = self.app.test_client()
         self.db = self.app.db
         
@@ -0,0 +1,69 @@
+import unittest
+
+from support import create_test_app, cleanup_test_app
+
+class TestWordStats(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.executemany('''
+                INSERT INTO words (german, english, word_type) VALUES (?, ?, 'verb')
+            ''', [('gehen', 'to go'), ('sehen', 'to see'), ('laufen', 'to run')])
+            cursor.execute("INSERT INTO word_groups (name) VALUES ('Verbs')")
+            self.group_id = cursor.lastrowid
+            cursor.executemany(
+                'INSERT INTO word_group_assignments (word_id, group_id) VALUES (?, ?)',
+                [(1, self.group_id), (2, self.group_id)]
+            )
+            cursor.execute('INSERT INTO study_sessions (study_activity_id) VALUES (1)')
+            self.session_id = cursor.lastrowid
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def log(self, word_id, answers):
+        response = self.client.post(f'/api/study-sessions/{self.session_id}/reviews', json=[
+            {'word_id': word_id, 'correct': correct} for correct in answers
+        ])
+        self.assertEqual(response.status_code, 200)
+
+    def test_reviews_update_word_columns(self):
+        self.log(1, [True] * 5)
+        self.log(2, [True, False, False])
+
+        first = self.client.get('/api/words/1').get_json()['data']
+        self.assertEqual((first['correct_count'], first['wrong_count'], first['mastery']), (5, 0, 3))
+        self.assertIsNotNone(first['last_reviewed'])
+        second = self.client.get('/api/words/2').get_json()['data']
+        self.assertEqual((second['correct_count'], second['wrong_count'], second['mastery']), (1, 2, 1))
+        unseen = self.client.get('/api/words/3').get_json()['data']
+        self.assertEqual((unseen['correct_count'], unseen['mastery'], unseen['last_reviewed']), (0, 0, None))
+
+        self.log(2, [True, True, True])
+        self.assertEqual(self.client.get('/api/words/2').get_json()['data']['mastery'], 2)
+
+    def test_group_words_on_named_schema(self):
+        self.log(2, [False, False])
+        response = self.client.get(f'/api/groups/{self.group_id}/words', query_string={
+            'sort_by': 'wrong_count', 'order': 'desc'
+        })
+        self.assertEqual(response.status_code, 200)
+        words = response.get_json()['words']
+        self.assertEqual([(w['german'], w['wrong_count']) for w in words], [('sehen', 2), ('gehen', 0)])
+        self.assertEqual(response.get_json()['total_pages'], 1)
+        self.assertEqual(self.client.get('/api/groups/999/words').status_code, 404)
+
+    def test_sort_columns_are_indexed(self):
+        with self.app.app_context():
+            for column in ('german', 'english', 'article', 'word_type', 'correct_count', 'wrong_count'):
+                plan = ' '.join(row[3] for row in self.app.db.execute(
+                    f'EXPLAIN QUERY PLAN SELECT id FROM words ORDER BY {column} LIMIT 50'
+                ).fetchall())
+                self.assertNotIn('TEMP B-TREE', plan, column)
+
+if __name__ == '__main__':
+    unittest.main()
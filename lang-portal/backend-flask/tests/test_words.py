@@ -0,0 +1,146 @@
+import unittest
+
+from support import create_test_app, cleanup_test_app
+
+class TestWordsRoutes(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            # Duplicate german values and NULL articles exercise the id tiebreaker
+            cursor.executemany('''
+                INSERT INTO words (german, english, article, word_type, additional_info)
+                VALUES (?, ?, ?, ?, '{}')
+            ''', [
+                (f'wort{i % 40:02d}', f'word {i}', ('der', None, 'das')[i % 3], 'noun')
+                for i in range(130)
+            ])
+            cursor.executemany('''
+                INSERT INTO practice_words (german_word, english_translation, word_type)
+                VALUES (?, ?, 'noun')
+            ''', [(f'wort{i:02d}', f'practice {i}') for i in range(5)])
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def collect_pages(self, **params):
+        keys = []
+        cursor = ''
+        while True:
+            response = self.client.get('/api/words', query_string={**params, 'cursor': cursor})
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()['data']
+            keys.extend((word['source'], word['id']) for word in data['words'])
+            cursor = data['pagination']['next_cursor']
+            if cursor is None:
+                return keys
+
+    def test_cursor_pages_cover_every_word_once(self):
+        """Following next_cursor visits all 135 rows without gaps or repeats"""
+        keys = self.collect_pages(sort_by='german', order='asc')
+        self.assertEqual(len(keys), 135)
+        self.assertEqual(len(set(keys)), 135)
+
+    def test_cursor_order_matches_offset_order(self):
+        """Cursor pages return rows in the same order as a full sort"""
+        for order in ('asc', 'desc'):
+            keys = self.collect_pages(sort_by='article', order=order)
+            with self.app.app_context():
+                rows = self.app.db.execute(f'''
+                    SELECT * FROM (
+                        SELECT 'regular' AS source, id, article FROM words
+                        UNION ALL
+                        SELECT 'practice' AS source, id, NULL AS article FROM practice_words
+                    ) ORDER BY article {order}, source {order}, id {order}
+                ''').fetchall()
+            self.assertEqual(keys, [(row['source'], row['id']) for row in rows])
+
+    def test_cursor_mode_skips_total_by_default(self):
+        """The count query only runs when include_total=true"""
+        response = self.client.get('/api/words?cursor=')
+        pagination = response.get_json()['data']['pagination']
+        self.assertNotIn('total_words', pagination)
+        self.assertTrue(pagination['has_more'])
+
+        response = self.client.get('/api/words?cursor=&include_total=true')
+        self.assertEqual(response.get_json()['data']['pagination']['total_words'], 135)
+
+    def test_offset_pagination_unchanged(self):
+        """Page-number requests keep returning totals"""
+        response = self.client.get('/api/words?page=3')
+        pagination = response.get_json()['data']['pagination']
+        self.assertEqual(pagination['current_page'], 3)
+        self.assertEqual(pagination['total_pages'], 3)
+        self.assertEqual(len(response.get_json()['data']['words']), 35)
+
+    def test_invalid_cursor(self):
+        """A garbled cursor is rejected with 400"""
+        response = self.client.get('/api/words?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+class TestWordSearch(unittest.TestCase):
+    def setUp(self):
+        self.app, self.tmpdir = create_test_app()
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            cursor = self.app.db.cursor()
+            cursor.executemany('''
+                INSERT INTO words (german, english, word_type) VALUES (?, ?, ?)
+            ''', [
+                ('schön', 'beautiful', 'adjective'),
+                ('die Straße', 'the street', 'noun'),
+                ('gehen', 'to go', 'verb'),
+                ('geben', 'to give', 'verb'),
+            ])
+            cursor.execute('''
+                INSERT INTO practice_words (german_word, english_translation, word_type)
+                VALUES ('das Gefühl', 'the feeling', 'noun')
+            ''')
+            self.app.db.commit()
+
+    def tearDown(self):
+        cleanup_test_app(self.app, self.tmpdir)
+
+    def search(self, q):
+        response = self.client.get('/api/words/search', query_string={'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [word['german'] for word in response.get_json()['data']['words']]
+
+    def test_prefix_matching(self):
+        """Partial words match by prefix"""
+        self.assertEqual(sorted(self.search('ge')), ['das Gefühl', 'geben', 'gehen'])
+        self.assertEqual(self.search('geh'), ['gehen'])
+
+    def test_umlaut_and_eszett_folding(self):
+        """Umlauts and ß match plain and spelled-out spellings"""
+        for q in ('schön', 'schon', 'schoen', 'SCHÖN'):
+            self.assertEqual(self.search(q), ['schön'])
+        for q in ('straße', 'strasse', 'STRASSE'):
+            self.assertEqual(self.search(q), ['die Straße'])
+        self.assertEqual(self.search('gefuehl'), ['das Gefühl'])
+
+    def test_english_matches(self):
+        """Translations are searchable too"""
+        self.assertEqual(self.search('street'), ['die Straße'])
+
+    def test_index_follows_writes(self):
+        """Triggers keep the index in sync with updates and deletes"""
+        with self.app.app_context():
+            self.app.db.execute("UPDATE words SET german = 'laufen' WHERE german = 'gehen'")
+            self.app.db.execute("DELETE FROM practice_words")
+            self.app.db.commit()
+        self.assertEqual(self.search('geh'), [])
+        self.assertEqual(self.search('lauf'), ['laufen'])
+        self.assertEqual(self.search('gefühl'), [])
+
+    def test_missing_query(self):
+        """An empty query is rejected"""
+        response = self.client.get('/api/words/search?q=%20')
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+"""Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is created and warmed once in the gunicorn master (preload_app) and
+forked into the workers; see gunicorn.conf.py and lib/server.py.
+"""
+import os
+
+# Production defaults; the dev server in app.py keeps debug on
+os.environ.setdefault('DEBUG', 'False')
+os.environ.setdefault('MIGRATE_ON_STARTUP', 'True')
+
+from app import create_app
+from lib.server import warm
+
+app = create_app()
+
+if os.environ.get('WARMUP', 'True').lower() == 'true':
+    warm(app)
@@ -5,13 +5,15 @@ from tools.search_web import search_lyrics
 from tools.extract_vocabulary import extract_vocabulary, VocabularyItem
 from tools.generate_song_id import generate_song_id
 from tools.save_results import save_results
+from cache import lyrics_cache as shared_lyrics_cache
 from exceptions import LyricsError, LyricsNotFoundError, VocabularyError, StorageError
 
 logger = logging.getLogger(__name__)
 
 class Agent:
-    def __init__(self):
+    def __init__(self, lyrics_cache=None):
         self.thought_history = []
+        self.lyrics_cache = lyrics_cache or shared_lyrics_cache
     
     def _add_thought(self, thought: str):
         """Record agent's thought process"""
@@ -46,6 +48,13 @@ class Agent:
         try:
             self._add_thought(f"Looking for lyrics of '{song_title}' by '{artist}'")
             
+            # Songs looked up before are served without any network call. The
+            # cache reads SQLite under a lock, so keep it off the event loop
+            cached = await asyncio.to_thread(self.lyrics_cache.get, song_title, artist)
+            if cached:
+                self._add_thought("Found lyrics in cache")
+                return cached['lyrics']
+            
             # Search for lyrics with timeout
             search_results = await search_lyrics(song_title, artist, timeout=10)
             if not search_results:
@@ -55,6 +64,7 @@ class Agent:
             if not lyrics:
                 raise LyricsError("Empty lyrics returned from search")
                 
+            await asyncio.to_thread(self.lyrics_cache.put, song_title, artist, lyrics, search_results[0].get('link'))
             self._add_thought("Successfully found lyrics")
             return lyrics
             
@@ -71,7 +81,7 @@ class Agent:
             self._add_thought("Extracting vocabulary from lyrics")
             
             # Extract vocabulary with timeout
-            vocab_items = await extract_vocabulary(lyrics, timeout=5)
+            vocab_items = await extract_vocabulary(lyrics, timeout=30, total_timeout=90)
             if not vocab_items:
                 raise VocabularyError("No vocabulary items extracted")
                 
@@ -106,30 +116,13 @@ class Agent:
             if not song_title or not artist:
                 raise LyricsError("Both song title and artist are required")
                 
-            self._add_thought(f"Looking for lyrics of '{song_title}' by '{artist}'")
-            
-            # Step 2: Search for lyrics with timeout
-            try:
-                search_results = await search_lyrics(song_title, artist, timeout=10)
-                if not search_results:
-                    raise LyricsNotFoundError(f"No lyrics found for '{song_title}' by '{artist}'")
-                    
-                lyrics = search_results[0].get('body', '')
-                if not lyrics:
-                    raise LyricsError("Empty lyrics returned from search")
-                    
-                self._add_thought("Successfully found lyrics, extracting vocabulary")
-                
-            except asyncio.TimeoutError:
-                raise LyricsError("Lyrics search timed out")
-            except LyricsNotFoundError as e:
-                raise LyricsError(str(e))
-            except Exception as e:
-                raise LyricsError(f"Error searching for lyrics: {str(e)}")
+            # Step 2: Get lyrics (from the cache, or by searching with timeout)
+            lyrics = await self.get_lyrics(song_title, artist)
+            self._add_thought("Extracting vocabulary")
             
             # Step 3: Extract vocabulary with timeout
             try:
-                vocab_items = await extract_vocabulary(lyrics, timeout=5)
+                vocab_items = await extract_vocabulary(lyrics, timeout=30, total_timeout=90)
                 if not vocab_items:
                     raise VocabularyError("No vocabulary items extracted")
                     
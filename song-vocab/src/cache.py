@@ -0,0 +1,266 @@
+"""
+Caches for results that are expensive to recompute (web lookups, model calls).
+"""
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from database import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+def normalize_song(title: str, artist: str) -> str:
+    """Normalize a title/artist pair so spelling variants share one key.
+
+    Case, accents written as combining characters, punctuation and runs of
+    whitespace are ignored: "99 Luftballons" / "NENA" and "99  luftballons!" /
+    "Nena" normalize alike.
+    """
+    def clean(value: str) -> str:
+        value = unicodedata.normalize('NFKC', value or '').casefold()
+        value = re.sub(r'[^\w\s]', '', value)
+        return ' '.join(value.split())
+    return f"{clean(title)}\x1f{clean(artist)}"
+
+def song_key(title: str, artist: str) -> str:
+    """Stable sha256 hex key of a normalized title/artist pair."""
+    return hashlib.sha256(normalize_song(title, artist).encode()).hexdigest()
+
+class LyricsCache:
+    """Lyrics by song, in an in-memory LRU in front of a SQLite table.
+
+    Entries older than `ttl` seconds are treated as missing, so lyrics are
+    fetched again now and then. The SQLite table lives next to the songs
+    table but is not dropped by init_db(), so the cache survives restarts.
+    Storage errors are logged and treated as misses: the cache never fails
+    a request.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, ttl: int = 30 * 24 * 3600, max_entries: int = 256):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def configure(self, ttl: Optional[int] = None, max_entries: Optional[int] = None) -> None:
+        """Apply settings; shrinking `max_entries` evicts the oldest entries."""
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+                self._evict()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        if not self._table_ready:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS lyrics_cache (
+                    key TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    artist TEXT NOT NULL,
+                    lyrics TEXT NOT NULL,
+                    link TEXT,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            self._table_ready = True
+        return conn
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry['fetched_at'] < self.ttl
+
+    def get(self, title: str, artist: str) -> Optional[Dict[str, Any]]:
+        """Return the cached {'title', 'artist', 'lyrics', 'link', 'fetched_at'} or None."""
+        key = song_key(title, artist)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self._fresh(entry):
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+            self._entries.pop(key, None)
+
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT title, artist, lyrics, link, fetched_at FROM lyrics_cache WHERE key = ?",
+                        (key,)
+                    ).fetchone()
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Lyrics cache lookup failed: {str(e)}")
+                row = None
+
+            if row:
+                entry = dict(zip(('title', 'artist', 'lyrics', 'link', 'fetched_at'), row))
+                if self._fresh(entry):
+                    self._remember(key, entry)
+                    self.db_hits += 1
+                    return entry
+            self.misses += 1
+            return None
+
+    def put(self, title: str, artist: str, lyrics: str, link: Optional[str] = None) -> None:
+        """Store lyrics for a song, replacing any earlier entry."""
+        key = song_key(title, artist)
+        entry = {'title': title, 'artist': artist, 'lyrics': lyrics, 'link': link, 'fetched_at': time.time()}
+        with self._lock:
+            self._remember(key, entry)
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        """INSERT OR REPLACE INTO lyrics_cache
+                           (key, title, artist, lyrics, link, fetched_at)
+                           VALUES (?, ?, ?, ?, ?, ?)""",
+                        (key, title, artist, lyrics, link, entry['fetched_at'])
+                    )
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Lyrics cache store failed: {str(e)}")
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM lyrics_cache")
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Lyrics cache clear failed: {str(e)}")
+            self.memory_hits = self.db_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters since startup."""
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "entries_in_memory": len(self._entries),
+            "ttl_seconds": self.ttl
+        }
+
+class VocabularyCache:
+    """Extracted vocabulary by extraction key, in SQLite with LRU eviction.
+
+    Keys come from extraction_key(), so a different model, prompt or set of
+    generation options never reuses stale results. Each read refreshes the
+    entry's last_used time and writes evict the least recently used entries
+    beyond `max_entries`. Like LyricsCache, storage errors count as misses.
+    """
+
+    def __init__(self, db_path: Path = DB_PATH, max_entries: int = 1000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, max_entries: Optional[int] = None) -> None:
+        """Apply settings; a smaller `max_entries` takes effect on the next write."""
+        if max_entries is not None:
+            self.max_entries = max_entries
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        if not self._table_ready:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS vocabulary_cache (
+                    key TEXT PRIMARY KEY,
+                    items TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vocabulary_cache_last_used ON vocabulary_cache(last_used)")
+            self._table_ready = True
+        return conn
+
+    @staticmethod
+    def extraction_key(lyrics: str, model: str, prompt_version: int, options: Dict[str, Any]) -> str:
+        """sha256 key of the lyrics together with everything that shapes the result."""
+        lyrics_hash = hashlib.sha256(lyrics.encode()).hexdigest()
+        params = json.dumps({"model": model, "prompt": prompt_version, "options": options}, sort_keys=True)
+        return hashlib.sha256(f"{lyrics_hash}\x1f{params}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached vocabulary items for `key` or None."""
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute("SELECT items FROM vocabulary_cache WHERE key = ?", (key,)).fetchone()
+                    if row:
+                        conn.execute("UPDATE vocabulary_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Vocabulary cache lookup failed: {str(e)}")
+                row = None
+
+            if row:
+                self.hits += 1
+                return json.loads(row[0])
+            self.misses += 1
+            return None
+
+    def put(self, key: str, items: List[Dict[str, Any]]) -> None:
+        """Store vocabulary items and evict the least recently used entries."""
+        now = time.time()
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        """INSERT OR REPLACE INTO vocabulary_cache (key, items, created_at, last_used)
+                           VALUES (?, ?, ?, ?)""",
+                        (key, json.dumps(items, ensure_ascii=False), now, now)
+                    )
+                    conn.execute(
+                        """DELETE FROM vocabulary_cache WHERE key IN (
+                               SELECT key FROM vocabulary_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                           )""",
+                        (self.max_entries,)
+                    )
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Vocabulary cache store failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters since startup."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "max_entries": self.max_entries
+        }
+
+# Shared by every request; main.py applies the configured TTL and sizes
+lyrics_cache = LyricsCache()
+vocabulary_cache = VocabularyCache()
@@ -0,0 +1,115 @@
+"""
+Application-scoped HTTP clients shared by the tools.
+
+main.py opens them in the FastAPI lifespan and closes them on shutdown, so
+lyrics lookups and Ollama calls reuse pooled keep-alive connections (and
+cached DNS lookups) instead of connecting anew for every request. Outside
+the app (scripts, tests) the tools fall back to short-lived clients.
+"""
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiohttp
+import httpx
+from ollama import AsyncClient
+
+logger = logging.getLogger(__name__)
+
+_http_session: Optional[aiohttp.ClientSession] = None
+_ollama_client: Optional[AsyncClient] = None
+# The connection pool under _ollama_client; ollama's client has no close()
+_ollama_transport: Optional[httpx.AsyncHTTPTransport] = None
+
+def create_http_session(
+    timeout: float = 10,
+    connect_timeout: float = 5,
+    limit: int = 100,
+    limit_per_host: int = 10,
+    keepalive: float = 30,
+    dns_cache_ttl: int = 300
+) -> aiohttp.ClientSession:
+    """Create a pooled aiohttp session; must be called with a running event loop."""
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive,
+        use_dns_cache=True,
+        ttl_dns_cache=dns_cache_ttl
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+    )
+
+def create_ollama_transport(max_connections: int = 4, keepalive: float = 30) -> httpx.AsyncHTTPTransport:
+    """Create the httpx connection pool for an Ollama client; close it with aclose()."""
+    return httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive
+        )
+    )
+
+def create_ollama_client(
+    host: str,
+    transport: httpx.AsyncHTTPTransport,
+    timeout: float = 120,
+    connect_timeout: float = 5
+) -> AsyncClient:
+    """Create an Ollama client that sends its requests through `transport`."""
+    # ollama passes extra keyword arguments on to the httpx.AsyncClient it builds
+    return AsyncClient(
+        host=host,
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        transport=transport
+    )
+
+async def open_clients(settings) -> None:
+    """Create the shared clients from the application settings."""
+    global _http_session, _ollama_client, _ollama_transport
+    _http_session = create_http_session(
+        timeout=settings.HTTP_TIMEOUT,
+        connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+        limit=settings.HTTP_MAX_CONNECTIONS,
+        limit_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        keepalive=settings.HTTP_KEEPALIVE,
+        dns_cache_ttl=settings.HTTP_DNS_CACHE_TTL
+    )
+    _ollama_transport = create_ollama_transport(
+        max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+        keepalive=settings.HTTP_KEEPALIVE
+    )
+    _ollama_client = create_ollama_client(
+        host=settings.OLLAMA_HOST,
+        transport=_ollama_transport,
+        timeout=settings.OLLAMA_TIMEOUT,
+        connect_timeout=settings.HTTP_CONNECT_TIMEOUT
+    )
+    logger.info("HTTP clients opened")
+
+async def close_clients() -> None:
+    """Close the shared clients and their pooled connections."""
+    global _http_session, _ollama_client, _ollama_transport
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
+    _ollama_client = None
+    if _ollama_transport is not None:
+        await _ollama_transport.aclose()
+        _ollama_transport = None
+    logger.info("HTTP clients closed")
+
+@asynccontextmanager
+async def http_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Yield the shared session, or a temporary one when the app has not opened it."""
+    if _http_session is not None and not _http_session.closed:
+        yield _http_session
+    else:
+        async with create_http_session() as session:
+            yield session
+
+def ollama_client(host: str) -> AsyncClient:
+    """Return the shared Ollama client, or a new one for `host` outside the app."""
+    return _ollama_client if _ollama_client is not None else AsyncClient(host=host)
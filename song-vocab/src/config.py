@@ -22,6 +22,14 @@ class Settings(BaseSettings):
     # Database
     DATABASE_PATH: str = "data/vocab.db"
     
+    # Lyrics cache: seconds before cached lyrics are fetched again, and
+    # entries kept in memory in front of the SQLite table
+    LYRICS_CACHE_TTL: int = 30 * 24 * 3600
+    LYRICS_CACHE_SIZE: int = 256
+    
+    # Vocabulary cache: extraction results kept (least recently used go first)
+    VOCAB_CACHE_SIZE: int = 1000
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     
@@ -31,6 +39,17 @@ class Settings(BaseSettings):
     
     # External Services
     SERPAPI_KEY: str
+    OLLAMA_HOST: str = "http://localhost:11434"
+    
+    # Shared HTTP clients (seconds; connection limits per pool)
+    HTTP_TIMEOUT: float = 10
+    HTTP_CONNECT_TIMEOUT: float = 5
+    HTTP_KEEPALIVE: float = 30
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 10
+    OLLAMA_TIMEOUT: float = 120
+    OLLAMA_MAX_CONNECTIONS: int = 4
     
     model_config = SettingsConfigDict(env_file='.env', case_sensitive=True)
 
@@ -18,6 +18,8 @@ from slowapi.middleware import SlowAPIMiddleware
 
 from agent import Agent
 from database import init_db
+from cache import lyrics_cache, vocabulary_cache
+from clients import open_clients, close_clients
 from exceptions import LyricsError, LyricsNotFoundError, VocabularyError, StorageError
 from config import settings
 
@@ -35,14 +37,17 @@ async def lifespan(app: FastAPI):
         # Startup
         init_db()
         logger.info("Database initialized")
+        lyrics_cache.configure(ttl=settings.LYRICS_CACHE_TTL, max_entries=settings.LYRICS_CACHE_SIZE)
+        vocabulary_cache.configure(max_entries=settings.VOCAB_CACHE_SIZE)
+        await open_clients(settings)
         yield
     except Exception as e:
         logger.error(f"Error during startup: {e}")
         raise
     finally:
-        # Shutdown - close any resources if needed
+        # Shutdown - close pooled connections
         logger.info("Shutting down application")
-        pass
+        await close_clients()
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -142,6 +147,7 @@ async def root():
             "/api/agent": "Extract vocabulary from song lyrics",
             "/api/thoughts": "Get agent's thought process history",
             "/api/sessions": "Create a new study session",
+            "/api/cache/stats": "Get cache hit and miss counters",
         }
     }
 
@@ -257,6 +263,11 @@ async def get_agent_thoughts(request: Request):
             detail=f"Error retrieving thought history: {str(e)}"
         )
 
+@app.get(f"{settings.API_V1_PREFIX}/cache/stats")
+async def get_cache_stats():
+    """Get hit and miss counters of the result caches"""
+    return {"lyrics": lyrics_cache.stats(), "vocabulary": vocabulary_cache.stats()}
+
 # Database connection helper
 def get_db():
     try:
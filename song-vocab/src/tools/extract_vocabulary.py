@@ -1,15 +1,62 @@
 from typing import List, Dict, Any, Optional
 import json
 import asyncio
+import os
+import time
 import httpx
 from pydantic import BaseModel
 import logging
-from ollama import AsyncClient
+from clients import ollama_client
 from exceptions import VocabularyError
+from cache import vocabulary_cache
 
 # Ollama configuration
-OLLAMA_HOST = 'http://localhost:11434'
+OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
 OLLAMA_MODEL = 'mistral:latest'  # Include the tag
+# Seconds a successful model check is trusted before Ollama is asked again
+OLLAMA_CHECK_INTERVAL = float(os.getenv('OLLAMA_CHECK_INTERVAL', '60'))
+
+# Lyrics are extracted in chunks of whole verses of about CHUNK_CHARS
+# characters, at most OLLAMA_CONCURRENCY at a time
+CHUNK_CHARS = int(os.getenv('VOCAB_CHUNK_CHARS', '800'))
+WORDS_PER_CHUNK = 5
+OLLAMA_CONCURRENCY = int(os.getenv('OLLAMA_CONCURRENCY', '2'))
+# Seconds the whole extraction may take; chunks still running then are dropped
+TOTAL_TIMEOUT = float(os.getenv('VOCAB_TOTAL_TIMEOUT', '90'))
+
+# Bump PROMPT_VERSION whenever the prompt changes: it is part of the
+# vocabulary cache key, so results from an older prompt are not reused
+PROMPT_VERSION = 2
+EXTRACTION_PROMPT = """
+Extract {words} important German vocabulary words from these lyrics.
+Format as a JSON array with 'word', 'lemma' and 'context' fields:
+'lemma' is the dictionary form of the word and 'context' is the lyrics line it appears in.
+Only return the JSON array, nothing else.
+
+Example format:
+[
+    {{
+        "word": "Luftballons",
+        "lemma": "Luftballon",
+        "context": "99 Luftballons auf ihrem Weg zum Horizont"
+    }}
+]
+
+Lyrics:
+{lyrics}
+"""
+GENERATION_OPTIONS = {
+    "temperature": 0.1,
+    "top_k": 10,
+    "top_p": 0.9,
+    # Room for the JSON of WORDS_PER_CHUNK items with their context lines
+    "num_predict": 512
+}
+# Everything besides the lyrics, model and prompt version that shapes the result
+CACHE_OPTIONS = {**GENERATION_OPTIONS, "chunk_chars": CHUNK_CHARS, "words_per_chunk": WORDS_PER_CHUNK}
+
+# time.monotonic() of the last successful check_ollama(), None if it failed
+_ollama_checked_at: Optional[float] = None
 
 logger = logging.getLogger(__name__)
 
@@ -57,11 +104,19 @@ async def mock_vocabulary(lyrics: str) -> List[Dict[str, str]]:
     ]
 
 async def check_ollama() -> bool:
-    """Check if Ollama is running and responsive"""
+    """Check if Ollama is running and responsive
+    
+    A successful check is reused for OLLAMA_CHECK_INTERVAL seconds; failures
+    are not cached, so a freshly started Ollama is picked up right away.
+    """
+    global _ollama_checked_at
+    if _ollama_checked_at is not None and time.monotonic() - _ollama_checked_at < OLLAMA_CHECK_INTERVAL:
+        return True
+    _ollama_checked_at = None
     try:
         logger.info("Checking Ollama status...")
-        # Try to list models using AsyncClient
-        client = AsyncClient(host=OLLAMA_HOST)
+        # Try to list models using the shared client
+        client = ollama_client(OLLAMA_HOST)
         models = await client.list()
         logger.info(f"Found models: {[m['name'] for m in models['models']]}")
         
@@ -73,18 +128,153 @@ async def check_ollama() -> bool:
             return False
             
         logger.info(f"Found required model: {OLLAMA_MODEL}")
+        _ollama_checked_at = time.monotonic()
         return True
     except Exception as e:
         logger.error(f"Ollama check failed: {str(e)}")
         return False
 
-async def extract_vocabulary(lyrics: str, timeout: int = 30) -> List[VocabularyItem]:
+def split_lyrics(lyrics: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """
+    Split lyrics into chunks of whole verses of at most `max_chars` characters.
+    
+    Verses are separated by blank lines; consecutive verses are packed into one
+    chunk while they fit. A verse that is too long on its own is split between
+    lines, and a line that is too long between words.
+    
+    Args:
+        lyrics (str): Song lyrics
+        max_chars (int): Maximum characters per chunk
+        
+    Returns:
+        List[str]: Non-empty chunks in lyrics order
+    """
+    def pieces(text: str, separator: str) -> List[str]:
+        return [piece.strip() for piece in text.split(separator) if piece.strip()]
+    
+    def pack(parts: List[str], separator: str) -> List[str]:
+        chunks, current = [], ""
+        for part in parts:
+            if len(part) > max_chars:
+                # Too long on its own: split at the next finer boundary
+                if current:
+                    chunks.append(current)
+                    current = ""
+                finer = "\n" if separator == "\n\n" else " "
+                chunks.extend(pack(pieces(part, finer), finer) if separator != " " else [part[:max_chars]])
+                continue
+            candidate = f"{current}{separator}{part}" if current else part
+            if len(candidate) > max_chars:
+                chunks.append(current)
+                current = part
+            else:
+                current = candidate
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    return pack(pieces(lyrics, "\n\n"), "\n\n")
+
+def merge_vocabulary(chunk_results: List[List[Dict[str, str]]]) -> List[VocabularyItem]:
+    """
+    Merge vocabulary from several chunks, keeping one item per lemma.
+    
+    When a lemma was extracted more than once, the context that best shows the
+    word is kept: one that contains the word itself, then the shortest.
+    
+    Args:
+        chunk_results (List[List[Dict[str, str]]]): Raw items per chunk, in lyrics order
+        
+    Returns:
+        List[VocabularyItem]: Deduplicated items in order of first appearance
+    """
+    def context_score(item: Dict[str, str]) -> tuple:
+        return (item['word'].casefold() not in item['context'].casefold(), len(item['context']))
+    
+    best: Dict[str, Dict[str, str]] = {}
+    for items in chunk_results:
+        for item in items:
+            lemma = (item.get('lemma') or item['word']).strip().casefold()
+            if lemma not in best or context_score(item) < context_score(best[lemma]):
+                # Replacing keeps the lemma's position of first appearance
+                best[lemma] = item
+    return [VocabularyItem(word=item['word'], context=item['context']) for item in best.values()]
+
+def parse_vocabulary(response_text: str) -> Optional[List[Dict[str, str]]]:
+    """Parse the JSON array of a model response; None if there is none."""
+    json_str = response_text.strip()
+    logger.debug(f"Raw response: {json_str}")
+    
+    # Try to find JSON array in the response
+    start_idx = json_str.find('[')
+    end_idx = json_str.rfind(']') + 1
+    if start_idx == -1 or end_idx == 0:
+        return None
+    
+    try:
+        items = json.loads(json_str[start_idx:end_idx])
+    except json.JSONDecodeError as e:
+        logger.warning(f"Failed to parse Ollama response: {str(e)}")
+        return None
+    if not isinstance(items, list):
+        return None
+    
+    # Keep only well-formed items
+    result = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('word'), str) or not isinstance(item.get('context'), str):
+            logger.warning(f"Skipping invalid vocabulary item: {item}")
+            continue
+        result.append(item)
+    return result
+
+async def extract_chunk(chunk: str, semaphore: asyncio.Semaphore, timeout: float) -> Optional[List[Dict[str, str]]]:
+    """
+    Extract vocabulary from one chunk of lyrics.
+    
+    Returns:
+        Optional[List[Dict[str, str]]]: Parsed items, or None if the response was unusable
+        
+    Raises:
+        asyncio.TimeoutError: If the model does not answer within `timeout` seconds
+    """
+    prompt = EXTRACTION_PROMPT.format(words=WORDS_PER_CHUNK, lyrics=chunk)
+    
+    async def generate() -> str:
+        # Reuse the application's pooled client and stream the response chunks
+        client = ollama_client(OLLAMA_HOST)
+        full_response = ""
+        async for part in await client.generate(
+            model=OLLAMA_MODEL,
+            prompt=prompt,
+            stream=True,
+            options=GENERATION_OPTIONS
+        ):
+            if part and 'response' in part:
+                full_response += part['response']
+        return full_response
+    
+    async with semaphore:
+        # The timeout starts once a slot is free, so queued chunks are not penalized
+        response_text = await asyncio.wait_for(generate(), timeout=timeout)
+    return parse_vocabulary(response_text)
+
+async def extract_vocabulary(lyrics: str, timeout: int = 30, total_timeout: Optional[float] = None) -> List[VocabularyItem]:
     """
     Extract vocabulary items from lyrics using Ollama with timeout.
     
+    The lyrics are split into verse-aware chunks that are extracted
+    concurrently (at most OLLAMA_CONCURRENCY at a time), so latency follows
+    the longest chunk rather than the whole song. Results are merged with one
+    item per lemma. Chunks that fail or time out are skipped as long as
+    another chunk succeeds. Chunks still queued or running when
+    `total_timeout` expires are cancelled and count as timed out.
+    
     Args:
         lyrics (str): Song lyrics to analyze
-        timeout (int): Timeout in seconds
+        timeout (int): Timeout in seconds for each chunk
+        total_timeout (Optional[float]): Timeout in seconds for all chunks
+            together, TOTAL_TIMEOUT if not given
         
     Returns:
         List[VocabularyItem]: List of vocabulary items
@@ -92,196 +282,87 @@ async def extract_vocabulary(lyrics: str, timeout: int = 30) -> List[VocabularyI
     Raises:
         VocabularyError: If extraction fails or times out
     """
+    global _ollama_checked_at
     try:
-        # First check if Ollama is running
-        if not await check_ollama():
-            raise VocabularyError(
-                "Ollama is not running or not responding. Please start Ollama with 'ollama serve' and try again."
-            )
-        
-        logger.info(f"Starting vocabulary extraction with timeout={timeout}s")
-        logger.debug(f"Lyrics length: {len(lyrics)} characters")
-        
         # Input validation
         if not lyrics or not lyrics.strip():
             raise VocabularyError("Cannot extract vocabulary from empty lyrics")
         
         logger.info("Input validation passed")
-            
-        # Prepare the prompt for Ollama
-        prompt = f"""
-        Extract 5 important German vocabulary words from these lyrics.
-        Format as a JSON array with 'word' and 'context' fields.
-        Only return the JSON array, nothing else.
         
-        Example format:
-        [
-            {{
-                "word": "Luftballons",
-                "context": "99 Luftballons auf ihrem Weg zum Horizont"
-            }}
-        ]
+        # Lyrics seen before with the same model, prompt and options are served
+        # from the cache; its SQLite reads block, so they run in a worker thread
+        cache_key = vocabulary_cache.extraction_key(lyrics, OLLAMA_MODEL, PROMPT_VERSION, CACHE_OPTIONS)
+        cached_items = await asyncio.to_thread(vocabulary_cache.get, cache_key)
+        if cached_items:
+            logger.info(f"Found {len(cached_items)} cached vocabulary items")
+            return [VocabularyItem(**item) for item in cached_items]
         
-        Lyrics:
-        {lyrics}
-        """
-        
-        try:
-            logger.info("Calling Ollama API...")
-            # Create a new client for this request
-            client = AsyncClient(host=OLLAMA_HOST)
-            # Use streaming to get response chunks
-            full_response = ""
-            async for chunk in await client.generate(
-                model=OLLAMA_MODEL,
-                prompt=prompt,
-                stream=True,  # Enable streaming
-                options={
-                    "temperature": 0.1,
-                    "top_k": 10,
-                    "top_p": 0.9,
-                    "num_predict": 200
-                }
-            ):
-                if chunk and 'response' in chunk:
-                    full_response += chunk['response']
-                    
-            # Use the full response
-            response = {'response': full_response}
-            
-            # Parse the response
-            try:
-                # For streaming, we already have the raw response
-                json_str = full_response.strip()
-                logger.debug(f"Raw response: {json_str}")
-                
-                # Try to find JSON array in the response
-                start_idx = json_str.find('[')
-                end_idx = json_str.rfind(']') + 1
-                
-                if start_idx == -1 or end_idx == 0:
-                    # Fallback to mock data if Ollama response is invalid
-                    logger.warning("Invalid Ollama response, falling back to mock data")
-                    mock_items = await mock_vocabulary(lyrics)
-                    return [VocabularyItem(**item) for item in mock_items]
-                    
-                json_str = json_str[start_idx:end_idx]
-                
-                # Parse JSON
-                items = json.loads(json_str)
-                if not isinstance(items, list):
-                    raise VocabularyError("Invalid response format from Ollama")
-                    
-                # Validate and create VocabularyItems
-                result = []
-                for item in items:
-                    if not isinstance(item, dict) or 'word' not in item or 'context' not in item:
-                        logger.warning(f"Skipping invalid vocabulary item: {item}")
-                        continue
-                    result.append(VocabularyItem(**item))
-                
-                if not result:
-                    # Fallback to mock data if no valid items
-                    logger.warning("No valid items in Ollama response, falling back to mock data")
-                    mock_items = await mock_vocabulary(lyrics)
-                    return [VocabularyItem(**item) for item in mock_items]
-                    
-                return result
-                
-            except json.JSONDecodeError as e:
-                # Fallback to mock data if JSON parsing fails
-                logger.warning(f"Failed to parse Ollama response: {str(e)}, falling back to mock data")
-                mock_items = await mock_vocabulary(lyrics)
-                return [VocabularyItem(**item) for item in mock_items]
-                
-        except asyncio.TimeoutError:
+        # Then check if Ollama is running
+        if not await check_ollama():
             raise VocabularyError(
-                message=f"Vocabulary extraction timed out after {timeout} seconds",
-                error_code="VOCAB_TIMEOUT"
+                "Ollama is not running or not responding. Please start Ollama with 'ollama serve' and try again."
             )
         
-        # Real implementation (commented out for now)
-        '''
-        prompt = f"""
-        Analyze these lyrics and identify 5 important vocabulary words.
-        Return the response in this exact JSON format:
-        [{{
-            "word": "example_word",
-            "context": "line where the word appears"
-        }}]
+        if total_timeout is None:
+            total_timeout = TOTAL_TIMEOUT
+        chunks = split_lyrics(lyrics)
+        logger.info(f"Starting vocabulary extraction of {len(chunks)} chunks with timeout={timeout}s, total_timeout={total_timeout}s")
+        logger.debug(f"Lyrics length: {len(lyrics)} characters")
         
-        Lyrics:
-        {lyrics}
+        # Queued chunks only start their own timeout once a slot is free, so
+        # the overall deadline is what bounds a long song
+        semaphore = asyncio.Semaphore(OLLAMA_CONCURRENCY)
+        tasks = [asyncio.create_task(extract_chunk(chunk, semaphore, timeout)) for chunk in chunks]
+        try:
+            _, unfinished = await asyncio.wait(tasks, timeout=total_timeout)
+        finally:
+            for task in tasks:
+                task.cancel()
+        if unfinished:
+            logger.warning(f"{len(unfinished)} of {len(chunks)} chunks unfinished after {total_timeout} seconds")
+        outcomes = [
+            asyncio.TimeoutError() if task in unfinished else task.exception() or task.result()
+            for task in tasks
+        ]
         
-        Focus on words that are:
-        - Important for understanding the song
-        - Potentially new or challenging
-        - Used in interesting or poetic ways
-        """
+        chunk_results = []
+        for outcome in outcomes:
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.warning("Vocabulary extraction of a chunk timed out")
+            elif isinstance(outcome, BaseException):
+                logger.warning(f"Vocabulary extraction of a chunk failed: {str(outcome)}")
+            elif outcome:
+                chunk_results.append(outcome)
         
-        # Create a task for ollama chat
-        async def run_ollama():
-            try:
-                response = await ollama.chat(model='mistral', messages=[{
-                    'role': 'user',
-                    'content': prompt
-                }])
-                return response
-            except Exception as e:
+        if not chunk_results:
+            if all(isinstance(outcome, asyncio.TimeoutError) for outcome in outcomes):
                 raise VocabularyError(
-                    message=f"Error from Ollama API: {str(e)}",
-                    error_code="OLLAMA_ERROR"
+                    message=f"Vocabulary extraction timed out after {total_timeout if unfinished else timeout} seconds",
+                    error_code="VOCAB_TIMEOUT"
                 )
+            errors = [outcome for outcome in outcomes if isinstance(outcome, Exception) and not isinstance(outcome, asyncio.TimeoutError)]
+            if errors:
+                raise errors[0]
+            # Fallback to mock data if Ollama returned no usable items
+            logger.warning("No valid items in Ollama response, falling back to mock data")
+            mock_items = await mock_vocabulary(lyrics)
+            return [VocabularyItem(**item) for item in mock_items]
         
-        # Run with timeout
-        try:
-            response = await asyncio.wait_for(run_ollama(), timeout=timeout)
-        except asyncio.TimeoutError:
-            raise VocabularyError(
-                message=f"Vocabulary extraction timed out after {timeout} seconds",
-                error_code="VOCAB_TIMEOUT"
-            )
+        result = merge_vocabulary(chunk_results)
+        logger.info(f"Extracted {len(result)} vocabulary items from {len(chunk_results)} of {len(chunks)} chunks")
         
-        # Parse response
-        try:
-            response_text = response['message']['content']
-            start = response_text.find('[')
-            end = response_text.rfind(']') + 1
-            
-            if start == -1 or end <= 0:
-                raise VocabularyError(
-                    message="Could not find JSON array in response",
-                    error_code="PARSE_ERROR"
-                )
-            
-            json_str = response_text[start:end]
-            vocab_items = json.loads(json_str)
-            
-            # Validate items
-            if not vocab_items:
-                raise VocabularyError(
-                    message="No vocabulary items found in response",
-                    error_code="NO_ITEMS"
-                )
-                
-            return [VocabularyItem(**item) for item in vocab_items]
-            
-        except json.JSONDecodeError as e:
-            raise VocabularyError(
-                message=f"Invalid JSON in response: {str(e)}",
-                error_code="JSON_ERROR"
-            )
-        except Exception as e:
-            raise VocabularyError(
-                message=f"Error parsing response: {str(e)}",
-                error_code="PARSE_ERROR"
-            )
-        '''
+        # Only complete model output is cached, never the mock fallback or partial results
+        if len(chunk_results) == len(chunks):
+            await asyncio.to_thread(vocabulary_cache.put, cache_key, [item.dict() for item in result])
+        return result
         
     except VocabularyError:
         # Re-raise vocabulary-specific errors
         raise
     except Exception as e:
+        # Ollama may have gone away since the last check
+        _ollama_checked_at = None
         logger.error(f"Unexpected error in vocabulary extraction: {str(e)}")
         raise VocabularyError(
             message=f"Unexpected error in vocabulary extraction: {str(e)}",
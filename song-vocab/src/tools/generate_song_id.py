@@ -1,12 +1,13 @@
-import hashlib
-import re
-from datetime import datetime
 from typing import Dict
+from cache import song_key
 
 def generate_song_id(artist: str, title: str) -> Dict[str, str]:
     """
-    Generate a unique song ID based on title and artist.
-    Format: YYYYMMDD-<first 8 chars of hash>
+    Generate a stable song ID based on title and artist.
+    Format: first 16 chars of the normalized title/artist hash
+    
+    The ID does not depend on the date or on case, punctuation and spacing,
+    so the same song always maps to the same ID (and lyrics cache entry).
     
     Args:
         artist (str): The artist name
@@ -15,20 +16,4 @@ def generate_song_id(artist: str, title: str) -> Dict[str, str]:
     Returns:
         Dict[str, str]: Dictionary containing the generated song_id
     """
-    # Clean the input strings
-    title = re.sub(r'[^\w\s]', '', title.lower())
-    artist = re.sub(r'[^\w\s]', '', artist.lower())
-    
-    # Create a string to hash
-    to_hash = f"{title}-{artist}"
-    
-    # Generate hash
-    hash_obj = hashlib.sha256(to_hash.encode())
-    hash_str = hash_obj.hexdigest()[:8]
-    
-    # Get current date
-    date_str = datetime.now().strftime("%Y%m%d")
-    
-    # Combine date and hash
-    song_id = f"{date_str}-{hash_str}"
-    return {"song_id": song_id}
\ No newline at end of file
+    return {"song_id": song_key(title, artist)[:16]}
@@ -1,8 +1,8 @@
-import aiohttp
 from bs4 import BeautifulSoup
 from typing import Dict, Optional
 import re
 import logging
+from clients import http_session
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -19,7 +19,7 @@ async def get_page_content(url: str) -> Dict[str, Optional[str]]:
     """
     logger.info(f"Fetching content from URL: {url}")
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_session() as session:
             logger.debug("Making HTTP request...")
             async with session.get(url) as response:
                 if response.status != 200:
@@ -1,5 +1,5 @@
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 import asyncio
 from dotenv import load_dotenv
@@ -7,6 +7,8 @@ from serpapi import GoogleSearch
 import aiohttp
 from bs4 import BeautifulSoup
 import re
+from tools.get_page_content import is_primarily_german
+from clients import http_session
 
 # Define exceptions
 class LyricsError(Exception):
@@ -79,75 +81,119 @@ async def clean_lyrics(html_content: str) -> str:
         logger.error(f"Error cleaning lyrics: {str(e)}")
         raise LyricsError(f"Error cleaning lyrics: {str(e)}")
 
+# Candidate pages requested from SerpAPI, and how many of them are fetched at once
+SEARCH_RESULTS = 5
+MAX_CONCURRENT_FETCHES = 3
+
+def google_search(query: str) -> List[Dict[str, Any]]:
+    """Run a blocking SerpAPI search and return its organic results."""
+    search = GoogleSearch({
+        "q": query,
+        "api_key": os.getenv("SERPAPI_KEY"),
+        "num": SEARCH_RESULTS,
+        "hl": "de",  # Set language to German
+        "gl": "de",  # Set region to Germany
+    })
+    return search.get_dict().get("organic_results", [])
+
+async def read_html(response: aiohttp.ClientResponse) -> str:
+    """Decode a response body, trying the declared charset before common fallbacks."""
+    # Try to get the correct encoding from the response headers
+    content_type = response.headers.get('content-type', '')
+    encoding = 'utf-8'  # default encoding
+    if 'charset=' in content_type:
+        encoding = content_type.split('charset=')[-1]
+        
+    try:
+        return await response.text(encoding=encoding)
+    except UnicodeDecodeError:
+        # If that fails, try with different common encodings
+        for enc in ['iso-8859-1', 'cp1252', 'latin1']:
+            try:
+                return await response.text(encoding=enc)
+            except UnicodeDecodeError:
+                continue
+    return ""
+
+async def fetch_lyrics(session: aiohttp.ClientSession, result: Dict[str, Any], semaphore: asyncio.Semaphore, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Fetch one search result and clean its lyrics; None if the page is unusable."""
+    try:
+        # Without a timeout of its own the request keeps the session's default
+        request_options = {'timeout': aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+        async with semaphore:
+            async with session.get(result['link'], **request_options) as response:
+                if response.status != 200:
+                    return None
+                html = await read_html(response)
+        
+        lyrics = await clean_lyrics(html)
+        if not lyrics:
+            return None
+        return {
+            'title': result.get('title', ''),
+            'link': result['link'],
+            'lyrics': lyrics
+        }
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing result {result.get('link')}: {str(e)}")
+        return None
+
 async def search_lyrics(song_title: str, artist: str, timeout: int = 10) -> List[Dict[str, Any]]:
-    """Search for lyrics using Google Search API via SerpApi with timeouts."""
-    async with aiohttp.ClientSession() as session:
-        try:
-            # Step 1: Search for lyrics pages using SerpAPI
-            query = f"{song_title} {artist} songtext lyrics deutsch"
-            search = GoogleSearch({
-                "q": query,
-                "api_key": os.getenv("SERPAPI_KEY"),
-                "num": 5,
-                "hl": "de",  # Set language to German
-                "gl": "de",  # Set region to Germany
-            })
-            
-            search_results = search.get_dict().get("organic_results", [])
-            
-            if not search_results:
-                raise LyricsNotFoundError(f"No lyrics found for {song_title} by {artist}")
-            
-            # Step 2: Process each search result
-            results = []
-            for result in search_results:
-                try:
-                    if 'link' not in result:
+    """Search for lyrics using Google Search API via SerpApi with timeouts.
+    
+    The blocking SerpAPI call runs in a worker thread. Candidate pages are then
+    fetched concurrently (at most MAX_CONCURRENT_FETCHES at a time) and cleaned
+    as they arrive; the first page whose lyrics are primarily German ends the
+    lookup and the remaining fetches are cancelled. All fetches share one
+    `timeout` budget, so a lookup takes about one timeout in the worst case
+    rather than one per candidate.
+    
+    Returns:
+        List[Dict[str, Any]]: Results with 'title', 'link' and 'lyrics', German lyrics first
+    """
+    try:
+        # Step 1: Search for lyrics pages using SerpAPI
+        query = f"{song_title} {artist} songtext lyrics deutsch"
+        search_results = await asyncio.wait_for(asyncio.to_thread(google_search, query), timeout=timeout)
+        
+        candidates = [result for result in search_results if 'link' in result]
+        if not candidates:
+            raise LyricsNotFoundError(f"No lyrics found for {song_title} by {artist}")
+        
+        # Step 2: Fetch the candidate pages concurrently, stopping at the first German lyrics
+        results = []
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        async with http_session() as session:
+            tasks = [asyncio.create_task(fetch_lyrics(session, result, semaphore, timeout)) for result in candidates]
+            try:
+                for next_done in asyncio.as_completed(tasks, timeout=timeout):
+                    result = await next_done
+                    if not result:
                         continue
-                        
-                    # Fetch and clean the lyrics with proper encoding
-                    async with session.get(result['link'], timeout=timeout) as response:
-                        if response.status != 200:
-                            continue
-                            
-                        # Try to get the correct encoding from the response headers
-                        content_type = response.headers.get('content-type', '')
-                        encoding = 'utf-8'  # default encoding
-                        if 'charset=' in content_type:
-                            encoding = content_type.split('charset=')[-1]
-                            
-                        try:
-                            html = await response.text(encoding=encoding)
-                        except UnicodeDecodeError:
-                            # If that fails, try with different common encodings
-                            for enc in ['iso-8859-1', 'cp1252', 'latin1']:
-                                try:
-                                    html = await response.text(encoding=enc)
-                                    break
-                                except UnicodeDecodeError:
-                                    continue
-                        
-                        lyrics = await clean_lyrics(html)
-                        
-                        if lyrics:
-                            results.append({
-                                'title': result.get('title', ''),
-                                'link': result['link'],
-                                'lyrics': lyrics
-                            })
-                            
-                except Exception as e:
-                    logger.error(f"Error processing result: {str(e)}")
-                    continue
-                    
-            if not results:
-                raise LyricsNotFoundError(f"Could not extract lyrics for {song_title} by {artist}")
+                    if is_primarily_german(result['lyrics']):
+                        results.insert(0, result)
+                        break
+                    results.append(result)
+            except asyncio.TimeoutError:
+                logger.warning(f"Lyrics pages for {song_title} by {artist} timed out after {timeout}s")
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
                 
-            return results
+        if not results:
+            raise LyricsNotFoundError(f"Could not extract lyrics for {song_title} by {artist}")
             
-        except Exception as e:
-            logger.error(f"Error searching for lyrics: {str(e)}")
-            raise LyricsError(f"Error searching for lyrics: {str(e)}")
+        return results
+        
+    except asyncio.TimeoutError:
+        logger.error(f"Lyrics search timed out after {timeout}s")
+        raise LyricsError(f"Lyrics search timed out after {timeout} seconds")
+    except Exception as e:
+        logger.error(f"Error searching for lyrics: {str(e)}")
+        raise LyricsError(f"Error searching for lyrics: {str(e)}")
 
 async def test_search():
     """Test function to demonstrate lyrics search"""
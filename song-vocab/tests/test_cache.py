@@ -0,0 +1,112 @@
+import threading
+import pytest
+from unittest.mock import patch, AsyncMock
+from src.agent import Agent
+from src.cache import LyricsCache, VocabularyCache, song_key
+from src.tools.extract_vocabulary import extract_vocabulary
+from src.tools.generate_song_id import generate_song_id
+
+@pytest.fixture
+def cache(tmp_path):
+    return LyricsCache(db_path=tmp_path / "cache.db", ttl=60, max_entries=2)
+
+def test_song_key_is_normalized():
+    """Test that case, punctuation and spacing do not change the key"""
+    assert song_key("99 Luftballons", "NENA") == song_key("99  luftballons!", "Nena")
+    assert song_key("99 Luftballons", "Nena") != song_key("Nena", "99 Luftballons")
+    assert generate_song_id("Nena", "99 Luftballons") == generate_song_id("nena", "99 Luftballons.")
+
+def test_memory_and_database_hits(cache, tmp_path):
+    """Test that lyrics are served from memory, then from SQLite after a restart"""
+    assert cache.get("99 Luftballons", "Nena") is None
+    cache.put("99 Luftballons", "Nena", "Hast du etwas Zeit für mich", "http://example.com")
+    assert cache.get("99 luftballons", "nena")["lyrics"] == "Hast du etwas Zeit für mich"
+    
+    restarted = LyricsCache(db_path=tmp_path / "cache.db", ttl=60)
+    assert restarted.get("99 Luftballons", "Nena")["link"] == "http://example.com"
+    assert restarted.get("99 Luftballons", "Nena") is not None
+    assert (restarted.db_hits, restarted.memory_hits, restarted.misses) == (1, 1, 0)
+    assert (cache.memory_hits, cache.misses) == (1, 1)
+
+def test_expired_entries_are_misses(cache):
+    """Test that entries older than the TTL are fetched again"""
+    cache.put("Song", "Artist", "Lyrics")
+    with patch('src.cache.time.time', return_value=cache.get("Song", "Artist")["fetched_at"] + 61):
+        assert cache.get("Song", "Artist") is None
+    assert cache.stats()["misses"] == 1
+
+def test_lru_eviction(cache):
+    """Test that the memory front keeps only the most recently used entries"""
+    for title in ["A", "B", "C"]:
+        cache.put(title, "Artist", f"Lyrics {title}")
+    assert cache.stats()["entries_in_memory"] == 2
+    assert cache.get("A", "Artist")["lyrics"] == "Lyrics A"
+    assert cache.db_hits == 1
+
+@pytest.mark.asyncio
+async def test_agent_skips_search_on_hit(cache):
+    """Test that cached lyrics are returned without searching"""
+    cache.put("99 Luftballons", "Nena", "Hast du etwas Zeit für mich")
+    agent = Agent(lyrics_cache=cache)
+    with patch('src.agent.search_lyrics', new_callable=AsyncMock) as search:
+        assert await agent.get_lyrics("99 Luftballons", "Nena") == "Hast du etwas Zeit für mich"
+    search.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_agent_cache_io_runs_off_the_event_loop(cache):
+    """Test that the blocking SQLite cache calls run in a worker thread"""
+    threads = []
+    def record(*args):
+        threads.append(threading.get_ident())
+    agent = Agent(lyrics_cache=cache)
+    results = [{"lyrics": "Hast du etwas Zeit für mich", "link": "http://example.com"}]
+    with patch.object(cache, 'get', side_effect=lambda *args: record() or None), \
+         patch.object(cache, 'put', side_effect=record), \
+         patch('src.agent.search_lyrics', new_callable=AsyncMock, return_value=results):
+        assert await agent.get_lyrics("99 Luftballons", "Nena") == "Hast du etwas Zeit für mich"
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
+
+def test_vocabulary_cache_key_and_lru(tmp_path):
+    """Test that keys change with the model parameters and old entries are evicted"""
+    vocab_cache = VocabularyCache(db_path=tmp_path / "cache.db", max_entries=2)
+    options = {"temperature": 0.1}
+    key = VocabularyCache.extraction_key("Lyrics", "mistral:latest", 1, options)
+    assert key == VocabularyCache.extraction_key("Lyrics", "mistral:latest", 1, dict(options))
+    assert key != VocabularyCache.extraction_key("Lyrics", "mistral:latest", 2, options)
+    assert key != VocabularyCache.extraction_key("Lyrics", "llama3:latest", 1, options)
+    
+    items = [{"word": "Luftballons", "context": "99 Luftballons"}]
+    vocab_cache.put("a", items)
+    vocab_cache.put("b", items)
+    assert vocab_cache.get("a") == items  # "a" is now more recently used than "b"
+    vocab_cache.put("c", items)
+    assert vocab_cache.get("b") is None
+    assert vocab_cache.get("a") == items
+    assert (vocab_cache.hits, vocab_cache.misses) == (2, 1)
+
+@pytest.mark.asyncio
+async def test_cached_extraction_skips_ollama(tmp_path):
+    """Test that cached vocabulary is returned without contacting Ollama"""
+    items = [{"word": "Luftballons", "context": "99 Luftballons auf ihrem Weg zum Horizont"}]
+    with patch('src.tools.extract_vocabulary.vocabulary_cache.get', return_value=items), \
+         patch('src.tools.extract_vocabulary.check_ollama', new_callable=AsyncMock) as check:
+        result = await extract_vocabulary("99 Luftballons auf ihrem Weg zum Horizont")
+    assert [item.dict() for item in result] == items
+    check.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_extraction_cache_io_runs_off_the_event_loop():
+    """Test that vocabulary cache reads and writes run in a worker thread"""
+    threads = []
+    def record(*args):
+        threads.append(threading.get_ident())
+    items = [{"word": "Luftballons", "lemma": "Luftballon", "context": "99 Luftballons"}]
+    with patch('src.tools.extract_vocabulary.vocabulary_cache.get', side_effect=lambda *args: record() or None), \
+         patch('src.tools.extract_vocabulary.vocabulary_cache.put', side_effect=record), \
+         patch('src.tools.extract_vocabulary.check_ollama', new_callable=AsyncMock, return_value=True), \
+         patch('src.tools.extract_vocabulary.extract_chunk', new_callable=AsyncMock, return_value=items):
+        result = await extract_vocabulary("99 Luftballons auf ihrem Weg zum Horizont")
+    assert [item.word for item in result] == ["Luftballons"]
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
@@ -0,0 +1,117 @@
+import pytest
+import asyncio
+from unittest.mock import patch, AsyncMock
+from src.tools.extract_vocabulary import VocabularyError, extract_vocabulary, merge_vocabulary, split_lyrics
+
+VERSES = [
+    "Hast du etwas Zeit für mich\nDann singe ich ein Lied für dich",
+    "Von 99 Luftballons\nAuf ihrem Weg zum Horizont",
+    "Denkst du vielleicht grad an mich\nDann singe ich ein Lied für dich"
+]
+
+def test_split_keeps_whole_verses():
+    """Test that verses are packed into chunks without being cut"""
+    lyrics = "\n\n".join(VERSES)
+    assert split_lyrics(lyrics, max_chars=1000) == [lyrics]
+    
+    chunks = split_lyrics(lyrics, max_chars=120)
+    assert chunks == ["\n\n".join(VERSES[:2]), VERSES[2]]
+
+def test_split_long_verses_and_lines():
+    """Test that oversized verses are split between lines, then between words"""
+    assert split_lyrics(VERSES[0], max_chars=40) == VERSES[0].split("\n")
+    
+    flat = " ".join(["Luftballons"] * 20)
+    chunks = split_lyrics(flat, max_chars=50)
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks) == flat
+
+def test_merge_deduplicates_by_lemma():
+    """Test that one item per lemma is kept, with a context containing the word"""
+    merged = merge_vocabulary([
+        [
+            {"word": "singe", "lemma": "singen", "context": "Lied für dich"},
+            {"word": "Zeit", "lemma": "Zeit", "context": "Hast du etwas Zeit für mich"}
+        ],
+        [
+            {"word": "Luftballons", "lemma": "Luftballon", "context": "Von 99 Luftballons"},
+            {"word": "singe", "lemma": "Singen", "context": "Dann singe ich ein Lied für dich"}
+        ]
+    ])
+    assert [item.dict() for item in merged] == [
+        {"word": "singe", "context": "Dann singe ich ein Lied für dich"},
+        {"word": "Zeit", "context": "Hast du etwas Zeit für mich"},
+        {"word": "Luftballons", "context": "Von 99 Luftballons"}
+    ]
+
+@pytest.mark.asyncio
+async def test_chunks_run_concurrently_and_survive_timeouts():
+    """Test that chunks are extracted in parallel and a timed-out chunk is skipped"""
+    async def mock_extract_chunk(chunk, semaphore, timeout):
+        async with semaphore:
+            await asyncio.sleep(0.2)
+        if "Horizont" in chunk:
+            raise asyncio.TimeoutError()
+        word = chunk.split()[0]
+        return [{"word": word, "lemma": word, "context": chunk.split("\n")[0]}]
+    
+    with patch('src.tools.extract_vocabulary.vocabulary_cache.get', return_value=None), \
+         patch('src.tools.extract_vocabulary.vocabulary_cache.put') as put, \
+         patch('src.tools.extract_vocabulary.check_ollama', new_callable=AsyncMock, return_value=True), \
+         patch('src.tools.extract_vocabulary.split_lyrics', return_value=VERSES), \
+         patch('src.tools.extract_vocabulary.OLLAMA_CONCURRENCY', 3), \
+         patch('src.tools.extract_vocabulary.extract_chunk', side_effect=mock_extract_chunk):
+        started = asyncio.get_running_loop().time()
+        result = await extract_vocabulary("\n\n".join(VERSES))
+        elapsed = asyncio.get_running_loop().time() - started
+    
+    assert elapsed < 0.5
+    assert [item.word for item in result] == ["Hast", "Denkst"]
+    # Partial results are not cached
+    put.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_total_timeout_merges_finished_chunks():
+    """Test that chunks unfinished at the overall deadline are dropped and the rest merged"""
+    cancelled = []
+    
+    async def mock_extract_chunk(chunk, semaphore, timeout):
+        async with semaphore:
+            try:
+                await asyncio.sleep(5 if "Horizont" in chunk else 0.05)
+            except asyncio.CancelledError:
+                cancelled.append(chunk)
+                raise
+        word = chunk.split()[0]
+        return [{"word": word, "lemma": word, "context": chunk.split("\n")[0]}]
+    
+    with patch('src.tools.extract_vocabulary.vocabulary_cache.get', return_value=None), \
+         patch('src.tools.extract_vocabulary.vocabulary_cache.put') as put, \
+         patch('src.tools.extract_vocabulary.check_ollama', new_callable=AsyncMock, return_value=True), \
+         patch('src.tools.extract_vocabulary.split_lyrics', return_value=VERSES), \
+         patch('src.tools.extract_vocabulary.OLLAMA_CONCURRENCY', 1), \
+         patch('src.tools.extract_vocabulary.extract_chunk', side_effect=mock_extract_chunk):
+        started = asyncio.get_running_loop().time()
+        result = await extract_vocabulary("\n\n".join(VERSES), timeout=10, total_timeout=0.3)
+        elapsed = asyncio.get_running_loop().time() - started
+        await asyncio.sleep(0)
+    
+    assert elapsed < 1
+    assert [item.word for item in result] == ["Hast"]
+    assert VERSES[1] in cancelled
+    put.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_total_timeout_without_results_raises():
+    """Test that an overall deadline with no finished chunk raises VOCAB_TIMEOUT"""
+    async def mock_extract_chunk(chunk, semaphore, timeout):
+        await asyncio.sleep(5)
+    
+    with patch('src.tools.extract_vocabulary.vocabulary_cache.get', return_value=None), \
+         patch('src.tools.extract_vocabulary.check_ollama', new_callable=AsyncMock, return_value=True), \
+         patch('src.tools.extract_vocabulary.split_lyrics', return_value=VERSES), \
+         patch('src.tools.extract_vocabulary.extract_chunk', side_effect=mock_extract_chunk):
+        with pytest.raises(VocabularyError) as exc_info:
+            await extract_vocabulary("\n\n".join(VERSES), timeout=10, total_timeout=0.1)
+    
+    assert exc_info.value.error_code == "VOCAB_TIMEOUT"
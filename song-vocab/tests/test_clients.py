@@ -0,0 +1,46 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from src import clients
+
+@pytest.fixture
+def settings():
+    return SimpleNamespace(
+        OLLAMA_HOST="http://localhost:11434",
+        HTTP_TIMEOUT=10,
+        HTTP_CONNECT_TIMEOUT=5,
+        HTTP_KEEPALIVE=30,
+        HTTP_DNS_CACHE_TTL=300,
+        HTTP_MAX_CONNECTIONS=100,
+        HTTP_MAX_CONNECTIONS_PER_HOST=10,
+        OLLAMA_TIMEOUT=120,
+        OLLAMA_MAX_CONNECTIONS=4
+    )
+
+@pytest.mark.asyncio
+async def test_shared_clients_are_reused_and_closed(settings):
+    """Test that tools share one session and Ollama client until shutdown"""
+    await clients.open_clients(settings)
+    shared = clients._http_session
+    transport = clients._ollama_transport
+    try:
+        async with clients.http_session() as first:
+            async with clients.http_session() as second:
+                assert first is second is shared
+        assert shared.connector.limit_per_host == 10
+        assert clients.ollama_client("http://other:11434") is clients.ollama_client("http://localhost:11434")
+    finally:
+        with patch.object(transport, 'aclose', wraps=transport.aclose) as aclose:
+            await clients.close_clients()
+    
+    assert shared.closed
+    aclose.assert_awaited_once()
+    assert clients._ollama_client is None
+    assert clients._ollama_transport is None
+
+@pytest.mark.asyncio
+async def test_temporary_session_outside_app():
+    """Test that tools still work when the app has not opened the clients"""
+    async with clients.http_session() as session:
+        assert not session.closed
+    assert session.closed
@@ -83,6 +83,31 @@ async def test_concurrent_searches():
             assert "body" in result[0]
             assert len(result[0]["body"]) > 0
 
+@pytest.mark.asyncio
+async def test_first_german_page_wins():
+    """Test that candidate pages are fetched concurrently and the first German lyrics end the search"""
+    german = "Hast du etwas Zeit für mich, dann singe ich ein Lied für dich von 99 Luftballons auf ihrem Weg zum Horizont und der Nacht"
+    pages = {
+        "http://example.com/slow": (5, german),
+        "http://example.com/english": (0.1, "Some english lyrics"),
+        "http://example.com/german": (0.2, german),
+    }
+    
+    async def mock_fetch(session, result, semaphore, timeout=None):
+        delay, lyrics = pages[result["link"]]
+        await asyncio.sleep(delay)
+        return {"title": result["title"], "link": result["link"], "lyrics": lyrics}
+    
+    search_results = [{"title": link, "link": link} for link in pages]
+    with patch('src.tools.search_web.google_search', return_value=search_results), \
+         patch('src.tools.search_web.fetch_lyrics', side_effect=mock_fetch):
+        started = asyncio.get_running_loop().time()
+        results = await search_lyrics("99 Luftballons", "Nena", timeout=2)
+        elapsed = asyncio.get_running_loop().time() - started
+    
+    assert elapsed < 1
+    assert [result["link"] for result in results] == ["http://example.com/german", "http://example.com/english"]
+
 @pytest.mark.asyncio
 async def test_special_characters():
     """Test handling of special characters in search"""